@@ -1,5 +1,6 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Count, Prefetch, Q
 
 
 class SessionYear(models.Model):
@@ -25,6 +26,25 @@ class SessionYear(models.Model):
         super().save(*args, **kwargs)
 
 
+class CourseQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Annotate subjects_count (active subjects) and enrollments_count"""
+        return self.annotate(
+            subjects_count=Count(
+                "subjects", filter=Q(subjects__is_active=True), distinct=True
+            ),
+            enrollments_count=Count(
+                "enrollments", filter=Q(enrollments__status="active"), distinct=True
+            ),
+        )
+
+    def with_subjects(self):
+        """with_counts() plus the course's subjects, themselves with counts"""
+        return self.with_counts().prefetch_related(
+            Prefetch("subjects", queryset=Subject.objects.with_counts())
+        )
+
+
 class Course(models.Model):
     """Course model"""
 
@@ -49,6 +69,8 @@ class Course(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
 
@@ -56,6 +78,16 @@ class Course(models.Model):
         return f"{self.code} - {self.name}"
 
 
+class SubjectQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Join the course and annotate enrollments_count (enrolled students)"""
+        return self.select_related("course").annotate(
+            enrollments_count=Count(
+                "enrollments", filter=Q(enrollments__status="enrolled")
+            )
+        )
+
+
 class Subject(models.Model):
     """Subject model"""
 
@@ -85,6 +117,8 @@ class Subject(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SubjectQuerySet.as_manager()
+
     class Meta:
         ordering = ["course", "semester", "name"]
         unique_together = ["course", "code"]
@@ -93,6 +127,38 @@ class Subject(models.Model):
         return f"{self.code} - {self.name}"
 
 
+class EnrollmentQuerySet(models.QuerySet):
+    def _annotate_subjects_enrolled(self):
+        return self.annotate(
+            subjects_enrolled=Count(
+                "subject_enrollments", filter=Q(subject_enrollments__status="enrolled")
+            )
+        )
+
+    def with_counts(self):
+        """Join course and session year and annotate subjects_enrolled"""
+        return self.select_related(
+            "course", "session_year"
+        )._annotate_subjects_enrolled()
+
+    def with_details(self):
+        """Everything EnrollmentDetailSerializer reads, in a fixed number of queries"""
+        return (
+            self.select_related("session_year")
+            ._annotate_subjects_enrolled()
+            .prefetch_related(
+                # Prefetched rather than joined so the course carries its counts
+                Prefetch("course", queryset=Course.objects.with_counts()),
+                Prefetch(
+                    "subject_enrollments",
+                    queryset=SubjectEnrollment.objects.select_related(
+                        "subject", "enrollment__course"
+                    ),
+                ),
+            )
+        )
+
+
 class Enrollment(models.Model):
     """Student enrollment model"""
 
@@ -121,6 +187,8 @@ class Enrollment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EnrollmentQuerySet.as_manager()
+
     class Meta:
         ordering = ["-enrollment_date"]
         unique_together = ["student_id", "course", "session_year"]
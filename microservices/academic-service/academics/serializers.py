@@ -24,10 +24,17 @@ class CourseSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("created_at", "updated_at")
 
+    # Querysets from Course.objects.with_counts() carry the counts as
+    # annotations; the queries below only run for unannotated instances
+
     def get_subjects_count(self, obj):
+        if hasattr(obj, "subjects_count"):
+            return obj.subjects_count
         return obj.subjects.filter(is_active=True).count()
 
     def get_enrollments_count(self, obj):
+        if hasattr(obj, "enrollments_count"):
+            return obj.enrollments_count
         return obj.enrollments.filter(status="active").count()
 
 
@@ -42,6 +49,8 @@ class SubjectSerializer(serializers.ModelSerializer):
         read_only_fields = ("created_at", "updated_at")
 
     def get_enrollments_count(self, obj):
+        if hasattr(obj, "enrollments_count"):
+            return obj.enrollments_count
         return obj.enrollments.filter(status="enrolled").count()
 
 
@@ -57,6 +66,8 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         read_only_fields = ("created_at", "updated_at", "enrollment_date")
 
     def get_subjects_enrolled(self, obj):
+        if hasattr(obj, "subjects_enrolled"):
+            return obj.subjects_enrolled
         return obj.subject_enrollments.filter(status="enrolled").count()
 
     def validate(self, data):
@@ -127,7 +138,9 @@ class CourseDetailSerializer(CourseSerializer):
         ]
 
     def get_active_subjects(self, obj):
-        return SubjectSerializer(obj.subjects.filter(is_active=True), many=True).data
+        # Filtered in Python so subjects prefetched by with_subjects() are reused
+        active = [subject for subject in obj.subjects.all() if subject.is_active]
+        return SubjectSerializer(active, many=True).data
 
 
 class EnrollmentDetailSerializer(EnrollmentSerializer):
@@ -0,0 +1,118 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Course, Enrollment, SessionYear, Subject, SubjectEnrollment
+
+
+class ListQueryCountTests(TestCase):
+    """List endpoints must not issue queries per row they serialize"""
+
+    def setUp(self):
+        self.session_year = SessionYear.objects.create(
+            name="2024-2025",
+            start_date=datetime.date(2024, 6, 1),
+            end_date=datetime.date(2025, 5, 31),
+            is_active=True,
+        )
+        self.course = self._add_course(subjects=2)
+
+    def _add_subjects(self, course, count, is_active=True):
+        offset = course.subjects.count()
+        return [
+            Subject.objects.create(
+                course=course,
+                name=f"{course.code} subject {offset + i}",
+                code=f"{course.code}-S{offset + i}",
+                credits=3,
+                semester=1,
+                is_active=is_active,
+            )
+            for i in range(count)
+        ]
+
+    def _add_course(self, subjects, students=(1, 2)):
+        number = Course.objects.count()
+        course = Course.objects.create(
+            name=f"Course {number}",
+            code=f"C{number}",
+            duration_years=3,
+            total_credits=120,
+        )
+        course_subjects = self._add_subjects(course, subjects)
+        for student_id in students:
+            enrollment = Enrollment.objects.create(
+                student_id=student_id, course=course, session_year=self.session_year
+            )
+            for subject in course_subjects:
+                SubjectEnrollment.objects.create(enrollment=enrollment, subject=subject)
+        return course
+
+    def _grow(self):
+        """Add rows to every list and to the nested lists of the first course"""
+        for i in range(5):
+            SessionYear.objects.create(
+                name=f"20{10 + i}",
+                start_date=datetime.date(2010 + i, 6, 1),
+                end_date=datetime.date(2011 + i, 5, 31),
+            )
+            self._add_course(subjects=3, students=(1, 2, 3))
+        self._add_subjects(self.course, 4)
+        self._add_subjects(self.course, 2, is_active=False)
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_endpoints_query_count_is_independent_of_row_count(self):
+        enrollment = Enrollment.objects.filter(course=self.course).first()
+        urls = [
+            reverse("session-list-create"),
+            reverse("session-year-list-create"),
+            reverse("course-list-create"),
+            reverse("course-detail", args=[self.course.id]),
+            reverse("course-subjects", args=[self.course.id]),
+            reverse("subject-list-create"),
+            reverse("enrollment-list-create"),
+            reverse("enrollment-detail", args=[enrollment.id]),
+            reverse("student-enrollments", args=[1]),
+            reverse("subject-enrollment-list-create"),
+        ]
+        small = {url: self._queries(url) for url in urls}
+
+        self._grow()
+
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self._queries(url), small[url])
+
+    def test_annotated_counts_match_per_row_counts(self):
+        self._add_subjects(self.course, 1, is_active=False)
+        Enrollment.objects.filter(course=self.course, student_id=2).update(
+            status="dropped"
+        )
+        SubjectEnrollment.objects.filter(
+            enrollment__student_id=1, subject__code=f"{self.course.code}-S0"
+        ).update(status="completed")
+
+        course = self.client.get(reverse("course-list-create")).json()["results"][0]
+        self.assertEqual(course["subjects_count"], 2)
+        self.assertEqual(course["enrollments_count"], 1)
+
+        detail = self.client.get(reverse("course-detail", args=[self.course.id])).json()
+        self.assertEqual(len(detail["subjects"]), 3)
+        self.assertEqual(len(detail["active_subjects"]), 2)
+        self.assertEqual(
+            {s["code"]: s["enrollments_count"] for s in detail["active_subjects"]},
+            {f"{self.course.code}-S0": 1, f"{self.course.code}-S1": 2},
+        )
+
+        enrollments = self.client.get(reverse("student-enrollments", args=[1])).json()
+        self.assertEqual(enrollments[0]["subjects_enrolled"], 1)
+        self.assertEqual(enrollments[0]["course_details"]["subjects_count"], 2)
+        self.assertEqual(len(enrollments[0]["subject_enrollments"]), 2)
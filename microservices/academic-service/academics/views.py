@@ -47,7 +47,7 @@ class SessionYearDetailView(generics.RetrieveUpdateDestroyAPIView):
 class CourseListCreateView(generics.ListCreateAPIView):
     """List and create courses"""
 
-    queryset = Course.objects.all()
+    queryset = Course.objects.with_counts()
     serializer_class = CourseSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["course_type", "is_active"]
@@ -59,14 +59,14 @@ class CourseListCreateView(generics.ListCreateAPIView):
 class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, delete course with subjects"""
 
-    queryset = Course.objects.all()
+    queryset = Course.objects.with_subjects()
     serializer_class = CourseDetailSerializer
 
 
 class SubjectListCreateView(generics.ListCreateAPIView):
     """List and create subjects"""
 
-    queryset = Subject.objects.all()
+    queryset = Subject.objects.with_counts()
     serializer_class = SubjectSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["course", "subject_type", "semester", "is_active"]
@@ -78,14 +78,14 @@ class SubjectListCreateView(generics.ListCreateAPIView):
 class SubjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, delete subject"""
 
-    queryset = Subject.objects.all()
+    queryset = Subject.objects.with_counts()
     serializer_class = SubjectSerializer
 
 
 class EnrollmentListCreateView(generics.ListCreateAPIView):
     """List and create enrollments"""
 
-    queryset = Enrollment.objects.all()
+    queryset = Enrollment.objects.with_counts()
     serializer_class = EnrollmentSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["student_id", "course", "session_year", "status"]
@@ -97,14 +97,16 @@ class EnrollmentListCreateView(generics.ListCreateAPIView):
 class EnrollmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, delete enrollment with subject enrollments"""
 
-    queryset = Enrollment.objects.all()
+    queryset = Enrollment.objects.with_details()
     serializer_class = EnrollmentDetailSerializer
 
 
 class SubjectEnrollmentListCreateView(generics.ListCreateAPIView):
     """List and create subject enrollments"""
 
-    queryset = SubjectEnrollment.objects.all()
+    queryset = SubjectEnrollment.objects.select_related(
+        "subject", "enrollment__course"
+    )
     serializer_class = SubjectEnrollmentSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["enrollment__student_id", "subject", "status"]
@@ -116,14 +118,16 @@ class SubjectEnrollmentListCreateView(generics.ListCreateAPIView):
 class SubjectEnrollmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, delete subject enrollment"""
 
-    queryset = SubjectEnrollment.objects.all()
+    queryset = SubjectEnrollment.objects.select_related(
+        "subject", "enrollment__course"
+    )
     serializer_class = SubjectEnrollmentSerializer
 
 
 @api_view(["GET"])
 def student_enrollments(request, student_id):
     """Get all enrollments for a specific student"""
-    enrollments = Enrollment.objects.filter(student_id=student_id)
+    enrollments = Enrollment.objects.with_details().filter(student_id=student_id)
     serializer = EnrollmentDetailSerializer(enrollments, many=True)
     return Response(serializer.data)
 
@@ -133,7 +137,7 @@ def course_subjects(request, course_id):
     """Get all subjects for a specific course"""
     try:
         course = Course.objects.get(id=course_id)
-        subjects = course.subjects.filter(is_active=True)
+        subjects = Subject.objects.with_counts().filter(course=course, is_active=True)
         serializer = SubjectSerializer(subjects, many=True)
         return Response(serializer.data)
     except Course.DoesNotExist:
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Asyncio engine for the API Gateway
+
+An ASGI application that serves the same SERVICES/ROUTES contract as
+the Flask gateway, but proxies with a non-blocking HTTP client so a slow
+upstream costs a coroutine rather than a worker thread. Run it with:
+
+    uvicorn async_gateway:app --host 0.0.0.0 --port 8080
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+
+import httpx
+
+from auth_handler import LOGIN_PATH, login_result
+from gateway import PUBLIC_PATHS, SERVICES, UPSTREAM_OVERRIDES, router
+from token_verifier import InvalidToken, UnknownIssuer, verifier
+from upstream import STREAM_CHUNK_SIZE, end_to_end_headers, resolve_settings
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_TIMEOUT = 5
+
+
+class AsyncUpstreams:
+    """One httpx.AsyncClient per upstream service with its own pool limits"""
+
+    def __init__(self, services, overrides=None):
+        self.services = services
+        self.overrides = overrides or {}
+        self._clients = {}
+
+    def get(self, service_name):
+        client = self._clients.get(service_name)
+        if client is None:
+            settings = resolve_settings(service_name, self.overrides.get(service_name))
+            client = httpx.AsyncClient(
+                base_url=self.services[service_name],
+                limits=httpx.Limits(
+                    max_connections=settings["pool_size"],
+                    max_keepalive_connections=settings["pool_size"],
+                ),
+                # Waiting for a free pooled connection is bounded by the read timeout
+                timeout=httpx.Timeout(
+                    connect=settings["connect_timeout"],
+                    read=settings["read_timeout"],
+                    write=settings["read_timeout"],
+                    pool=settings["read_timeout"],
+                ),
+                # Retries only cover failures to establish a connection
+                transport=httpx.AsyncHTTPTransport(retries=settings["retries"]),
+            )
+            self._clients[service_name] = client
+        return client
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+
+upstreams = AsyncUpstreams(SERVICES, UPSTREAM_OVERRIDES)
+
+
+async def send_json(send, payload, status=200):
+    body = json.dumps(payload).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def read_body(receive):
+    """Yield the inbound request body chunk by chunk as the server receives it"""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        if message.get("body"):
+            yield message["body"]
+        if not message.get("more_body"):
+            return
+
+
+async def authenticate(headers, path):
+    """Mirror of gateway.authenticate_request: validate, but never block in development"""
+    route = router.match(path)
+    if path in PUBLIC_PATHS or (route is not None and not route.auth):
+        return
+
+    token = headers.get("authorization")
+    if not token:
+        logger.warning("No authorization token provided - allowing for development")
+        return
+
+    if token.startswith("Bearer "):
+        token = token[7:]
+    if token == "dummy-token-for-development":
+        return
+
+    try:
+        verifier.verify(token)
+        return
+    except UnknownIssuer:
+        pass
+    except InvalidToken as e:
+        logger.warning(f"Token validation failed: {e} - allowing for development")
+        return
+
+    try:
+        response = await upstreams.get("user-management").get(
+            "/api/v1/users/validate-token/",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        if response.status_code != 200:
+            logger.warning("Token validation failed - allowing for development")
+        else:
+            verifier.remember(token)
+    except httpx.HTTPError as e:
+        logger.error(f"Token validation error: {str(e)} - allowing for development")
+
+
+async def check_service(service_name):
+    path = "/api/v1/users/health/" if service_name == "user-management" else "/health"
+    try:
+        response = await upstreams.get(service_name).get(
+            path, timeout=HEALTH_CHECK_TIMEOUT
+        )
+        return service_name, {
+            "status": "healthy" if response.status_code == 200 else "unhealthy",
+            "response_time": response.elapsed.total_seconds(),
+        }
+    except httpx.HTTPError as e:
+        return service_name, {"status": "unhealthy", "error": str(e) or repr(e)}
+
+
+async def services_status(send):
+    """Probe every service concurrently, so the slowest one bounds the call"""
+    results = await asyncio.gather(*(check_service(name) for name in SERVICES))
+    await send_json(send, dict(results))
+
+
+async def login(receive, send):
+    try:
+        data = json.loads(b"".join([chunk async for chunk in read_body(receive)]))
+    except ValueError:
+        data = None
+    if not data:
+        return await send_json(send, {"error": "Invalid JSON data"}, 400)
+
+    username = data.get("username")
+    password = data.get("password")
+    if not username or not password:
+        return await send_json(send, {"error": "Username and password required"}, 400)
+
+    try:
+        response = await upstreams.get("user-management").post(
+            LOGIN_PATH, json={"username": username, "password": password}
+        )
+    except httpx.TimeoutException:
+        logger.error("Timeout calling user-management for login")
+        return await send_json(send, {"error": "Authentication service timeout"}, 504)
+    except httpx.TransportError:
+        logger.error("Connection error calling user-management for login")
+        return await send_json(
+            send, {"error": "Authentication service unavailable"}, 503
+        )
+
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = {}
+    auth_result, status_code = login_result(response.status_code, payload)
+    await send_json(send, auth_result, status_code)
+
+
+async def proxy(scope, receive, send, headers):
+    path = scope["path"]
+    route = router.match(path)
+    if route is None:
+        return await send_json(send, {"error": "Service not found"}, 404)
+    service_name = route.service
+    if service_name not in SERVICES:
+        return await send_json(send, {"error": "Service unavailable"}, 503)
+
+    forward_headers = end_to_end_headers(headers, exclude=("Host",))
+    has_body = "content-length" in headers or "chunked" in headers.get(
+        "transfer-encoding", ""
+    )
+
+    client = upstreams.get(service_name)
+    timeout = client.timeout
+    if route.timeout:
+        timeout = httpx.Timeout(route.timeout, connect=timeout.connect)
+    upstream_request = client.build_request(
+        scope["method"],
+        route.upstream_path(path),
+        params=scope["query_string"].decode("latin-1"),
+        headers=forward_headers,
+        content=read_body(receive) if has_body else None,
+        timeout=timeout,
+    )
+    try:
+        response = await client.send(upstream_request, stream=True)
+    except httpx.TimeoutException:
+        logger.error(f"Timeout calling {service_name}")
+        return await send_json(send, {"error": "Service timeout"}, 504)
+    except httpx.TransportError:
+        logger.error(f"Connection error calling {service_name}")
+        return await send_json(send, {"error": "Service unavailable"}, 503)
+
+    logger.info(
+        f"Proxied {scope['method']} {path} to {service_name} - {response.status_code}"
+    )
+    response_headers = end_to_end_headers(response.headers.multi_items())
+    response_headers += route.cache_headers(
+        scope["method"], response.status_code, response_headers
+    )
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response_headers
+                ],
+            }
+        )
+        async for chunk in response.aiter_raw(STREAM_CHUNK_SIZE):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        await response.aclose()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await upstreams.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    path = scope["path"]
+    method = scope["method"]
+    headers = httpx.Headers(
+        [(name.decode("latin-1"), value.decode("latin-1")) for name, value in scope["headers"]]
+    )
+
+    if path == "/health":
+        return await send_json(
+            send,
+            {
+                "status": "healthy",
+                "service": "api-gateway",
+                "engine": "asyncio",
+                "timestamp": datetime.utcnow().isoformat(),
+            },
+        )
+
+    if not path.startswith("/api/v1/"):
+        return await send_json(send, {"error": "Endpoint not found"}, 404)
+
+    if path == "/api/v1/users/login/" and method == "POST":
+        return await login(receive, send)
+
+    await authenticate(headers, path)
+
+    if path == "/api/v1/services/status":
+        return await services_status(send)
+
+    response_started = False
+
+    async def tracked_send(message):
+        nonlocal response_started
+        response_started = response_started or message["type"] == "http.response.start"
+        await send(message)
+
+    try:
+        await proxy(scope, receive, tracked_send, headers)
+    except Exception as e:
+        logger.error(f"Error proxying request {method} {path}: {str(e)}")
+        # Once the upstream status line is out the client just sees a cut body
+        if not response_started:
+            await send_json(send, {"error": "Internal gateway error"}, 500)
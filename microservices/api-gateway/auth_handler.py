@@ -2,92 +2,51 @@
 """
 Direct authentication handler for API Gateway
 """
-import json
 import logging
-import subprocess
+
+import requests
 
 logger = logging.getLogger(__name__)
 
+# JSON login endpoint of the user-management service (users.simple_auth)
+LOGIN_PATH = "/api/v1/users/login/"
 
-def authenticate_user(username, password):
-    """
-    Authenticate user directly using Django shell in user-management container
-    """
-    try:
-        auth_command = f"""
-import os
-import django
-from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.utils import timezone
-import json
+# Upstream statuses passed through to the client; anything else is reported
+# as a service error
+CLIENT_ERROR_STATUSES = (400, 401)
 
-try:
-    user = authenticate(username='{username}', password='{password}')
-    if user and user.is_active:
-        refresh = RefreshToken.for_user(user)
-        access_token = refresh.access_token
-        user.last_login = timezone.now()
-        user.save(update_fields=['last_login'])
-        
-        result = {{
-            'access_token': str(access_token),
-            'refresh_token': str(refresh),
-            'user': {{
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'user_type': user.user_type,
-                'is_active': user.is_active,
-            }},
-            'message': 'Login successful'
-        }}
-        print(json.dumps(result))
-    else:
-        print(json.dumps({{'error': 'Invalid credentials'}}))
-except Exception as e:
-    print(json.dumps({{'error': str(e)}}))
-"""
 
-        # Execute authentication via docker compose exec
-        result = subprocess.run(
-            [
-                "docker",
-                "compose",
-                "exec",
-                "-T",
-                "user-management",
-                "python",
-                "manage.py",
-                "shell",
-                "-c",
-                auth_command,
-            ],
-            capture_output=True,
-            text=True,
-            cwd="/app",
-        )
+def login_result(status_code, payload):
+    """Map the user-management login response onto (result, status_code)"""
+    if status_code == 200 and "access_token" in payload:
+        return payload, 200
+    if status_code in CLIENT_ERROR_STATUSES:
+        return {"error": payload.get("error", "Invalid credentials")}, status_code
+    logger.error(f"Login endpoint returned {status_code}: {payload}")
+    return {"error": "Authentication service error"}, 500
 
-        if result.returncode == 0 and result.stdout.strip():
-            # Parse the JSON output
-            output_lines = result.stdout.strip().split("\n")
-            json_line = None
-            for line in output_lines:
-                if line.strip().startswith("{"):
-                    json_line = line.strip()
-                    break
-
-            if json_line:
-                auth_result = json.loads(json_line)
-                return auth_result, 200 if "access_token" in auth_result else 401
-            else:
-                return {"error": "No valid JSON response from authentication"}, 500
-        else:
-            logger.error(f"Auth command failed: {result.stderr}")
-            return {"error": "Authentication service error"}, 500
 
+def authenticate_user(client, username, password):
+    """
+    Authenticate user against the user-management login endpoint over the
+    gateway's pooled connection to that service
+    """
+    try:
+        response = client.request(
+            "POST", LOGIN_PATH, json={"username": username, "password": password}
+        )
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        return login_result(response.status_code, payload)
+
+    except requests.exceptions.Timeout:
+        logger.error("Timeout calling user-management for login")
+        return {"error": "Authentication service timeout"}, 504
+    except requests.exceptions.ConnectionError:
+        logger.error("Connection error calling user-management for login")
+        return {"error": "Authentication service unavailable"}, 503
     except Exception as e:
         logger.error(f"Authentication error: {str(e)}")
         return {"error": "Internal authentication error"}, 500
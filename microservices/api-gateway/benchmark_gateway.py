@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the API Gateway proxy against local stub services
+
+Starts a keep-alive stub upstream and the gateway under gunicorn (as in the
+Dockerfile), drives both at a fixed request rate and reports the latency the
+gateway adds on top of calling the stub directly. Run it twice to compare
+pooling on and off:
+
+    python benchmark_gateway.py --rps 500 --duration 10
+    python benchmark_gateway.py --rps 500 --duration 10 --no-pool
+
+The load generator, stub and gateway share the machine, so pick a rate the
+host can sustain; the overhead figure is only meaningful below saturation.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+GATEWAY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SERVICE_URL_VARIABLES = [
+    "USER_MANAGEMENT_SERVICE_URL",
+    "ACADEMIC_SERVICE_URL",
+    "ATTENDANCE_SERVICE_URL",
+    "NOTIFICATION_SERVICE_URL",
+    "LEAVE_MANAGEMENT_SERVICE_URL",
+    "FEEDBACK_SERVICE_URL",
+    "ASSESSMENT_SERVICE_URL",
+    "FINANCIAL_SERVICE_URL",
+]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment so Nagle/delayed ACK don't skew timings
+    disable_nagle_algorithm = True
+    wbufsize = -1
+    body = json.dumps({"results": [], "count": 0}).encode()
+    login_body = json.dumps(
+        {
+            "access_token": "stub-access-token",
+            "refresh_token": "stub-refresh-token",
+            "user": {"id": 1, "username": "stub", "user_type": "student"},
+            "message": "Login successful",
+        }
+    ).encode()
+
+    def _reply(self):
+        # Bodies are drained in chunks so large uploads don't load the stub
+        length = int(self.headers.get("Content-Length") or 0)
+        while length:
+            length -= len(self.rfile.read(min(length, 1024 * 1024)))
+
+        # ".../export/<megabytes>/" streams a body of that size
+        body_mb = self.path.rstrip("/").rsplit("/", 1)[-1]
+        if "/export/" in self.path and body_mb.isdigit():
+            return self._stream_body(int(body_mb) * 1024 * 1024)
+
+        body = self.login_body if self.path.endswith("/users/login/") else self.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_body(self, size):
+        chunk = b"\0" * (1024 * 1024)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        while size:
+            block = chunk[: min(size, len(chunk))]
+            self.wfile.write(block)
+            size -= len(block)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_stub(port):
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def start_stub():
+    port = free_port()
+    process = multiprocessing.Process(target=serve_stub, args=(port,), daemon=True)
+    process.start()
+    url = f"http://127.0.0.1:{port}"
+    wait_until_up(url)
+    return process, url
+
+
+def start_gateway(stub_url, workers, threads, pooling, service_urls=None):
+    port = free_port()
+    env = dict(os.environ, GATEWAY_POOLING="on" if pooling else "off")
+    env.update({variable: stub_url for variable in SERVICE_URL_VARIABLES})
+    env.update(service_urls or {})
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--threads",
+            str(threads),
+            "--log-level",
+            "warning",
+            "gateway:app",
+        ],
+        cwd=GATEWAY_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    wait_until_up(f"{url}/health")
+    return process, url
+
+
+def run_load(url, rps, duration, clients, method="GET", payload=None):
+    """Issue requests at a fixed rate and return per-request latencies in ms"""
+    local = threading.local()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def call():
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, json=payload, timeout=10)
+            ok = response.status_code == 200
+        except requests.exceptions.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    total = int(rps * duration)
+    interval = 1.0 / rps
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        start = time.perf_counter()
+        for i in range(total):
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(call)
+    return latencies, errors
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarise(label, latencies, errors):
+    print(
+        f"{label:<8} n={len(latencies):<6} errors={errors:<4} "
+        f"p50={statistics.median(latencies):6.2f}ms "
+        f"p90={percentile(latencies, 90):6.2f}ms "
+        f"p99={percentile(latencies, 99):6.2f}ms"
+    )
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rps", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--gunicorn-workers", type=int, default=2)
+    parser.add_argument("--gunicorn-threads", type=int, default=16)
+    parser.add_argument("--no-pool", action="store_true")
+    args = parser.parse_args()
+
+    stub, stub_url = start_stub()
+    gateway, gateway_url = start_gateway(
+        stub_url, args.gunicorn_workers, args.gunicorn_threads, not args.no_pool
+    )
+
+    try:
+        print(
+            f"pooling={'off' if args.no_pool else 'on'} rps={args.rps} "
+            f"duration={args.duration}s"
+        )
+        direct = summarise(
+            "direct",
+            *run_load(
+                f"{stub_url}/api/v1/courses/", args.rps, args.duration, args.clients
+            ),
+        )
+        proxied = summarise(
+            "gateway",
+            *run_load(
+                f"{gateway_url}/api/v1/courses/", args.rps, args.duration, args.clients
+            ),
+        )
+        print(f"p50 gateway overhead: {proxied - direct:.2f}ms")
+
+        # Counters come from whichever gunicorn worker answers this request
+        pools = requests.get(f"{gateway_url}/api/v1/services/pools", timeout=10).json()
+        print(json.dumps(pools.get("academic"), indent=2, sort_keys=True))
+    finally:
+        gateway.terminate()
+        gateway.wait()
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Login load test for the API Gateway
+
+Drives POST /api/v1/users/login/ through the gateway (under gunicorn, as in
+the Dockerfile) at a fixed rate and reports the login rate it sustained. By
+default user-management is the keep-alive stub from benchmark_gateway, which
+isolates the gateway's own login path:
+
+    python benchmark_login.py --rps 300 --duration 10
+
+Point it at a running user-management service to include the real endpoint;
+there the rate is bounded by password hashing on that service's workers:
+
+    python benchmark_login.py --user-service http://localhost:8000 \\
+        --username admin --password admin123
+"""
+import argparse
+import time
+
+from benchmark_gateway import start_gateway, start_stub, summarise, run_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rps", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--gunicorn-workers", type=int, default=2)
+    parser.add_argument("--gunicorn-threads", type=int, default=16)
+    parser.add_argument("--user-service", help="URL of a running user-management")
+    parser.add_argument("--username", default="stub")
+    parser.add_argument("--password", default="stub")
+    args = parser.parse_args()
+
+    stub, stub_url = start_stub()
+    service_urls = {}
+    if args.user_service:
+        service_urls["USER_MANAGEMENT_SERVICE_URL"] = args.user_service
+    gateway, gateway_url = start_gateway(
+        stub_url,
+        args.gunicorn_workers,
+        args.gunicorn_threads,
+        pooling=True,
+        service_urls=service_urls,
+    )
+
+    try:
+        print(
+            f"user-management={args.user_service or 'stub'} rps={args.rps} "
+            f"duration={args.duration}s"
+        )
+        started = time.perf_counter()
+        latencies, errors = run_load(
+            f"{gateway_url}/api/v1/users/login/",
+            args.rps,
+            args.duration,
+            args.clients,
+            method="POST",
+            payload={"username": args.username, "password": args.password},
+        )
+        elapsed = time.perf_counter() - started
+        summarise("login", latencies, errors)
+        print(f"successful logins/s: {len(latencies) / elapsed:.1f}")
+    finally:
+        gateway.terminate()
+        gateway.wait()
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
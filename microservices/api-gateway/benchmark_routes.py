@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of gateway path dispatch: RouteTable against a linear scan
+
+The linear scan is the previous get_service_for_path, a startswith check over
+every prefix in declaration order. Both are run over the same mix of paths,
+after checking that they pick the same service for each of them:
+
+    python benchmark_routes.py --lookups 200000 --extra-routes 200
+"""
+import argparse
+import random
+import timeit
+
+from gateway import ROUTES
+from routes import Route, RouteTable
+
+
+def linear_lookup(mappings, path):
+    for route_prefix, service_name in mappings.items():
+        if path.startswith(route_prefix):
+            return service_name
+    return None
+
+
+def sample_paths(routes, count, seed=0):
+    rng = random.Random(seed)
+    tails = ["", "42/", "list/", "student/17/summary/", "export/2024/01/"]
+    paths = [f"{rng.choice(routes).prefix}{rng.choice(tails)}" for _ in range(count)]
+    # Unrouted paths scan every prefix in the linear version
+    paths += [f"/api/v1/unknown{i}/" for i in range(count // 20)]
+    rng.shuffle(paths)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument(
+        "--extra-routes",
+        type=int,
+        default=0,
+        help="Add synthetic prefixes to see how each approach scales",
+    )
+    args = parser.parse_args()
+
+    routes = ROUTES + [
+        Route(f"/api/v1/extra{i}/items/", "extra") for i in range(args.extra_routes)
+    ]
+    mappings = {route.prefix: route.service for route in routes}
+    table = RouteTable(routes)
+    paths = sample_paths(routes, 1000)
+
+    for path in paths:
+        route = table.match(path)
+        expected = linear_lookup(mappings, path)
+        assert (route.service if route else None) == expected, path
+
+    rounds = max(1, args.lookups // len(paths))
+    linear = timeit.timeit(
+        lambda: [linear_lookup(mappings, path) for path in paths], number=rounds
+    )
+    trie = timeit.timeit(lambda: [table.match(path) for path in paths], number=rounds)
+
+    lookups = rounds * len(paths)
+    print(f"routes={len(routes)} lookups={lookups}")
+    print(f"linear scan  {linear / lookups * 1e6:6.3f}us/lookup")
+    print(f"route table  {trie / lookups * 1e6:6.3f}us/lookup")
+    print(f"speedup      {linear / trie:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
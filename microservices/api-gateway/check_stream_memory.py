@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Memory-ceiling check for the streaming proxy
+
+Uploads and downloads a large body (500 MB by default) through a gateway
+worker and fails if the worker's peak RSS grows by more than the ceiling,
+i.e. if either body is buffered instead of streamed:
+
+    python check_stream_memory.py --size-mb 500 --ceiling-mb 64
+"""
+import argparse
+import sys
+
+import requests
+
+from benchmark_gateway import start_gateway, start_stub
+
+CHUNK = 1024 * 1024
+
+
+class ZeroBody:
+    """Sized, file-like body of zero bytes so the client never holds it all"""
+
+    def __init__(self, size):
+        self.remaining = self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def read(self, size=CHUNK):
+        size = min(self.remaining, size if size and size > 0 else CHUNK)
+        self.remaining -= size
+        return b"\0" * size
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as children:
+        return [int(pid) for pid in children.read().split()]
+
+
+def peak_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError(f"no VmHWM for {pid}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size-mb", type=int, default=500)
+    parser.add_argument("--ceiling-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    stub, stub_url = start_stub()
+    gateway, gateway_url = start_gateway(stub_url, workers=1, threads=4, pooling=True)
+    try:
+        (worker,) = worker_pids(gateway.pid)
+        # Warm the worker so imports and pool setup aren't counted
+        requests.get(f"{gateway_url}/api/v1/finances/", timeout=10)
+        baseline = peak_rss_mb(worker)
+
+        size = args.size_mb * CHUNK
+        response = requests.post(
+            f"{gateway_url}/api/v1/assignments/upload/",
+            data=ZeroBody(size),
+            timeout=300,
+        )
+        response.raise_for_status()
+        after_upload = peak_rss_mb(worker)
+
+        received = 0
+        with requests.get(
+            f"{gateway_url}/api/v1/finances/export/{args.size_mb}/",
+            stream=True,
+            timeout=300,
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(CHUNK):
+                received += len(chunk)
+        after_download = peak_rss_mb(worker)
+    finally:
+        gateway.terminate()
+        gateway.wait()
+        stub.terminate()
+
+    growth = after_download - baseline
+    print(
+        f"body={args.size_mb}MB received={received // CHUNK}MB "
+        f"worker peak RSS: baseline={baseline:.1f}MB "
+        f"after upload={after_upload:.1f}MB after download={after_download:.1f}MB "
+        f"growth={growth:.1f}MB (ceiling {args.ceiling_mb}MB)"
+    )
+    if received != size or growth > args.ceiling_mb:
+        print("FAIL")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,51 +1,85 @@
 import json
 import logging
+import os
 from datetime import datetime, timedelta
 from functools import wraps
 
 import jwt
 import requests
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+
+from auth_handler import authenticate_user
+from routes import Route, Router
+from token_verifier import InvalidToken, UnknownIssuer, verifier
+from upstream import (STREAM_CHUNK_SIZE, RequestBodyStream, UpstreamRegistry,
+                      end_to_end_headers, iter_response_body)
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "your-gateway-secret-key"
 
 # Service URLs
 SERVICES = {
-    "user-management": "http://user-management:8000",
-    "academic": "http://academic:8001",
-    "attendance": "http://attendance:8002",
-    "notification": "http://notification:8003",
-    "leave-management": "http://leave-management:8004",
-    "feedback": "http://feedback:8005",
-    "assessment": "http://assessment:8006",
-    "financial": "http://financial:8007",
+    "user-management": os.environ.get(
+        "USER_MANAGEMENT_SERVICE_URL", "http://user-management:8000"
+    ),
+    "academic": os.environ.get("ACADEMIC_SERVICE_URL", "http://academic:8001"),
+    "attendance": os.environ.get("ATTENDANCE_SERVICE_URL", "http://attendance:8002"),
+    "notification": os.environ.get(
+        "NOTIFICATION_SERVICE_URL", "http://notification:8003"
+    ),
+    "leave-management": os.environ.get(
+        "LEAVE_MANAGEMENT_SERVICE_URL", "http://leave-management:8004"
+    ),
+    "feedback": os.environ.get("FEEDBACK_SERVICE_URL", "http://feedback:8005"),
+    "assessment": os.environ.get("ASSESSMENT_SERVICE_URL", "http://assessment:8006"),
+    "financial": os.environ.get("FINANCIAL_SERVICE_URL", "http://financial:8007"),
 }
 
-# Route mappings
-ROUTE_MAPPINGS = {
-    "/api/v1/users/": "user-management",
-    "/api/v1/auth/": "user-management",
-    "/api/v1/academics/": "academic",
-    "/api/v1/courses/": "academic",
-    "/api/v1/subjects/": "academic",
-    "/api/v1/sessions/": "academic",
-    "/api/v1/attendance/": "attendance",
-    "/api/v1/notifications/": "notification",
-    "/api/v1/leaves/": "leave-management",
-    "/api/v1/leave/": "leave-management",
-    "/api/v1/feedback/": "feedback",
-    "/api/v1/assessments/": "assessment",
-    "/api/v1/assignments/": "assessment",
-    "/api/v1/submissions/": "assessment",
-    "/api/v1/exams/": "assessment",
-    "/api/v1/grades/": "assessment",
-    "/api/v1/results/": "assessment",
-    "/api/v1/finances/": "financial",
-    "/api/v1/fines/": "financial",
-    "/api/v1/payments/": "financial",
+# Route table: the longest matching prefix decides the service. Aliases are
+# rewritten onto the prefix the service actually mounts its URLs under.
+ROUTES = [
+    Route("/api/v1/users/", "user-management"),
+    Route("/api/v1/auth/", "user-management"),
+    Route("/api/v1/academics/", "academic"),
+    Route("/api/v1/courses/", "academic", rewrite="/api/v1/academics/courses/"),
+    Route("/api/v1/subjects/", "academic", rewrite="/api/v1/academics/subjects/"),
+    Route("/api/v1/sessions/", "academic", rewrite="/api/v1/academics/sessions/"),
+    Route("/api/v1/attendance/", "attendance"),
+    Route("/api/v1/notifications/", "notification"),
+    Route("/api/v1/leaves/", "leave-management"),
+    Route("/api/v1/leave/", "leave-management", rewrite="/api/v1/leaves/"),
+    Route("/api/v1/feedback/", "feedback"),
+    Route("/api/v1/assessments/", "assessment"),
+    Route(
+        "/api/v1/assignments/", "assessment", rewrite="/api/v1/assessments/assignments/"
+    ),
+    Route(
+        "/api/v1/submissions/", "assessment", rewrite="/api/v1/assessments/submissions/"
+    ),
+    Route("/api/v1/exams/", "assessment", rewrite="/api/v1/assessments/exams/"),
+    Route("/api/v1/grades/", "assessment", rewrite="/api/v1/assessments/grades/"),
+    Route("/api/v1/results/", "assessment", rewrite="/api/v1/assessments/results/"),
+    Route("/api/v1/finances/", "financial"),
+    Route("/api/v1/fines/", "financial", rewrite="/api/v1/finances/fines/"),
+    Route("/api/v1/payments/", "financial", rewrite="/api/v1/finances/payments/"),
+]
+
+# Optional JSON file of extra or replacement routes, reloaded when it changes
+# (a list of objects with the Route fields, e.g. {"prefix": ..., "service": ...})
+router = Router(ROUTES, config_path=os.environ.get("GATEWAY_ROUTES_FILE"))
+
+# Paths that are forwarded without authentication
+PUBLIC_PATHS = ["/api/v1/users/login/", "/api/v1/users/health/", "/health"]
+
+# Per-service overrides of the upstream pool settings in upstream.UPSTREAM_DEFAULTS
+UPSTREAM_OVERRIDES = {
+    "financial": {"read_timeout": 60},
+    "assessment": {"read_timeout": 60},
+    "attendance": {"pool_size": 40},
 }
 
+upstreams = UpstreamRegistry(SERVICES, UPSTREAM_OVERRIDES)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -55,8 +89,9 @@ def authenticate_request(f):
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Skip authentication for login and health check endpoints
-        if request.path in ["/api/v1/users/login/", "/api/v1/users/health/", "/health"]:
+        # Skip authentication for login, health check and public routes
+        route = router.match(request.path)
+        if request.path in PUBLIC_PATHS or (route is not None and not route.auth):
             return f(*args, **kwargs)
 
         token = request.headers.get("Authorization")
@@ -75,15 +110,22 @@ def authenticate_request(f):
                 logger.info("Development token accepted")
                 return f(*args, **kwargs)
 
-            # Validate token with user management service
-            response = requests.get(
-                f"{SERVICES['user-management']}/api/v1/users/validate-token/",
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=10,
-            )
-
-            if response.status_code != 200:
-                logger.warning(f"Token validation failed - allowing for development")
+            # Verify locally with the cached signing keys; only tokens from
+            # unknown issuers need a round trip to user management
+            try:
+                verifier.verify(token)
+            except UnknownIssuer:
+                response = upstreams.get("user-management").get(
+                    "/api/v1/users/validate-token/",
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+
+                if response.status_code != 200:
+                    logger.warning(f"Token validation failed - allowing for development")
+                    return f(*args, **kwargs)
+                verifier.remember(token)
+            except InvalidToken as e:
+                logger.warning(f"Token validation failed: {e} - allowing for development")
                 return f(*args, **kwargs)
 
         except Exception as e:
@@ -97,10 +139,8 @@ def authenticate_request(f):
 
 def get_service_for_path(path):
     """Determine which service should handle the request"""
-    for route_prefix, service_name in ROUTE_MAPPINGS.items():
-        if path.startswith(route_prefix):
-            return service_name
-    return None
+    route = router.match(path)
+    return route.service if route is not None else None
 
 
 @app.route("/")
@@ -158,12 +198,12 @@ def services_status():
     """Check status of all services"""
     status = {}
 
-    for service_name, service_url in SERVICES.items():
+    for service_name in SERVICES:
         try:
-            response = requests.get(
-                f"{service_url}/api/v1/users/health/"
+            response = upstreams.get(service_name).get(
+                "/api/v1/users/health/"
                 if service_name == "user-management"
-                else f"{service_url}/health",
+                else "/health",
                 timeout=5,
             )
             status[service_name] = {
@@ -176,6 +216,20 @@ def services_status():
     return jsonify(status)
 
 
+@app.route("/api/v1/services/pools")
+@authenticate_request
+def services_pools():
+    """Connection pool utilisation counters per upstream service"""
+    return jsonify(upstreams.stats())
+
+
+@app.route("/api/v1/services/routes")
+@authenticate_request
+def services_routes():
+    """Active route table, including routes loaded from GATEWAY_ROUTES_FILE"""
+    return jsonify([route.as_dict() for route in router.table.routes])
+
+
 @app.route("/api/v1/users/login/", methods=["POST"])
 def direct_login():
     """Direct login endpoint that bypasses problematic Django middleware"""
@@ -191,9 +245,9 @@ def direct_login():
         if not username or not password:
             return jsonify({"error": "Username and password required"}), 400
 
-        from auth_handler import authenticate_user
-
-        auth_result, status_code = authenticate_user(username, password)
+        auth_result, status_code = authenticate_user(
+            upstreams.get("user-management"), username, password
+        )
         return jsonify(auth_result), status_code
 
     except Exception as e:
@@ -206,29 +260,41 @@ def direct_login():
 def proxy_request(path):
     """Proxy requests to appropriate microservice"""
     full_path = f"/api/v1/{path}"
-    service_name = get_service_for_path(full_path)
+    route = router.match(full_path)
 
-    if not service_name:
+    if route is None:
         return jsonify({"error": "Service not found"}), 404
 
-    service_url = SERVICES.get(service_name)
-    if not service_url:
+    service_name = route.service
+
+    if service_name not in SERVICES:
         return jsonify({"error": "Service unavailable"}), 503
 
-    # Forward the request
+    # Forward the request, streaming both bodies through bounded buffers
     try:
-        target_url = f"{service_url}{full_path}"
-
-        # Forward headers (excluding host)
-        headers = {k: v for k, v in request.headers if k.lower() != "host"}
+        # Forward end-to-end headers (excluding host); Content-Length is
+        # recomputed by requests from the body stream
+        headers = dict(
+            end_to_end_headers(request.headers, exclude=("Host", "Content-Length"))
+        )
 
-        response = requests.request(
-            method=request.method,
-            url=target_url,
+        if request.content_length is not None:
+            body = RequestBodyStream(request.stream, request.content_length)
+        elif "chunked" in request.headers.get("Transfer-Encoding", "").lower():
+            body = iter(lambda: request.stream.read(STREAM_CHUNK_SIZE), b"")
+        else:
+            body = None
+
+        client = upstreams.get(service_name)
+        timeout = (client.timeout[0], route.timeout) if route.timeout else client.timeout
+        response = client.request(
+            request.method,
+            route.upstream_path(full_path),
             headers=headers,
-            data=request.get_data(),
+            data=body,
             params=request.args,
-            timeout=30,
+            stream=True,
+            timeout=timeout,
         )
 
         # Log the request
@@ -236,8 +302,22 @@ def proxy_request(path):
             f"Proxied {request.method} {full_path} to {service_name} - {response.status_code}"
         )
 
-        # Return the response
-        return response.content, response.status_code, dict(response.headers)
+        # Return the response body as it arrives; the raw (still encoded)
+        # bytes are relayed so Content-Encoding/Content-Length stay valid
+        response_headers = end_to_end_headers(response.raw.headers)
+        response_headers += route.cache_headers(
+            request.method, response.status_code, response_headers
+        )
+        proxied = Response(
+            iter_response_body(response),
+            status=response.status_code,
+            headers=response_headers,
+            direct_passthrough=True,
+        )
+        # The body generator only closes the upstream response once it has
+        # started, so a client that disconnects first would leave it open
+        proxied.call_on_close(response.close)
+        return proxied
 
     except requests.exceptions.Timeout:
         logger.error(f"Timeout calling {service_name}")
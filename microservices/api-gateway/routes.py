@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Compiled longest-prefix route table for the API Gateway
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often (seconds) the routes file is checked for changes
+ROUTES_RELOAD_INTERVAL = float(os.environ.get("GATEWAY_ROUTES_RELOAD_INTERVAL", 5))
+
+
+class Route:
+    """One prefix of the route table and the policy applied to its requests.
+
+    ``rewrite`` replaces the matched prefix before forwarding, ``timeout``
+    overrides the upstream read timeout, ``cache`` is a max-age (seconds)
+    added to successful GET responses that carry no Cache-Control of their
+    own, and ``auth=False`` skips token validation.
+    """
+
+    def __init__(self, prefix, service, rewrite=None, timeout=None, cache=None, auth=True):
+        if not prefix.startswith("/"):
+            raise ValueError(f"Route prefix must start with '/': {prefix!r}")
+        self.prefix = prefix
+        self.service = service
+        self.rewrite = rewrite
+        self.timeout = timeout
+        self.cache = cache
+        self.auth = auth
+
+    def upstream_path(self, path):
+        if self.rewrite is None:
+            return path
+        return self.rewrite + path[len(self.prefix):]
+
+    def cache_headers(self, method, status_code, headers):
+        """Extra response headers implementing the route's cache policy"""
+        if not self.cache or method != "GET" or status_code != 200:
+            return []
+        if any(name.lower() == "cache-control" for name, _ in headers):
+            return []
+        return [("Cache-Control", f"private, max-age={self.cache}")]
+
+    def as_dict(self):
+        return {
+            "prefix": self.prefix,
+            "service": self.service,
+            "rewrite": self.rewrite,
+            "timeout": self.timeout,
+            "cache": self.cache,
+            "auth": self.auth,
+        }
+
+    def __repr__(self):
+        return f"Route({self.prefix!r} -> {self.service!r})"
+
+
+class _Node:
+    __slots__ = ("children", "route", "subtree_route")
+
+    def __init__(self):
+        self.children = {}
+        # Route whose prefix ends exactly at this segment ("/api/v1/users")
+        self.route = None
+        # Route whose prefix ends with a slash after it ("/api/v1/users/")
+        self.subtree_route = None
+
+
+class RouteTable:
+    """Trie of path segments; lookups cost one dict probe per segment.
+
+    Prefixes match on whole segments, as with ``startswith`` for prefixes
+    ending in "/": the longest matching prefix wins regardless of the order
+    the routes were declared in.
+    """
+
+    def __init__(self, routes):
+        self.routes = list(routes)
+        self._root = _Node()
+        seen = set()
+        for route in self.routes:
+            if route.prefix in seen:
+                raise ValueError(f"Duplicate route prefix: {route.prefix!r}")
+            seen.add(route.prefix)
+
+            node = self._root
+            segments = route.prefix[1:].split("/")
+            subtree = segments[-1] == ""
+            if subtree:
+                segments.pop()
+            for segment in segments:
+                node = node.children.setdefault(segment, _Node())
+            if subtree:
+                node.subtree_route = route
+            else:
+                node.route = route
+
+    def match(self, path):
+        """Return the Route with the longest prefix of ``path``, or None"""
+        node = self._root
+        best = node.subtree_route
+        segments = path[1:].split("/")
+        last = len(segments) - 1
+        for index, segment in enumerate(segments):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            if node.route is not None:
+                best = node.route
+            if node.subtree_route is not None and index < last:
+                best = node.subtree_route
+        return best
+
+
+def routes_from_config(entries):
+    """Build Routes from dicts such as those in a GATEWAY_ROUTES_FILE"""
+    return [Route(**entry) for entry in entries]
+
+
+class Router:
+    """Holds the active RouteTable and rebuilds it when the routes file changes.
+
+    The default routes are always present; entries in the JSON file (a list of
+    Route fields) replace defaults with the same prefix or add new ones. A file
+    that fails to load leaves the previous table in place.
+    """
+
+    def __init__(self, default_routes, config_path=None, reload_interval=ROUTES_RELOAD_INTERVAL):
+        self.default_routes = list(default_routes)
+        self.config_path = config_path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0
+        self.table = RouteTable(self.default_routes)
+        self.reload()
+
+    def _load(self):
+        routes = {route.prefix: route for route in self.default_routes}
+        if self.config_path:
+            with open(self.config_path) as config:
+                for route in routes_from_config(json.load(config)):
+                    routes[route.prefix] = route
+        return RouteTable(routes.values())
+
+    def reload(self):
+        """Rebuild the table from the defaults and the routes file"""
+        with self._lock:
+            try:
+                self._mtime = os.stat(self.config_path).st_mtime if self.config_path else None
+                table = self._load()
+            except (OSError, ValueError, TypeError) as e:
+                # Not retried until the file changes again
+                logger.error(f"Keeping previous routes, could not load {self.config_path}: {e}")
+                return False
+            self.table = table
+            logger.info(f"Loaded {len(table.routes)} gateway routes")
+            return True
+
+    def _check_for_changes(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+        try:
+            mtime = os.stat(self.config_path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def match(self, path):
+        if self.config_path:
+            self._check_for_changes()
+        return self.table.match(path)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Local verification of simplejwt access tokens for the API Gateway
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+# simplejwt tokens carry no "iss" claim unless SIMPLE_JWT["ISSUER"] is set, so
+# tokens without one are attributed to user-management
+DEFAULT_ISSUER = "user-management"
+
+
+def _signing_keys(variable, default=""):
+    return [key for key in os.environ.get(variable, default).split(",") if key]
+
+
+# Issuers whose tokens are verified locally. Several keys may be listed per
+# issuer (comma separated in the environment) to allow key rotation; with no
+# keys configured every token falls back to remote validation.
+TRUSTED_ISSUERS = {
+    DEFAULT_ISSUER: {
+        "keys": _signing_keys("JWT_SIGNING_KEYS"),
+        "algorithms": ["HS256"],
+        "token_type": "access",
+    },
+}
+
+TOKEN_CACHE_SIZE = int(os.environ.get("GATEWAY_TOKEN_CACHE_SIZE", 10000))
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class UnknownIssuer(Exception):
+    """The token was not issued by a trusted issuer and must be checked remotely"""
+
+
+class TokenCache:
+    """Bounded LRU of token fingerprints whose entries expire with the token"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint):
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[fingerprint]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, fingerprint, claims, expires_at):
+        with self._lock:
+            self._entries[fingerprint] = (expires_at, claims)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class TokenVerifier:
+    """Verify access tokens against cached signing keys, remembering valid ones"""
+
+    def __init__(self, issuers, cache_size=TOKEN_CACHE_SIZE):
+        self.issuers = issuers
+        self.cache = TokenCache(cache_size)
+
+    @staticmethod
+    def fingerprint(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def remember(self, token):
+        """Cache a token that the issuer validated remotely until it expires"""
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            return
+        if "exp" in claims:
+            self.cache.put(self.fingerprint(token), claims, claims["exp"])
+
+    def verify(self, token):
+        """Return the token's claims.
+
+        Raises InvalidToken for bad or expired tokens and UnknownIssuer when
+        the token comes from an issuer without locally cached keys.
+        """
+        fingerprint = self.fingerprint(token)
+        claims = self.cache.get(fingerprint)
+        if claims is not None:
+            return claims
+
+        try:
+            unverified = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError as e:
+            raise InvalidToken(str(e))
+
+        issuer_name = unverified.get("iss", DEFAULT_ISSUER)
+        issuer = self.issuers.get(issuer_name)
+        if issuer is None or not issuer["keys"]:
+            raise UnknownIssuer(issuer_name)
+
+        claims = None
+        for key in issuer["keys"]:
+            try:
+                claims = jwt.decode(
+                    token,
+                    key,
+                    algorithms=issuer["algorithms"],
+                    options={"require": ["exp"]},
+                )
+                break
+            except jwt.InvalidSignatureError:
+                continue
+            except jwt.InvalidTokenError as e:
+                raise InvalidToken(str(e))
+        if claims is None:
+            raise InvalidToken("Signature verification failed")
+
+        if issuer.get("token_type") and claims.get("token_type") != issuer["token_type"]:
+            raise InvalidToken("Token has wrong type")
+
+        self.cache.put(fingerprint, claims, claims["exp"])
+        return claims
+
+
+verifier = TokenVerifier(TRUSTED_ISSUERS)
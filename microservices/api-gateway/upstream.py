@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Pooled, keep-alive HTTP clients for the services behind the API Gateway
+"""
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Settings applied to every upstream unless overridden (timeouts in seconds)
+UPSTREAM_DEFAULTS = {
+    "pool_size": 20,
+    "connect_timeout": 3.05,
+    "read_timeout": 30,
+    "retries": 2,
+}
+
+# Size of each chunk read from the client or the upstream while streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Connection-level headers that must not be forwarded by a proxy (RFC 7230 6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+}
+
+# Disable to fall back to a fresh connection per call (used for benchmarks)
+POOLING_ENABLED = os.environ.get("GATEWAY_POOLING", "on").lower() not in (
+    "0",
+    "off",
+    "false",
+)
+
+
+def _env_key(service_name, setting):
+    return f"GATEWAY_{service_name.upper().replace('-', '_')}_{setting.upper()}"
+
+
+def resolve_settings(service_name, overrides=None):
+    """Merge defaults, per-service overrides and environment variables.
+
+    ``GATEWAY_<SETTING>`` changes the default for every service and
+    ``GATEWAY_<SERVICE>_<SETTING>`` (e.g. ``GATEWAY_FINANCIAL_READ_TIMEOUT``)
+    changes a single service.
+    """
+    settings = dict(UPSTREAM_DEFAULTS)
+    settings.update(overrides or {})
+    for setting, default in UPSTREAM_DEFAULTS.items():
+        value = os.environ.get(
+            _env_key(service_name, setting),
+            os.environ.get(f"GATEWAY_{setting.upper()}"),
+        )
+        if value is not None:
+            settings[setting] = type(default)(value)
+    return settings
+
+
+def end_to_end_headers(headers, exclude=()):
+    """Drop hop-by-hop headers, including any named in the Connection header.
+
+    ``headers`` may be a mapping or an iterable of (name, value) pairs.
+    """
+    items = list(headers.items() if hasattr(headers, "items") else headers)
+    dropped = set(HOP_BY_HOP_HEADERS)
+    dropped.update(name.lower() for name in exclude)
+    for name, value in items:
+        if name.lower() == "connection":
+            dropped.update(token.strip().lower() for token in value.split(","))
+    return [(name, value) for name, value in items if name.lower() not in dropped]
+
+
+class RequestBodyStream:
+    """File-like view of an inbound body of known length.
+
+    requests sends it with a Content-Length taken from ``len()`` and reads it
+    in bounded blocks, so the body never has to be held in memory.
+    """
+
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size=STREAM_CHUNK_SIZE):
+        if size is None or size < 0:
+            size = STREAM_CHUNK_SIZE
+        return self.stream.read(size)
+
+    def __iter__(self):
+        return iter(lambda: self.stream.read(STREAM_CHUNK_SIZE), b"")
+
+
+def iter_response_body(response):
+    """Yield the raw upstream body in bounded chunks and release the connection"""
+    try:
+        yield from response.raw.stream(STREAM_CHUNK_SIZE, decode_content=False)
+    finally:
+        response.close()
+
+
+class UpstreamClient:
+    """requests.Session with a bounded keep-alive pool for one upstream service"""
+
+    def __init__(self, name, base_url, pool_size, connect_timeout, read_timeout, retries):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Only connection failures are retried: the request never reached the
+        # upstream, so this is safe for non-idempotent methods as well
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=0.05,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.total_errors = 0
+
+    def request(self, method, path, **kwargs):
+        """Send a request to ``base_url + path`` using the pooled session
+
+        With ``stream=True`` the request stays in flight until the response
+        is closed, as its body is still being read from the upstream.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        url = f"{self.base_url}{path}"
+
+        with self._lock:
+            self.in_flight += 1
+            self.total_requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if POOLING_ENABLED:
+                response = self.session.request(method, url, **kwargs)
+            else:
+                response = requests.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self.total_errors += 1
+                self.in_flight -= 1
+            raise
+        except BaseException:
+            self._finished()
+            raise
+
+        if kwargs.get("stream"):
+            self._finish_on_close(response)
+        else:
+            self._finished()
+        return response
+
+    def _finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _finish_on_close(self, response):
+        """Leave the in-flight count the first time ``response`` is closed"""
+        close = response.close
+        closed = False
+
+        def close_and_finish():
+            nonlocal closed
+            try:
+                close()
+            finally:
+                with self._lock:
+                    if not closed:
+                        closed = True
+                        self.in_flight -= 1
+
+        response.close = close_and_finish
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def stats(self):
+        """Pool utilisation counters for this upstream"""
+        connections_opened = 0
+        idle_connections = 0
+        for pool in self.adapter.poolmanager.pools._container.values():
+            connections_opened += pool.num_connections
+            idle_connections += sum(1 for conn in pool.pool.queue if conn is not None)
+
+        with self._lock:
+            return {
+                "base_url": self.base_url,
+                "pool_size": self.pool_size,
+                "connect_timeout": self.timeout[0],
+                "read_timeout": self.timeout[1],
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "total_requests": self.total_requests,
+                "total_errors": self.total_errors,
+                "connections_opened": connections_opened,
+                "idle_connections": idle_connections,
+            }
+
+    def close(self):
+        self.session.close()
+
+
+class UpstreamRegistry:
+    """One UpstreamClient per service, created lazily and shared across threads"""
+
+    def __init__(self, services, overrides=None):
+        self.services = services
+        self.overrides = overrides or {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, service_name):
+        client = self._clients.get(service_name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(service_name)
+                if client is None:
+                    settings = resolve_settings(
+                        service_name, self.overrides.get(service_name)
+                    )
+                    client = UpstreamClient(
+                        service_name, self.services[service_name], **settings
+                    )
+                    self._clients[service_name] = client
+                    logger.info(f"Created upstream pool for {service_name}: {settings}")
+        return client
+
+    def stats(self):
+        return {name: client.stats() for name, client in list(self._clients.items())}
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
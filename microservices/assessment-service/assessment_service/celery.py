@@ -29,6 +29,10 @@ app.conf.beat_schedule = {
         "task": "assessments.tasks.generate_grade_reports",
         "schedule": 604800.0,  # Weekly
     },
+    "calculate-class-rankings": {
+        "task": "assessments.tasks.calculate_class_rankings",
+        "schedule": 3600.0,  # Every hour, dirty periods only
+    },
     "cleanup-old-submissions": {
         "task": "assessments.tasks.cleanup_old_submissions",
         "schedule": 2592000.0,  # Monthly
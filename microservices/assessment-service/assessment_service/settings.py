@@ -213,6 +213,12 @@ ASSESSMENT_AUTO_GRADE_ENABLED = config(
 ASSESSMENT_LATE_SUBMISSION_PENALTY = config(
     "ASSESSMENT_LATE_SUBMISSION_PENALTY", default=10, cast=int
 )  # Percentage
+# Submissions graded per bulk update by auto_grade_assignments
+AUTO_GRADE_CHUNK_SIZE = config("AUTO_GRADE_CHUNK_SIZE", default=1000, cast=int)
+# Seconds a grade change waits so a burst of changes runs one calculation
+GRADE_CALCULATION_DEBOUNCE_SECONDS = config(
+    "GRADE_CALCULATION_DEBOUNCE_SECONDS", default=10, cast=int
+)
 
 # Logging
 LOGGING = {
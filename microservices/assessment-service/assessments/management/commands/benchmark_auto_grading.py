@@ -0,0 +1,159 @@
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from assessments.models import Assignment, Submission
+from assessments.tasks import (_auto_grade_marks, process_grade_calculation,
+                               run_auto_grading,
+                               send_submission_grade_notifications)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _NotificationHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the Notification Service; accepts every request"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    requests_received = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        type(self).requests_received += 1
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure auto-grading throughput and the notification calls it makes, "
+        "per submission against chunked. Notifications go to a local HTTP "
+        "server; rows are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--submissions", type=int, default=20000)
+        parser.add_argument("--assignments", type=int, default=20)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _NotificationHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+        try:
+            with override_settings(NOTIFICATION_SERVICE_URL=url), mock.patch.object(
+                process_grade_calculation, "apply_async"
+            ):
+                for label, grade in (
+                    ("per submission", self._grade_per_submission),
+                    ("chunked", lambda: self._grade_chunked(options["chunk_size"])),
+                ):
+                    try:
+                        with transaction.atomic():
+                            self._populate(
+                                options["submissions"], options["assignments"]
+                            )
+                            self._measure(label, grade)
+                            raise _Rollback
+                    except _Rollback:
+                        pass
+        finally:
+            server.shutdown()
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def _populate(self, submissions, assignments):
+        due_date = timezone.now() + timedelta(days=7)
+        assignment_rows = Assignment.objects.bulk_create(
+            Assignment(
+                title=f"Benchmark assignment {i}",
+                description="Benchmark",
+                course_id="BSC",
+                course_name="BSc",
+                subject_id=str(i),
+                subject_name=f"Subject {i}",
+                academic_year="2024-25",
+                semester="1",
+                due_date=due_date,
+                status="PUBLISHED",
+                created_by="benchmark",
+            )
+            for i in range(assignments)
+        )
+        lengths = [50, 150, 350, 600]
+        Submission.objects.bulk_create(
+            (
+                Submission(
+                    assignment=assignment_rows[i % assignments],
+                    student_id=str(i),
+                    student_name=f"Student {i}",
+                    student_email=f"student{i}@example.com",
+                    submission_text="word " * lengths[i % len(lengths)],
+                    status="SUBMITTED",
+                )
+                for i in range(submissions)
+            ),
+            batch_size=1000,
+        )
+
+    def _measure(self, label, grade):
+        _NotificationHandler.requests_received = 0
+        started = time.perf_counter()
+        graded = grade()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label:<15} submissions={graded:<6} "
+            f"notification calls={_NotificationHandler.requests_received:<6} "
+            f"{elapsed:7.2f}s {graded / elapsed:8.1f} submissions/s"
+        )
+
+    def _grade_per_submission(self):
+        """The previous behaviour: a save and a notification per submission"""
+        submissions = Submission.objects.filter(
+            assignment__status="PUBLISHED",
+            status="SUBMITTED",
+            marks_obtained__isnull=True,
+        ).select_related("assignment")
+        graded = 0
+        for submission in submissions:
+            submission.word_count = len(submission.submission_text.split())
+            submission.marks_obtained = _auto_grade_marks(
+                submission.assignment.max_marks, submission.word_count
+            )
+            submission.status = "GRADED"
+            submission.graded_at = timezone.now()
+            submission.graded_by = "auto_grader"
+            submission.teacher_feedback = "Auto-graded based on submission criteria."
+            submission.save()
+            requests.post(
+                f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/notifications/notifications/",
+                json={"recipient_id": submission.student_id},
+                timeout=10,
+            )
+            graded += 1
+        return graded
+
+    def _grade_chunked(self, chunk_size):
+        # Notifications are sent inline rather than from a worker
+        metrics = run_auto_grading(
+            send_submission_grade_notifications, chunk_size=chunk_size
+        )
+        return metrics["graded"]
@@ -0,0 +1,124 @@
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Avg, Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from assessments.models import Grade
+from assessments.tasks import (process_grade_calculation,
+                               schedule_grade_calculation)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries and time to calculate one student's results, and the "
+        "calculations queued for a burst of grade saves. Rows are created "
+        "inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grades", type=int, default=200)
+        parser.add_argument("--subjects", type=int, default=8)
+        parser.add_argument("--semesters", type=int, default=2)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._populate(
+                    options["grades"], options["subjects"], options["semesters"]
+                )
+                self._measure("previous reads", self._previous_reads)
+                self._measure(
+                    "calculation", lambda: process_grade_calculation("1", "BSC")
+                )
+                self._measure_burst(options["grades"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def _populate(self, grades, subjects, semesters):
+        now = timezone.now()
+        Grade.objects.bulk_create(
+            Grade(
+                student_id="1",
+                student_name="Student 1",
+                student_email="student1@example.com",
+                course_id="BSC",
+                course_name="BSc",
+                subject_id=str(i % subjects),
+                subject_name=f"Subject {i % subjects}",
+                academic_year="2024-25",
+                semester=str(i % semesters + 1),
+                grade_type="ASSIGNMENT",
+                assessment_id=str(i),
+                assessment_title=f"Assignment {i}",
+                marks_obtained=Decimal(40 + i % 60),
+                max_marks=Decimal(100),
+                percentage=Decimal(40 + i % 60),
+                letter_grade="B",
+                grade_points=Decimal("3.00"),
+                is_passed=True,
+                graded_by="1",
+                grader_name="Teacher",
+                graded_at=now,
+                weightage=Decimal(10),
+            )
+            for i in range(grades)
+        )
+
+    def _measure(self, label, calculate):
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            calculate()
+        elapsed = time.perf_counter() - started
+        grade_reads = sum(
+            'FROM "grades"' in query["sql"] for query in ctx.captured_queries
+        )
+        self.stdout.write(
+            f"{label:<15} queries={len(ctx.captured_queries):<5} "
+            f"grade reads={grade_reads:<5} {elapsed * 1000:8.1f}ms"
+        )
+
+    def _previous_reads(self):
+        """The reads of the previous per-period, per-subject calculation"""
+        grades = Grade.objects.filter(student_id="1", course_id="BSC")
+        grades.exists()
+        for period in grades.values("academic_year", "semester").distinct():
+            period_grades = grades.filter(**period)
+            period_grades.aggregate(total=Sum("weightage"))
+            sum(grade.percentage * grade.weightage / 100 for grade in period_grades)
+            period_grades.aggregate(avg=Avg("grade_points"))
+            for _ in range(3):
+                period_grades.first()
+            period_grades.values("subject_id").distinct().count()
+            for is_passed in (True, False):
+                period_grades.filter(is_passed=is_passed).values(
+                    "subject_id"
+                ).distinct().count()
+            subject_ids = {grade.subject_id for grade in period_grades}
+            for subject_id in subject_ids:
+                subject_grades = period_grades.filter(subject_id=subject_id)
+                subject_grades.aggregate(total=Sum("max_marks"))
+                subject_grades.aggregate(total=Sum("marks_obtained"))
+
+    def _measure_burst(self, grades):
+        queued = []
+        with mock.patch.object(
+            process_grade_calculation, "apply_async", lambda *a, **kw: queued.append(a)
+        ):
+            for _ in range(grades):
+                schedule_grade_calculation("1", "BSC")
+        self.stdout.write(
+            f"{'burst':<15} grade saves={grades} calculations queued={len(queued)} "
+            f"(previously {grades})"
+        )
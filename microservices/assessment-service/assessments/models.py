@@ -487,3 +487,38 @@ class StudentResult(models.Model):
 
     def __str__(self):
         return f"{self.student_name} - {self.course_name} ({self.academic_year} {self.semester})"
+
+
+class RankingPeriod(models.Model):
+    """Dirty marker for the class rankings of one course and academic period.
+
+    ``changed_at`` moves whenever a result in the period changes in a way that
+    can affect ranks; the period needs ranking while it is newer than
+    ``ranked_at``.
+    """
+
+    course_id = models.CharField(max_length=100)
+    academic_year = models.CharField(max_length=20)
+    semester = models.CharField(max_length=20)
+
+    changed_at = models.DateTimeField(default=timezone.now)
+    ranked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "ranking_periods"
+        indexes = [
+            models.Index(fields=["changed_at"]),
+        ]
+        unique_together = ["course_id", "academic_year", "semester"]
+
+    def __str__(self):
+        return f"{self.course_id} ({self.academic_year} {self.semester})"
+
+    @classmethod
+    def mark_dirty(cls, course_id, academic_year, semester):
+        cls.objects.update_or_create(
+            course_id=course_id,
+            academic_year=academic_year,
+            semester=semester,
+            defaults={"changed_at": timezone.now()},
+        )
@@ -1,11 +1,21 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import Assignment, Grade, StudentResult, Submission
-from .tasks import (process_grade_calculation, send_assignment_notification,
+from .models import Assignment, Grade, RankingPeriod, StudentResult, Submission
+from .tasks import (schedule_grade_calculation, send_assignment_notification,
                     send_grade_notifications)
 
+# StudentResult fields that decide class ranks
+RANKING_FIELDS = [
+    "course_id",
+    "academic_year",
+    "semester",
+    "result_status",
+    "semester_gpa",
+    "overall_percentage",
+]
+
 
 @receiver(post_save, sender=Assignment)
 def handle_assignment_created(sender, instance, created, **kwargs):
@@ -46,9 +56,7 @@ def handle_submission_created(sender, instance, created, **kwargs):
 
     # If submission is graded, trigger grade calculation
     if instance.status == "GRADED" and instance.marks_obtained is not None:
-        process_grade_calculation.delay(
-            instance.student_id, instance.assignment.course_id
-        )
+        schedule_grade_calculation(instance.student_id, instance.assignment.course_id)
 
 
 @receiver(post_save, sender=Grade)
@@ -59,7 +67,7 @@ def handle_grade_created(sender, instance, created, **kwargs):
         send_grade_notifications.delay(instance.id)
 
         # Trigger result calculation
-        process_grade_calculation.delay(instance.student_id, instance.course_id)
+        schedule_grade_calculation(instance.student_id, instance.course_id)
 
 
 @receiver(post_save, sender=StudentResult)
@@ -87,7 +95,37 @@ def track_result_changes(sender, instance, **kwargs):
             instance._status_changed = (
                 old_instance.result_status != instance.result_status
             )
+            instance._ranking_changed = any(
+                getattr(old_instance, field) != getattr(instance, field)
+                for field in RANKING_FIELDS
+            )
+            instance._previous_period = (
+                old_instance.course_id,
+                old_instance.academic_year,
+                old_instance.semester,
+            )
         except StudentResult.DoesNotExist:
             instance._status_changed = False
+            instance._ranking_changed = True
     else:
         instance._status_changed = False
+        instance._ranking_changed = True
+
+
+@receiver(post_save, sender=StudentResult)
+def mark_ranking_dirty(sender, instance, created, **kwargs):
+    """Queue the result's period, and any period it moved out of, for the
+    next class ranking run"""
+    period = (instance.course_id, instance.academic_year, instance.semester)
+    previous_period = instance.__dict__.pop("_previous_period", period)
+    if created or getattr(instance, "_ranking_changed", True):
+        RankingPeriod.mark_dirty(*period)
+    if previous_period != period:
+        RankingPeriod.mark_dirty(*previous_period)
+
+
+@receiver(post_delete, sender=StudentResult)
+def mark_ranking_dirty_on_delete(sender, instance, **kwargs):
+    RankingPeriod.mark_dirty(
+        instance.course_id, instance.academic_year, instance.semester
+    )
@@ -1,9 +1,15 @@
 import logging
+import time
 from datetime import timedelta
+from decimal import Decimal
 
 import requests
 from celery import shared_task
-from django.db.models import Avg, Count, Q, Sum
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, Q, Sum, Window
+from django.db.models.functions import Cast, Rank
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
@@ -55,47 +61,96 @@ def send_assignment_notification(assignment_id, action):
         logger.error(f"Error sending assignment notification: {str(e)}")
 
 
+def _grade_calculation_key(student_id, course_id):
+    return f"assessments:grade-calculation:{student_id}:{course_id}"
+
+
+def schedule_grade_calculation(student_id, course_id):
+    """Queue process_grade_calculation once for a burst of grade changes.
+
+    The first change in a burst schedules the calculation
+    GRADE_CALCULATION_DEBOUNCE_SECONDS later; changes made before it starts
+    are picked up by that run instead of queueing their own.
+    """
+    delay = settings.GRADE_CALCULATION_DEBOUNCE_SECONDS
+    # The key expires on its own in case the scheduled task is lost
+    if cache.add(_grade_calculation_key(student_id, course_id), True, delay * 5):
+        process_grade_calculation.apply_async((student_id, course_id), countdown=delay)
+
+
 @shared_task
 def process_grade_calculation(student_id, course_id):
     """Calculate and update student grades and results"""
     from .models import Grade, StudentResult
 
+    # Changes from here on schedule another run
+    cache.delete(_grade_calculation_key(student_id, course_id))
+
     try:
-        # Get all grades for the student in the course
         grades = Grade.objects.filter(student_id=student_id, course_id=course_id)
 
-        if not grades.exists():
-            return
-
-        # Group by academic year and semester
-        academic_periods = grades.values("academic_year", "semester").distinct()
+        # Per-subject totals for every academic period in one grouped query
+        subject_totals = (
+            grades.values("academic_year", "semester", "subject_id")
+            .annotate(
+                total_marks=Sum("max_marks"),
+                obtained_marks=Sum("marks_obtained"),
+                total_weightage=Sum("weightage"),
+                weighted_sum=Sum(F("percentage") * F("weightage") / 100),
+                percentage_sum=Sum("percentage"),
+                grade_points_sum=Sum("grade_points"),
+                grade_count=Count("id"),
+                passed_count=Count("id", filter=Q(is_passed=True)),
+            )
+            .order_by()
+        )
+        periods = {}
+        for totals in subject_totals:
+            period = (totals["academic_year"], totals["semester"])
+            periods.setdefault(period, {"subjects": {}, "assessments": []})
+            periods[period]["subjects"][totals["subject_id"]] = totals
 
-        for period in academic_periods:
-            academic_year = period["academic_year"]
-            semester = period["semester"]
+        if not periods:
+            return
 
-            period_grades = grades.filter(
-                academic_year=academic_year, semester=semester
+        # The assessments listed in the subject results, newest first
+        for grade in grades.values(
+            "academic_year",
+            "semester",
+            "subject_id",
+            "subject_name",
+            "student_name",
+            "student_email",
+            "course_name",
+            "assessment_title",
+            "grade_type",
+            "marks_obtained",
+            "max_marks",
+            "percentage",
+            "letter_grade",
+        ):
+            periods[(grade["academic_year"], grade["semester"])]["assessments"].append(
+                grade
             )
 
+        for (academic_year, semester), period in periods.items():
+            subjects = period["subjects"].values()
+            latest = period["assessments"][0]
+
             # Calculate weighted average
-            total_weightage = (
-                period_grades.aggregate(total=Sum("weightage"))["total"] or 0
-            )
+            total_weightage = sum(totals["total_weightage"] for totals in subjects)
+            grade_count = sum(totals["grade_count"] for totals in subjects)
 
             if total_weightage > 0:
-                weighted_sum = sum(
-                    (grade.percentage * grade.weightage / 100)
-                    for grade in period_grades
-                )
+                weighted_sum = sum(totals["weighted_sum"] for totals in subjects)
                 overall_percentage = (weighted_sum / total_weightage) * 100
             else:
                 overall_percentage = (
-                    period_grades.aggregate(avg=Avg("percentage"))["avg"] or 0
+                    sum(totals["percentage_sum"] for totals in subjects) / grade_count
                 )
 
             # Calculate GPA
-            gpa = period_grades.aggregate(avg=Avg("grade_points"))["avg"] or 0
+            gpa = sum(totals["grade_points_sum"] for totals in subjects) / grade_count
 
             # Update or create student result
             result, created = StudentResult.objects.update_or_create(
@@ -104,26 +159,26 @@ def process_grade_calculation(student_id, course_id):
                 academic_year=academic_year,
                 semester=semester,
                 defaults={
-                    "student_name": period_grades.first().student_name,
-                    "student_email": period_grades.first().student_email,
-                    "course_name": period_grades.first().course_name,
-                    "total_subjects": period_grades.values("subject_id")
-                    .distinct()
-                    .count(),
-                    "subjects_passed": period_grades.filter(is_passed=True)
-                    .values("subject_id")
-                    .distinct()
-                    .count(),
-                    "subjects_failed": period_grades.filter(is_passed=False)
-                    .values("subject_id")
-                    .distinct()
-                    .count(),
+                    "student_name": latest["student_name"],
+                    "student_email": latest["student_email"],
+                    "course_name": latest["course_name"],
+                    "total_subjects": len(subjects),
+                    "subjects_passed": sum(
+                        1 for totals in subjects if totals["passed_count"]
+                    ),
+                    "subjects_failed": sum(
+                        1
+                        for totals in subjects
+                        if totals["passed_count"] < totals["grade_count"]
+                    ),
                     "semester_gpa": gpa,
                     "overall_percentage": overall_percentage,
                     "overall_grade": _calculate_letter_grade(overall_percentage),
                     "is_promoted": overall_percentage >= 40,
                     "generated_by": "system",
-                    "subject_results": _build_subject_results(period_grades),
+                    "subject_results": _build_subject_results(
+                        period["assessments"], period["subjects"]
+                    ),
                 },
             )
 
@@ -153,15 +208,15 @@ def _calculate_letter_grade(percentage):
         return "F"
 
 
-def _build_subject_results(grades):
-    """Build detailed subject results"""
+def _build_subject_results(grades, subject_totals):
+    """Build detailed subject results from grade rows and per-subject totals"""
     subjects = {}
 
     for grade in grades:
-        subject_id = grade.subject_id
+        subject_id = grade["subject_id"]
         if subject_id not in subjects:
             subjects[subject_id] = {
-                "subject_name": grade.subject_name,
+                "subject_name": grade["subject_name"],
                 "assessments": [],
                 "total_marks": 0,
                 "obtained_marks": 0,
@@ -172,24 +227,20 @@ def _build_subject_results(grades):
 
         subjects[subject_id]["assessments"].append(
             {
-                "assessment_title": grade.assessment_title,
-                "assessment_type": grade.grade_type,
-                "marks_obtained": float(grade.marks_obtained),
-                "max_marks": float(grade.max_marks),
-                "percentage": float(grade.percentage),
-                "grade": grade.letter_grade,
+                "assessment_title": grade["assessment_title"],
+                "assessment_type": grade["grade_type"],
+                "marks_obtained": float(grade["marks_obtained"]),
+                "max_marks": float(grade["max_marks"]),
+                "percentage": float(grade["percentage"]),
+                "grade": grade["letter_grade"],
             }
         )
 
-    # Calculate subject-wise totals
+    # Subject-wise totals come from the grouped query
     for subject_id, subject_data in subjects.items():
-        subject_grades = grades.filter(subject_id=subject_id)
-        subject_data["total_marks"] = (
-            subject_grades.aggregate(total=Sum("max_marks"))["total"] or 0
-        )
-        subject_data["obtained_marks"] = (
-            subject_grades.aggregate(total=Sum("marks_obtained"))["total"] or 0
-        )
+        totals = subject_totals[subject_id]
+        subject_data["total_marks"] = float(totals["total_marks"] or 0)
+        subject_data["obtained_marks"] = float(totals["obtained_marks"] or 0)
 
         if subject_data["total_marks"] > 0:
             subject_data["percentage"] = (
@@ -353,73 +404,103 @@ def cleanup_old_submissions():
 @shared_task
 def sync_user_data():
     """Sync user data from User Management Service"""
-    from django.conf import settings
+    from .models import Grade, Submission
+    from .users import sync_users
 
     try:
-        # Get updated user information
-        response = requests.get(
-            f"{settings.USER_MANAGEMENT_SERVICE_URL}/api/v1/users/users/", timeout=30
+        # Update user information in grades and submissions
+        return sync_users(
+            [
+                (
+                    Submission.objects.all(),
+                    "student_id",
+                    "student_name",
+                    "student_email",
+                ),
+                (Grade.objects.all(), "student_id", "student_name", "student_email"),
+            ]
         )
 
-        if response.status_code == 200:
-            users = response.json().get("results", [])
-
-            # Update user information in grades and submissions
-            for user in users:
-                user_id = user.get("id")
-                user_name = (
-                    f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
-                )
-                user_email = user.get("email", "")
+    except Exception as e:
+        logger.error(f"Error syncing user data: {str(e)}")
 
-                if user_id:
-                    # Update submissions
-                    from .models import Submission
 
-                    Submission.objects.filter(student_id=user_id).update(
-                        student_name=user_name, student_email=user_email
-                    )
+def _rank_period(course_id, academic_year, semester):
+    """Rank a period's published results with one window query.
 
-                    # Update grades
-                    from .models import Grade
+    Ties share a rank; only results whose rank changed are written.
+    """
+    from .models import StudentResult
 
-                    Grade.objects.filter(student_id=user_id).update(
-                        student_name=user_name, student_email=user_email
-                    )
+    results = (
+        StudentResult.objects.filter(
+            course_id=course_id,
+            academic_year=academic_year,
+            semester=semester,
+            result_status="PUBLISHED",
+        )
+        .annotate(
+            rank=Window(
+                expression=Rank(),
+                # Cast: Django 4.2 on SQLite wraps a window ordered by a
+                # decimal column in an invalid CAST(ORDER BY ...)
+                order_by=[
+                    Cast("semester_gpa", FloatField()).desc(nulls_last=True),
+                    Cast("overall_percentage", FloatField()).desc(nulls_last=True),
+                ],
+            )
+        )
+        .only("id", "class_rank")
+    )
 
-            logger.info(f"Synced data for {len(users)} users")
-        else:
-            logger.error(f"Failed to sync user data: {response.text}")
+    changed = []
+    for result in results:
+        if result.class_rank != result.rank:
+            result.class_rank = result.rank
+            changed.append(result)
 
-    except Exception as e:
-        logger.error(f"Error syncing user data: {str(e)}")
+    StudentResult.objects.bulk_update(changed, ["class_rank"], batch_size=500)
+    return len(changed)
 
 
 @shared_task
-def calculate_class_rankings():
-    """Calculate class rankings based on GPA and performance"""
-    from .models import StudentResult
+def calculate_class_rankings(full=False):
+    """Calculate class rankings based on GPA and performance
+
+    Only periods marked dirty since their last ranking are recomputed; pass
+    ``full=True`` (or run before any period has been marked) to rank every
+    period and create the markers.
+    """
+    from .models import RankingPeriod, StudentResult
 
     try:
-        # Group by course and academic period
-        academic_periods = StudentResult.objects.values(
-            "course_id", "academic_year", "semester"
-        ).distinct()
-
-        for period in academic_periods:
-            results = StudentResult.objects.filter(
-                course_id=period["course_id"],
-                academic_year=period["academic_year"],
-                semester=period["semester"],
-                result_status="PUBLISHED",
-            ).order_by("-semester_gpa", "-overall_percentage")
-
-            # Update rankings
-            for rank, result in enumerate(results, 1):
-                result.class_rank = rank
-                result.save(update_fields=["class_rank"])
-
-        logger.info("Updated class rankings")
+        if full or not RankingPeriod.objects.exists():
+            # Group by course and academic period
+            academic_periods = StudentResult.objects.values(
+                "course_id", "academic_year", "semester"
+            ).distinct()
+            for period in academic_periods:
+                RankingPeriod.objects.get_or_create(**period)
+            periods = RankingPeriod.objects.all()
+        else:
+            periods = RankingPeriod.objects.filter(
+                Q(ranked_at__isnull=True) | Q(changed_at__gt=F("ranked_at"))
+            )
+
+        ranked = updated = 0
+        for period in periods:
+            # Changes made while ranking keep changed_at after ranked_at
+            started = timezone.now()
+            with transaction.atomic():
+                updated += _rank_period(
+                    period.course_id, period.academic_year, period.semester
+                )
+                RankingPeriod.objects.filter(pk=period.pk).update(ranked_at=started)
+            ranked += 1
+
+        logger.info(
+            f"Updated class rankings: {ranked} periods ranked, {updated} ranks changed"
+        )
 
     except Exception as e:
         logger.error(f"Error calculating class rankings: {str(e)}")
@@ -468,51 +549,203 @@ def send_grade_notifications(grade_id):
         logger.error(f"Error sending grade notification: {str(e)}")
 
 
-@shared_task
-def auto_grade_assignments():
-    """Auto-grade assignments that support automatic grading"""
-    from .models import Assignment, Submission
+# Notification Service bulk endpoint accepts up to this many recipients
+NOTIFICATION_BULK_LIMIT = 1000
 
-    try:
-        # Get assignments with auto-grading enabled
-        auto_grade_assignments = Assignment.objects.filter(
-            status="PUBLISHED"
+_notification_session = None
+
+
+def _get_notification_session():
+    """Process-wide session so batched calls reuse pooled keep-alive connections"""
+    global _notification_session
+    if _notification_session is None:
+        _notification_session = requests.Session()
+    return _notification_session
+
+
+def _auto_grade_marks(max_marks, word_count):
+    """Simple auto-grading logic (can be enhanced)"""
+    # Basic scoring based on word count (example)
+    if word_count >= 500:
+        return max_marks * Decimal("0.9")
+    elif word_count >= 300:
+        return max_marks * Decimal("0.7")
+    elif word_count >= 100:
+        return max_marks * Decimal("0.5")
+    return max_marks * Decimal("0.3")
+
+
+def run_auto_grading(notify, chunk_size=None):
+    """Auto-grade submitted work chunk by chunk.
+
+    Each chunk is graded with one bulk_update and its submission ids are
+    handed to ``notify``. Returns the run's throughput metrics.
+    """
+    from .models import Submission
+
+    chunk_size = chunk_size or settings.AUTO_GRADE_CHUNK_SIZE
+    started = time.perf_counter()
+
+    # Get submissions of assignments with auto-grading enabled
+    ungraded_submissions = (
+        Submission.objects.filter(
+            assignment__status="PUBLISHED",
             # Add more criteria for auto-gradable assignments
+            status="SUBMITTED",
+            marks_obtained__isnull=True,
         )
-
-        for assignment in auto_grade_assignments:
-            ungraded_submissions = assignment.submissions.filter(
-                status="SUBMITTED", marks_obtained__isnull=True
+        .exclude(submission_text="")
+        .select_related("assignment")
+        .only(
+            "id",
+            "student_id",
+            "submission_text",
+            "assignment__course_id",
+            "assignment__max_marks",
+        )
+        .order_by("pk")
+    )
+
+    graded = chunks = 0
+    last_pk = None
+    while True:
+        chunk_submissions = ungraded_submissions
+        if last_pk is not None:
+            chunk_submissions = chunk_submissions.filter(pk__gt=last_pk)
+        submissions = list(chunk_submissions[:chunk_size])
+        if not submissions:
+            break
+
+        # Marks only depend on the word count band, so submissions sharing
+        # an assignment and band are graded with a single UPDATE
+        bands = {}
+        for submission in submissions:
+            max_marks = submission.assignment.max_marks
+            submission.word_count = len(submission.submission_text.split())
+            submission.marks_obtained = _auto_grade_marks(
+                max_marks, submission.word_count
             )
+            # Mirrors Submission.save()
+            if max_marks:
+                submission.percentage = (submission.marks_obtained / max_marks) * 100
+            bands.setdefault(
+                (submission.marks_obtained, submission.percentage), []
+            ).append(submission.pk)
+
+        with transaction.atomic():
+            Submission.objects.bulk_update(
+                submissions, ["word_count"], batch_size=500
+            )
+            now = timezone.now()
+            for (marks_obtained, percentage), pks in bands.items():
+                Submission.objects.filter(pk__in=pks).update(
+                    marks_obtained=marks_obtained,
+                    percentage=percentage,
+                    status="GRADED",
+                    graded_at=now,
+                    graded_by="auto_grader",
+                    teacher_feedback="Auto-graded based on submission criteria.",
+                    last_modified=now,
+                )
+
+        # bulk_update skips the post_save signal that recalculates results
+        for student_id, course_id in {
+            (submission.student_id, submission.assignment.course_id)
+            for submission in submissions
+        }:
+            schedule_grade_calculation(student_id, course_id)
+
+        notify([str(submission.id) for submission in submissions])
+        last_pk = submissions[-1].pk
+        graded += len(submissions)
+        chunks += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        "graded": graded,
+        "chunks": chunks,
+        "elapsed_seconds": round(elapsed, 3),
+        "submissions_per_second": round(graded / elapsed, 1) if elapsed else 0,
+    }
 
-            for submission in ungraded_submissions:
-                # Simple auto-grading logic (can be enhanced)
-                if submission.submission_text:
-                    word_count = len(submission.submission_text.split())
-                    submission.word_count = word_count
-
-                    # Basic scoring based on word count (example)
-                    if word_count >= 500:
-                        submission.marks_obtained = assignment.max_marks * 0.9
-                    elif word_count >= 300:
-                        submission.marks_obtained = assignment.max_marks * 0.7
-                    elif word_count >= 100:
-                        submission.marks_obtained = assignment.max_marks * 0.5
-                    else:
-                        submission.marks_obtained = assignment.max_marks * 0.3
-
-                    submission.status = "GRADED"
-                    submission.graded_at = timezone.now()
-                    submission.graded_by = "auto_grader"
-                    submission.teacher_feedback = (
-                        "Auto-graded based on submission criteria."
-                    )
-                    submission.save()
-
-                    # Send grade notification
-                    send_grade_notifications.delay(submission.id)
-
-        logger.info("Auto-grading completed")
+
+@shared_task
+def send_submission_grade_notifications(submission_ids):
+    """Notify students of graded submissions through the bulk endpoint.
+
+    Students with the same marks on an assignment get the same message, so
+    they share bulk requests of up to NOTIFICATION_BULK_LIMIT recipients.
+    """
+    from .models import Submission
+
+    groups = {}
+    for submission in Submission.objects.filter(id__in=submission_ids).values(
+        "student_id",
+        "assignment_id",
+        "assignment__title",
+        "assignment__course_name",
+        "assignment__max_marks",
+        "marks_obtained",
+        "percentage",
+    ):
+        key = (submission["assignment_id"], submission["marks_obtained"])
+        groups.setdefault(key, {"submission": submission, "recipient_ids": []})
+        groups[key]["recipient_ids"].append(submission["student_id"])
+
+    session = _get_notification_session()
+    sent = failed = 0
+    for group in groups.values():
+        submission = group["submission"]
+        notification_data = {
+            "channel": "in_app",
+            "priority": "normal",
+            "subject": f"Assignment Graded: {submission['assignment__title']}",
+            "message": (
+                f'Your submission for "{submission["assignment__title"]}" has been '
+                f"graded: {submission['marks_obtained']}/"
+                f"{submission['assignment__max_marks']} "
+                f"({submission['percentage']:.2f}%)."
+            ),
+            "context": {
+                "assignment_id": str(submission["assignment_id"]),
+                "assignment_title": submission["assignment__title"],
+                "course_name": submission["assignment__course_name"],
+                "marks_obtained": float(submission["marks_obtained"]),
+                "percentage": float(submission["percentage"]),
+            },
+        }
+
+        recipient_ids = group["recipient_ids"]
+        for start in range(0, len(recipient_ids), NOTIFICATION_BULK_LIMIT):
+            batch = recipient_ids[start : start + NOTIFICATION_BULK_LIMIT]
+            try:
+                response = session.post(
+                    f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/notifications/notifications/bulk_create/",
+                    json={**notification_data, "recipient_ids": batch},
+                    timeout=30,
+                )
+            except requests.RequestException as e:
+                logger.error(f"Error sending grade notifications: {str(e)}")
+                failed += len(batch)
+                continue
+
+            if response.status_code == 201:
+                sent += len(batch)
+            else:
+                logger.error(f"Failed to send grade notifications: {response.text}")
+                failed += len(batch)
+
+    logger.info(f"Grade notifications sent: {sent}, failed: {failed}")
+    return {"sent": sent, "failed": failed}
+
+
+@shared_task
+def auto_grade_assignments():
+    """Auto-grade assignments that support automatic grading"""
+    try:
+        metrics = run_auto_grading(send_submission_grade_notifications.delay)
+        logger.info(f"Auto-grading completed: {metrics}")
+        return metrics
 
     except Exception as e:
         logger.error(f"Error in auto-grading: {str(e)}")
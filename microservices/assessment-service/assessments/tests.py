@@ -0,0 +1,350 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import Assignment, Grade, StudentResult, Submission
+from .tasks import (calculate_class_rankings, process_grade_calculation,
+                    run_auto_grading, send_grade_notifications,
+                    send_submission_grade_notifications, sync_user_data)
+from .users import SYNC_CURSOR_KEY
+
+
+class ClassRankingTests(TestCase):
+    """Ranks come from one window query per period that changed"""
+
+    def _add_result(self, student_id, gpa, percentage, semester="1", **fields):
+        return StudentResult.objects.create(
+            student_id=student_id,
+            student_name=f"Student {student_id}",
+            student_email=f"student{student_id}@example.com",
+            course_id="BSC",
+            course_name="BSc",
+            academic_year="2024-25",
+            semester=semester,
+            semester_gpa=gpa,
+            overall_percentage=percentage,
+            result_status=fields.pop("result_status", "PUBLISHED"),
+            generated_by="system",
+            **fields,
+        )
+
+    def _ranks(self):
+        return dict(
+            StudentResult.objects.values_list("student_id", "class_rank").order_by(
+                "student_id"
+            )
+        )
+
+    def test_ties_share_a_rank_and_drafts_are_not_ranked(self):
+        self._add_result("1", Decimal("3.50"), Decimal("80"))
+        self._add_result("2", Decimal("3.90"), Decimal("95"))
+        self._add_result("3", Decimal("3.50"), Decimal("80"))
+        self._add_result("4", None, None)
+        self._add_result("5", Decimal("2.00"), Decimal("50"))
+        self._add_result("6", Decimal("4.00"), Decimal("99"), result_status="DRAFT")
+
+        calculate_class_rankings()
+
+        self.assertEqual(
+            self._ranks(),
+            {"1": 2, "2": 1, "3": 2, "4": 5, "5": 4, "6": None},
+        )
+
+    def test_only_dirty_periods_are_recomputed(self):
+        first = self._add_result("1", Decimal("3.00"), Decimal("70"))
+        self._add_result("2", Decimal("3.50"), Decimal("75"))
+        other = self._add_result("3", Decimal("3.00"), Decimal("70"), semester="2")
+        calculate_class_rankings()
+        self.assertEqual(self._ranks(), {"1": 2, "2": 1, "3": 1})
+
+        # Changes that cannot affect ranks leave the periods clean
+        StudentResult.objects.filter(pk=other.pk).update(class_rank=9)
+        first.refresh_from_db()
+        first.remarks = "Checked"
+        first.save()
+        calculate_class_rankings()
+        self.assertEqual(self._ranks(), {"1": 2, "2": 1, "3": 9})
+
+        first.semester_gpa = Decimal("3.80")
+        first.save()
+        calculate_class_rankings()
+        self.assertEqual(self._ranks(), {"1": 1, "2": 2, "3": 9})
+
+        calculate_class_rankings(full=True)
+        self.assertEqual(self._ranks(), {"1": 1, "2": 2, "3": 1})
+
+    def test_moving_a_result_recomputes_the_period_it_left(self):
+        self._add_result("1", Decimal("3.00"), Decimal("70"))
+        moved = self._add_result("2", Decimal("3.50"), Decimal("75"))
+        self._add_result("3", Decimal("3.80"), Decimal("90"), semester="2")
+        calculate_class_rankings()
+        self.assertEqual(self._ranks(), {"1": 2, "2": 1, "3": 1})
+
+        moved.refresh_from_db()
+        moved.semester = "2"
+        moved.save()
+        calculate_class_rankings()
+        self.assertEqual(self._ranks(), {"1": 1, "2": 2, "3": 1})
+
+
+class GradeCalculationTests(TestCase):
+    """Results come from grouped totals; bursts of changes queue one run"""
+
+    def _add_grade(self, number, subject_id, percentage, weightage, semester="1"):
+        return Grade.objects.create(
+            student_id="1",
+            student_name="Student 1",
+            student_email="student1@example.com",
+            course_id="BSC",
+            course_name="BSc",
+            subject_id=subject_id,
+            subject_name=f"Subject {subject_id}",
+            academic_year="2024-25",
+            semester=semester,
+            grade_type="EXAM",
+            assessment_id=str(number),
+            assessment_title=f"Exam {number}",
+            marks_obtained=Decimal(percentage),
+            max_marks=Decimal(100),
+            percentage=Decimal(percentage),
+            letter_grade="B",
+            grade_points=Decimal("3.00") if percentage >= 40 else Decimal("0.00"),
+            is_passed=percentage >= 40,
+            graded_by="1",
+            grader_name="Teacher",
+            graded_at=timezone.now(),
+            weightage=Decimal(weightage),
+        )
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(process_grade_calculation, "apply_async")
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+        # Grade saves also queue notifications
+        patcher = mock.patch.object(send_grade_notifications, "delay")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_per_period(self):
+        self._add_grade(1, "MATH", 80, 30)
+        self._add_grade(2, "MATH", 30, 10)
+        self._add_grade(3, "PHYS", 60, 60)
+        self._add_grade(4, "PHYS", 90, 0, semester="2")
+
+        with CaptureQueriesContext(connection) as ctx:
+            process_grade_calculation("1", "BSC")
+        grade_queries = [q for q in ctx.captured_queries if 'FROM "grades"' in q["sql"]]
+        self.assertEqual(len(grade_queries), 2)
+
+        first = StudentResult.objects.get(semester="1")
+        # (80 * 30 + 30 * 10 + 60 * 60) / 100 = 63 over a weightage of 100
+        self.assertEqual(first.overall_percentage, Decimal("63.00"))
+        self.assertEqual(first.semester_gpa, Decimal("2.00"))
+        self.assertEqual(
+            (first.total_subjects, first.subjects_passed, first.subjects_failed),
+            (2, 2, 1),
+        )
+        self.assertEqual(first.subject_results["MATH"]["obtained_marks"], 110.0)
+        self.assertEqual(len(first.subject_results["MATH"]["assessments"]), 2)
+        self.assertEqual(first.subject_results["PHYS"]["grade"], "B")
+
+        # No weightage: plain average of the percentages
+        second = StudentResult.objects.get(semester="2")
+        self.assertEqual(second.overall_percentage, Decimal("90.00"))
+
+    def test_burst_of_grade_saves_queues_one_calculation(self):
+        for number in range(20):
+            self._add_grade(number, "MATH", 70, 5)
+        self.assertEqual(self.apply_async.call_count, 1)
+
+        # Once the calculation starts, later changes queue the next run
+        process_grade_calculation("1", "BSC")
+        self._add_grade(20, "MATH", 70, 5)
+        self.assertEqual(self.apply_async.call_count, 2)
+
+
+class AutoGradingTests(TestCase):
+    """Submissions are graded per chunk and notified through bulk requests"""
+
+    def setUp(self):
+        # bulk_create skips the assignment notification signal
+        (self.assignment,) = Assignment.objects.bulk_create(
+            [
+                Assignment(
+                    title="Essay",
+                    description="Essay",
+                    course_id="BSC",
+                    course_name="BSc",
+                    subject_id="1",
+                    subject_name="Subject 1",
+                    academic_year="2024-25",
+                    semester="1",
+                    max_marks=50,
+                    due_date=timezone.now() + timedelta(days=7),
+                    status="PUBLISHED",
+                    created_by="1",
+                )
+            ]
+        )
+        lengths = [20, 120, 120, 600, 0]
+        Submission.objects.bulk_create(
+            Submission(
+                assignment=self.assignment,
+                student_id=str(i),
+                student_name=f"Student {i}",
+                student_email=f"student{i}@example.com",
+                submission_text="word " * length,
+                status="SUBMITTED",
+            )
+            for i, length in enumerate(lengths)
+        )
+
+    def test_submissions_are_graded_in_chunks(self):
+        notified = []
+        with mock.patch.object(process_grade_calculation, "apply_async"):
+            metrics = run_auto_grading(notified.append, chunk_size=2)
+
+        self.assertEqual(metrics["graded"], 4)
+        self.assertEqual(metrics["chunks"], 2)
+        self.assertEqual([len(ids) for ids in notified], [2, 2])
+        graded = Submission.objects.filter(status="GRADED")
+        self.assertEqual(
+            dict(graded.values_list("student_id", "marks_obtained")),
+            {
+                "0": Decimal("15.00"),
+                "1": Decimal("25.00"),
+                "2": Decimal("25.00"),
+                "3": Decimal("45.00"),
+            },
+        )
+        self.assertEqual(graded.get(student_id="3").percentage, Decimal("90.00"))
+        self.assertEqual(graded.get(student_id="1").word_count, 120)
+        # Empty submissions are left for a teacher
+        self.assertEqual(Submission.objects.get(student_id="4").status, "SUBMITTED")
+
+    def test_notifications_share_bulk_requests_per_mark(self):
+        with mock.patch.object(process_grade_calculation, "apply_async"):
+            run_auto_grading(lambda ids: None)
+        submission_ids = [
+            str(pk)
+            for pk in Submission.objects.filter(status="GRADED").values_list(
+                "id", flat=True
+            )
+        ]
+
+        with mock.patch("assessments.tasks._get_notification_session") as session:
+            session.return_value.post.return_value.status_code = 201
+            result = send_submission_grade_notifications(submission_ids)
+
+        self.assertEqual(result, {"sent": 4, "failed": 0})
+        calls = session.return_value.post.call_args_list
+        self.assertEqual(
+            sorted(sorted(call.kwargs["json"]["recipient_ids"]) for call in calls),
+            [["0"], ["1", "2"], ["3"]],
+        )
+        self.assertTrue(
+            all(call.args[0].endswith("/bulk_create/") for call in calls)
+        )
+
+
+class UserSyncTests(TestCase):
+    """Changed users are paged by cursor and written with one UPDATE per table"""
+
+    def setUp(self):
+        cache.clear()
+        (assignment,) = Assignment.objects.bulk_create(
+            [
+                Assignment(
+                    title="Essay",
+                    description="Essay",
+                    course_id="BSC",
+                    course_name="BSc",
+                    subject_id="1",
+                    subject_name="Subject 1",
+                    academic_year="2024-25",
+                    semester="1",
+                    due_date=timezone.now(),
+                    created_by="1",
+                )
+            ]
+        )
+        Submission.objects.bulk_create(
+            Submission(
+                assignment=assignment,
+                student_id=str(i),
+                student_name=f"Student {i}",
+                student_email=f"student{i}@example.com",
+                attempt_number=attempt,
+            )
+            for i in range(1, 4)
+            for attempt in (1, 2)
+        )
+
+    def _user(self, user_id, first_name, updated_at):
+        return {
+            "id": user_id,
+            "username": f"user{user_id}",
+            "first_name": first_name,
+            "last_name": "Renamed",
+            "email": f"student{user_id}@example.com",
+            "updated_at": updated_at,
+        }
+
+    def _sync(self, *pages):
+        next_urls = [f"http://users/?cursor={n}" for n in range(1, len(pages))]
+        responses = [
+            mock.Mock(json=mock.Mock(return_value={"results": page, "next": url}))
+            for page, url in zip(pages, next_urls + [None])
+        ]
+        with mock.patch("assessments.users.requests.Session") as session:
+            session.return_value.get.side_effect = responses
+            with CaptureQueriesContext(connection) as ctx:
+                counts = sync_user_data()
+        updates = [
+            query["sql"]
+            for query in ctx.captured_queries
+            if query["sql"].startswith('UPDATE "submissions"')
+        ]
+        return counts, updates, session.return_value.get.call_args_list
+
+    def test_only_changed_users_are_written(self):
+        counts, updates, calls = self._sync(
+            [self._user(1, "Ann", "2024-01-01T10:00:00Z")],
+            [
+                self._user(2, "Ben", "2024-01-02T10:00:00Z"),
+                {
+                    **self._user(3, "Student", "2024-01-03T10:00:00Z"),
+                    "last_name": "3",
+                },
+            ],
+        )
+
+        self.assertEqual(counts["users"], 3)
+        self.assertEqual(counts["Submission"], 4)
+        # One UPDATE per page; user 3 is unchanged
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            dict(Submission.objects.values_list("student_id", "student_name")),
+            {"1": "Ann Renamed", "2": "Ben Renamed", "3": "Student 3"},
+        )
+        self.assertNotIn("updated_since", calls[0].kwargs["params"])
+        self.assertEqual(cache.get(SYNC_CURSOR_KEY), "2024-01-03T10:00:00Z")
+
+    def test_next_sync_starts_from_the_cursor(self):
+        cache.set(SYNC_CURSOR_KEY, "2024-01-03T10:00:00Z")
+
+        counts, updates, calls = self._sync([])
+
+        self.assertEqual(counts, {"users": 0, "Submission": 0, "Grade": 0})
+        self.assertEqual(updates, [])
+        self.assertEqual(
+            calls[0].kwargs["params"]["updated_since"], "2024-01-03T10:00:00Z"
+        )
+        self.assertEqual(cache.get(SYNC_CURSOR_KEY), "2024-01-03T10:00:00Z")
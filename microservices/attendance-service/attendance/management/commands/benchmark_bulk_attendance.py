@@ -0,0 +1,68 @@
+import time
+from datetime import time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from attendance.models import Attendance, AttendanceSession
+from attendance.views import mark_session_attendance
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure bulk attendance marking throughput for a large session. "
+        "All rows are written inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=10000)
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **options):
+        students = options["students"]
+        rounds = options["rounds"]
+        statuses = ["present", "absent", "late", "excused"]
+
+        try:
+            with transaction.atomic():
+                session = AttendanceSession.objects.create(
+                    course_id=0,
+                    subject_id=0,
+                    session_year_id=0,
+                    staff_id=0,
+                    title="Bulk attendance benchmark",
+                    session_date=timezone.now().date(),
+                    start_time=dt_time(9, 0),
+                    end_time=dt_time(10, 0),
+                )
+                for round_number in range(rounds):
+                    payload = [
+                        {
+                            "student_id": str(student_id),
+                            "status": statuses[(student_id + round_number) % 4],
+                        }
+                        for student_id in range(1, students + 1)
+                    ]
+                    started = time.perf_counter()
+                    created, updated = mark_session_attendance(session, payload, 0)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"round {round_number + 1}: created={created} "
+                        f"updated={updated} in {elapsed:.3f}s "
+                        f"({students / elapsed:,.0f} students/s)"
+                    )
+                written = Attendance.objects.filter(session=session).count()
+                if written != students:
+                    raise CommandError(
+                        f"Expected {students} attendance rows, found {written}"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
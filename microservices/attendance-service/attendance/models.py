@@ -1,8 +1,21 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Count, Q
 from django.utils import timezone
 
 
+class AttendanceSessionQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Annotate attendance_count, present_count and absent_count"""
+        return self.annotate(
+            attendance_count=Count("attendances"),
+            present_count=Count(
+                "attendances", filter=Q(attendances__status__in=["present", "late"])
+            ),
+            absent_count=Count("attendances", filter=Q(attendances__status="absent")),
+        )
+
+
 class AttendanceSession(models.Model):
     """Model for attendance sessions/classes"""
 
@@ -35,6 +48,8 @@ class AttendanceSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AttendanceSessionQuerySet.as_manager()
+
     class Meta:
         ordering = ["-session_date", "-start_time"]
         indexes = [
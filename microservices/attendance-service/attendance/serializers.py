@@ -34,13 +34,22 @@ class AttendanceSessionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ("created_at", "updated_at")
 
+    # Querysets from AttendanceSession.objects.with_counts() carry the counts
+    # as annotations; the queries below only run for unannotated instances
+
     def get_attendance_count(self, obj):
+        if hasattr(obj, "attendance_count"):
+            return obj.attendance_count
         return obj.attendances.count()
 
     def get_present_count(self, obj):
+        if hasattr(obj, "present_count"):
+            return obj.present_count
         return obj.attendances.filter(status__in=["present", "late"]).count()
 
     def get_absent_count(self, obj):
+        if hasattr(obj, "absent_count"):
+            return obj.absent_count
         return obj.attendances.filter(status="absent").count()
 
     def validate(self, data):
@@ -0,0 +1,100 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import (Attendance, AttendanceReport, AttendanceSession,
+                     AttendanceSettings)
+
+
+class ListQueryCountTests(TestCase):
+    """List endpoints must not issue queries per row they serialize"""
+
+    def setUp(self):
+        self.session = self._add_session(["present", "late", "absent"])
+
+    def _add_session(self, statuses, student_offset=0):
+        number = AttendanceSession.objects.count()
+        session = AttendanceSession.objects.create(
+            course_id=1,
+            subject_id=1,
+            session_year_id=1,
+            staff_id=1,
+            title=f"Session {number}",
+            session_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=number),
+            start_time=datetime.time(9),
+            end_time=datetime.time(10),
+        )
+        for i, status in enumerate(statuses):
+            Attendance.objects.create(
+                session=session,
+                student_id=student_offset + i + 1,
+                status=status,
+                marked_by_staff_id=1,
+            )
+        return session
+
+    def _add_report_and_settings(self, number):
+        AttendanceReport.objects.create(
+            report_type="student",
+            title=f"Report {number}",
+            start_date=datetime.date(2024, 1, 1),
+            end_date=datetime.date(2024, 1, 31),
+            generated_by_staff_id=1,
+        )
+        AttendanceSettings.objects.create(
+            course_id=number, subject_id=number, created_by_staff_id=1
+        )
+
+    def _grow(self):
+        """Add sessions and records, including to the first session and student"""
+        for number in range(2, 8):
+            self._add_session(["present", "absent", "excused", "late"])
+            self._add_report_and_settings(number)
+        Attendance.objects.create(
+            session=self.session, student_id=50, status="absent", marked_by_staff_id=1
+        )
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_endpoints_query_count_is_independent_of_row_count(self):
+        self._add_report_and_settings(1)
+        urls = [
+            reverse("session-list-create"),
+            reverse("session-detail", args=[self.session.id]),
+            reverse("attendance-list-create"),
+            reverse("student-attendance", args=[1]),
+            reverse("session-attendance", args=[self.session.id]),
+            reverse("report-list-create"),
+            reverse("settings-list-create"),
+        ]
+        small = {url: self._queries(url) for url in urls}
+
+        self._grow()
+
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self._queries(url), small[url])
+
+    def test_annotated_counts_match_per_row_counts(self):
+        self._add_session(["absent", "absent", "excused"])
+
+        sessions = self.client.get(reverse("session-list-create")).json()["results"]
+        counts = {
+            session["title"]: (
+                session["attendance_count"],
+                session["present_count"],
+                session["absent_count"],
+            )
+            for session in sessions
+        }
+        self.assertEqual(counts, {"Session 0": (3, 2, 1), "Session 1": (3, 0, 2)})
+
+        detail = self.client.get(reverse("session-detail", args=[self.session.id]))
+        self.assertEqual(detail.json()["present_count"], 2)
@@ -1,5 +1,7 @@
+from collections import defaultdict
 from datetime import datetime, timedelta
 
+from django.db import transaction
 from django.db.models import Count, Q
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
@@ -30,7 +32,7 @@ def health_check(request):
 class AttendanceSessionListCreateView(generics.ListCreateAPIView):
     """List all attendance sessions or create a new session"""
 
-    queryset = AttendanceSession.objects.all()
+    queryset = AttendanceSession.objects.with_counts()
     serializer_class = AttendanceSessionSerializer
     filter_backends = [
         DjangoFilterBackend,
@@ -46,14 +48,14 @@ class AttendanceSessionListCreateView(generics.ListCreateAPIView):
 class AttendanceSessionDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete an attendance session"""
 
-    queryset = AttendanceSession.objects.all()
+    queryset = AttendanceSession.objects.with_counts()
     serializer_class = AttendanceSessionSerializer
 
 
 class AttendanceListCreateView(generics.ListCreateAPIView):
     """List all attendance records or create a new record"""
 
-    queryset = Attendance.objects.all()
+    queryset = Attendance.objects.select_related("session")
     serializer_class = AttendanceSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = [
@@ -69,7 +71,7 @@ class AttendanceListCreateView(generics.ListCreateAPIView):
 class AttendanceDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete an attendance record"""
 
-    queryset = Attendance.objects.all()
+    queryset = Attendance.objects.select_related("session")
     serializer_class = AttendanceSerializer
 
 
@@ -83,7 +85,9 @@ class StudentAttendanceView(generics.ListAPIView):
 
     def get_queryset(self):
         student_id = self.kwargs["student_id"]
-        return Attendance.objects.filter(student_id=student_id)
+        return Attendance.objects.filter(student_id=student_id).select_related(
+            "session"
+        )
 
 
 class SessionAttendanceView(generics.ListAPIView):
@@ -95,7 +99,106 @@ class SessionAttendanceView(generics.ListAPIView):
 
     def get_queryset(self):
         session_id = self.kwargs["session_id"]
-        return Attendance.objects.filter(session_id=session_id)
+        return Attendance.objects.filter(session_id=session_id).select_related(
+            "session"
+        )
+
+
+BULK_BATCH_SIZE = 1000
+
+
+def mark_session_attendance(session, attendances_data, marked_by_staff_id):
+    """Create or update attendance rows for a session in one transaction.
+
+    Existing rows for the session are fetched with a single query, new rows
+    are written with bulk_create and existing rows with one UPDATE per distinct
+    set of values (bulk_update for one-offs). The session row is locked first
+    so concurrent marks of one session cannot both insert the same student.
+    When a student appears more than once the last entry wins. Returns
+    (created, updated).
+    """
+    records = {}
+    for attendance_data in attendances_data:
+        records[int(attendance_data["student_id"])] = attendance_data
+
+    now = timezone.now()
+    with transaction.atomic():
+        AttendanceSession.objects.select_for_update().get(id=session.id)
+        existing = {
+            attendance.student_id: attendance
+            for attendance in Attendance.objects.select_for_update().filter(
+                session=session, student_id__in=list(records)
+            )
+        }
+
+        to_create = []
+        # Updates are grouped by the values they write so that uniform
+        # payloads (the common case) become a handful of UPDATE ... WHERE id IN
+        update_groups = defaultdict(list)
+        for student_id, attendance_data in records.items():
+            attendance_status = attendance_data["status"]
+            notes = attendance_data.get("notes", "")
+            attendance = existing.get(student_id)
+
+            if attendance is None:
+                to_create.append(
+                    Attendance(
+                        session=session,
+                        student_id=student_id,
+                        status=attendance_status,
+                        notes=notes,
+                        marked_by_staff_id=marked_by_staff_id,
+                        check_in_time=now
+                        if attendance_status in ["present", "late"]
+                        else None,
+                    )
+                )
+            else:
+                set_check_in = (
+                    attendance_status in ["present", "late"]
+                    and not attendance.check_in_time
+                )
+                update_groups[(attendance_status, notes, set_check_in)].append(
+                    attendance
+                )
+
+        Attendance.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+
+        updated_count = 0
+        singles = []
+        for (attendance_status, notes, set_check_in), rows in update_groups.items():
+            updated_count += len(rows)
+            if len(rows) == 1:
+                # Update existing record
+                attendance = rows[0]
+                attendance.status = attendance_status
+                attendance.notes = notes
+                attendance.marked_by_staff_id = marked_by_staff_id
+                if set_check_in:
+                    attendance.check_in_time = now
+                attendance.updated_at = now
+                singles.append(attendance)
+                continue
+            values = {
+                "status": attendance_status,
+                "notes": notes,
+                "marked_by_staff_id": marked_by_staff_id,
+                "updated_at": now,
+            }
+            if set_check_in:
+                values["check_in_time"] = now
+            ids = [attendance.id for attendance in rows]
+            for offset in range(0, len(ids), BULK_BATCH_SIZE):
+                Attendance.objects.filter(
+                    id__in=ids[offset : offset + BULK_BATCH_SIZE]
+                ).update(**values)
+        Attendance.objects.bulk_update(
+            singles,
+            ["status", "notes", "marked_by_staff_id", "check_in_time", "updated_at"],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+    return len(to_create), updated_count
 
 
 @api_view(["POST"])
@@ -114,48 +217,15 @@ def bulk_attendance_mark(request):
                 {"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
-        created_records = []
-        updated_records = []
-
-        for attendance_data in attendances_data:
-            student_id = int(attendance_data["student_id"])
-            attendance_status = attendance_data["status"]
-            notes = attendance_data.get("notes", "")
-
-            # Check if attendance already exists
-            attendance, created = Attendance.objects.get_or_create(
-                session=session,
-                student_id=student_id,
-                defaults={
-                    "status": attendance_status,
-                    "notes": notes,
-                    "marked_by_staff_id": marked_by_staff_id,
-                    "check_in_time": timezone.now()
-                    if attendance_status in ["present", "late"]
-                    else None,
-                },
-            )
-
-            if not created:
-                # Update existing record
-                attendance.status = attendance_status
-                attendance.notes = notes
-                attendance.marked_by_staff_id = marked_by_staff_id
-                if (
-                    attendance_status in ["present", "late"]
-                    and not attendance.check_in_time
-                ):
-                    attendance.check_in_time = timezone.now()
-                attendance.save()
-                updated_records.append(attendance.id)
-            else:
-                created_records.append(attendance.id)
+        created_count, updated_count = mark_session_attendance(
+            session, attendances_data, marked_by_staff_id
+        )
 
         return Response(
             {
                 "message": "Bulk attendance marked successfully",
-                "created_records": len(created_records),
-                "updated_records": len(updated_records),
+                "created_records": created_count,
+                "updated_records": updated_count,
                 "total_processed": len(attendances_data),
             }
         )
@@ -0,0 +1,143 @@
+import random
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from feedback.models import Feedback, FeedbackCategory
+from feedback.signals import handle_feedback_created
+from feedback.tasks import (NEGATIVE_KEYWORDS, POSITIVE_KEYWORDS,
+                            analyze_feedback_sentiment, score_sentiment)
+
+FILLER = (
+    "the course lectures were clear but the lab sessions ran late and the "
+    "assignments took longer than expected goodbye badge poorly lovely"
+).split()
+
+
+class _Rollback(Exception):
+    pass
+
+
+def previous_score(text):
+    """The previous scoring: a substring test per keyword"""
+    text = text.lower()
+    positive_score = sum(1 for word in POSITIVE_KEYWORDS if word in text)
+    negative_score = sum(1 for word in NEGATIVE_KEYWORDS if word in text)
+    if positive_score > negative_score:
+        return "POSITIVE"
+    elif negative_score > positive_score:
+        return "NEGATIVE"
+    return "NEUTRAL"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure sentiment scoring and analysis of pending feedback, per row "
+        "against chunked, and the analyses queued for a burst of new feedback. "
+        "Rows are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--feedback", type=int, default=100000)
+        parser.add_argument("--burst", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        texts = self._texts(options["feedback"])
+        self._measure_scoring(texts)
+
+        for label, analyze in (
+            ("per row", self._analyze_per_row),
+            ("chunked", analyze_feedback_sentiment),
+        ):
+            try:
+                with transaction.atomic():
+                    self._populate(texts)
+                    started = time.perf_counter()
+                    analyzed = analyze()
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{label + ' analysis':<18} rows={analyzed:<7} "
+                        f"{elapsed:7.2f}s {analyzed / elapsed:9.1f} rows/s"
+                    )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        self._measure_burst(options["burst"])
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def _texts(self, count):
+        rng = random.Random(0)
+        keywords = sorted(POSITIVE_KEYWORDS | NEGATIVE_KEYWORDS)
+        return [
+            " ".join(
+                rng.sample(FILLER, 12)
+                + rng.sample(keywords, rng.randint(0, 3))
+                + rng.sample(FILLER, 20)
+            ).capitalize()
+            for _ in range(count)
+        ]
+
+    def _measure_scoring(self, texts):
+        verdicts = {}
+        for label, score in (("substring", previous_score), ("regex", score_sentiment)):
+            started = time.perf_counter()
+            verdicts[label] = [score(text) for text in texts]
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label + ' scoring':<18} rows={len(texts):<7} "
+                f"{elapsed:7.2f}s {len(texts) / elapsed:9.1f} rows/s"
+            )
+        changed = sum(
+            old != new for old, new in zip(verdicts["substring"], verdicts["regex"])
+        )
+        self.stdout.write(
+            f"{'':<18} {changed} verdicts differ (keywords inside longer words)"
+        )
+
+    def _populate(self, texts):
+        category, _ = FeedbackCategory.objects.get_or_create(
+            name="Benchmark", defaults={"category_type": "GENERAL"}
+        )
+        Feedback.objects.bulk_create(
+            (
+                Feedback(
+                    category=category,
+                    title="Benchmark feedback",
+                    description=text,
+                    rating=3,
+                )
+                for text in texts
+            ),
+            batch_size=1000,
+        )
+
+    def _analyze_per_row(self):
+        """The previous analysis: a substring scan and a save per row"""
+        analyzed = 0
+        for feedback in Feedback.objects.filter(
+            sentiment="", status__in=["SUBMITTED", "APPROVED"]
+        ):
+            feedback.sentiment = previous_score(
+                f"{feedback.title} {feedback.description}"
+            )
+            feedback.save()
+            analyzed += 1
+        return analyzed
+
+    def _measure_burst(self, burst):
+        cache.delete("feedback:sentiment-analysis")
+        queued = []
+        feedback = Feedback(title="Burst")
+        with mock.patch.object(
+            analyze_feedback_sentiment, "apply_async", lambda *a, **kw: queued.append(a)
+        ), mock.patch("feedback.signals.send_feedback_notification"):
+            for _ in range(burst):
+                handle_feedback_created(Feedback, feedback, created=True)
+        self.stdout.write(
+            f"{'burst':<18} new feedback={burst} analyses queued={len(queued)} "
+            f"(previously {burst})"
+        )
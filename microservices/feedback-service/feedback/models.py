@@ -167,6 +167,12 @@ class Feedback(models.Model):
             models.Index(fields=["created_at"]),
             models.Index(fields=["is_public"]),
             models.Index(fields=["is_featured"]),
+            # Feedback waiting for sentiment analysis
+            models.Index(
+                fields=["id"],
+                condition=models.Q(sentiment=""),
+                name="feedback_sentiment_pending",
+            ),
         ]
 
     def __str__(self):
@@ -3,7 +3,7 @@ from django.dispatch import receiver
 from django.utils import timezone
 
 from .models import Feedback, FeedbackResponse
-from .tasks import analyze_feedback_sentiment, send_feedback_notification
+from .tasks import schedule_sentiment_analysis, send_feedback_notification
 
 
 @receiver(post_save, sender=Feedback)
@@ -17,8 +17,8 @@ def handle_feedback_created(sender, instance, created, **kwargs):
             instance.user_email if not instance.is_anonymous else None,
         )
 
-        # Analyze sentiment asynchronously
-        analyze_feedback_sentiment.delay()
+        # Analyze sentiment asynchronously, batched with other new feedback
+        schedule_sentiment_analysis(instance.id)
     else:
         # Handle status changes
         if hasattr(instance, "_status_changed") and instance._status_changed:
@@ -1,9 +1,11 @@
 import logging
+import re
 from datetime import datetime, timedelta
 
 import requests
 from celery import shared_task
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Avg, Count, Q
 from django.utils import timezone
 
@@ -434,92 +436,126 @@ def sync_user_data():
     """Sync user data from User Management Service"""
     try:
         from .models import Feedback
-
-        # Get unique user IDs from feedback
-        user_ids = (
-            Feedback.objects.exclude(is_anonymous=True)
-            .values_list("user_id", flat=True)
-            .distinct()
-        )
-
-        # Fetch user data from User Management Service
-        response = requests.post(
-            f"{settings.USER_MANAGEMENT_SERVICE_URL}/api/v1/users/bulk_info/",
-            json={"user_ids": list(user_ids)},
-            timeout=30,
-        )
-
-        if response.status_code == 200:
-            users_data = response.json()
-
-            # Update feedback with latest user data
-            for user_data in users_data:
-                Feedback.objects.filter(user_id=user_data["id"]).update(
-                    user_name=f"{user_data['first_name']} {user_data['last_name']}",
-                    user_email=user_data["email"],
+        from .users import sync_users
+
+        # Update feedback with latest user data
+        return sync_users(
+            [
+                (
+                    Feedback.objects.filter(is_anonymous=False),
+                    "user_id",
+                    "user_name",
+                    "user_email",
                 )
-
-            logger.info(f"Synced data for {len(users_data)} users")
-        else:
-            logger.error(f"Failed to sync user data: {response.text}")
+            ]
+        )
 
     except Exception as exc:
         logger.error(f"Error syncing user data: {str(exc)}")
         raise
 
 
-@shared_task
-def analyze_feedback_sentiment():
-    """Analyze sentiment of feedback using basic keyword analysis"""
-    try:
-        from .models import Feedback
+# Simple keyword-based sentiment analysis
+POSITIVE_KEYWORDS = frozenset(
+    [
+        "good",
+        "great",
+        "excellent",
+        "amazing",
+        "wonderful",
+        "fantastic",
+        "love",
+        "perfect",
+    ]
+)
+NEGATIVE_KEYWORDS = frozenset(
+    [
+        "bad",
+        "terrible",
+        "awful",
+        "horrible",
+        "hate",
+        "worst",
+        "disappointing",
+        "poor",
+    ]
+)
+# Every keyword as a whole word, in a single pass over lowercased text
+SENTIMENT_KEYWORDS_RE = re.compile(
+    r"\b(?:%s)\b" % "|".join(sorted(POSITIVE_KEYWORDS | NEGATIVE_KEYWORDS))
+)
+SENTIMENT_ANALYSIS_KEY = "feedback:sentiment-analysis"
+
+
+def score_sentiment(text):
+    """POSITIVE, NEGATIVE or NEUTRAL by which keywords outnumber the other"""
+    words = set(SENTIMENT_KEYWORDS_RE.findall(text.lower()))
+    positive_score = len(words & POSITIVE_KEYWORDS)
+    negative_score = len(words & NEGATIVE_KEYWORDS)
+
+    if positive_score > negative_score:
+        return "POSITIVE"
+    elif negative_score > positive_score:
+        return "NEGATIVE"
+    return "NEUTRAL"
+
+
+def schedule_sentiment_analysis(feedback_id):
+    """Queue analyze_feedback_sentiment once for a burst of new feedback.
+
+    New feedback waits with an empty sentiment; the first in a burst
+    schedules a run SENTIMENT_ANALYSIS_DEBOUNCE_SECONDS later, which scores
+    everything submitted before it starts.
+    """
+    delay = settings.SENTIMENT_ANALYSIS_DEBOUNCE_SECONDS
+    # The key expires on its own in case the scheduled task is lost
+    if cache.add(SENTIMENT_ANALYSIS_KEY, str(feedback_id), delay * 5):
+        analyze_feedback_sentiment.apply_async(countdown=delay)
+
 
+@shared_task
+def analyze_feedback_sentiment(feedback_ids=None, chunk_size=None):
+    """Analyze sentiment of feedback using basic keyword analysis.
+
+    Scores the given feedback, or else all feedback still waiting for a
+    sentiment, one chunk per query and bulk update.
+    """
+    from .models import Feedback
+
+    chunk_size = chunk_size or settings.SENTIMENT_ANALYSIS_CHUNK_SIZE
+    if feedback_ids is None:
+        # Feedback created from here on schedules another run
+        cache.delete(SENTIMENT_ANALYSIS_KEY)
         # Get feedback without sentiment analysis
-        unanalyzed_feedback = Feedback.objects.filter(
+        feedback_qs = Feedback.objects.filter(
             sentiment="", status__in=["SUBMITTED", "APPROVED"]
         )
+    else:
+        feedback_qs = Feedback.objects.filter(id__in=feedback_ids)
 
-        # Simple keyword-based sentiment analysis
-        positive_keywords = [
-            "good",
-            "great",
-            "excellent",
-            "amazing",
-            "wonderful",
-            "fantastic",
-            "love",
-            "perfect",
-        ]
-        negative_keywords = [
-            "bad",
-            "terrible",
-            "awful",
-            "horrible",
-            "hate",
-            "worst",
-            "disappointing",
-            "poor",
-        ]
-
+    try:
+        feedback_qs = feedback_qs.only("id", "title", "description").order_by("pk")
         analyzed_count = 0
-        for feedback in unanalyzed_feedback:
-            text = f"{feedback.title} {feedback.description}".lower()
-
-            positive_score = sum(1 for word in positive_keywords if word in text)
-            negative_score = sum(1 for word in negative_keywords if word in text)
-
-            if positive_score > negative_score:
-                sentiment = "POSITIVE"
-            elif negative_score > positive_score:
-                sentiment = "NEGATIVE"
-            else:
-                sentiment = "NEUTRAL"
+        last_pk = None
+        while True:
+            chunk_qs = feedback_qs
+            if last_pk is not None:
+                chunk_qs = chunk_qs.filter(pk__gt=last_pk)
+            chunk = list(chunk_qs[:chunk_size])
+            if not chunk:
+                break
+
+            for feedback in chunk:
+                feedback.sentiment = score_sentiment(
+                    f"{feedback.title} {feedback.description}"
+                )
+            Feedback.objects.bulk_update(chunk, ["sentiment"], batch_size=chunk_size)
 
-            feedback.sentiment = sentiment
-            feedback.save()
-            analyzed_count += 1
+            analyzed_count += len(chunk)
+            last_pk = chunk[-1].pk
 
         logger.info(f"Analyzed sentiment for {analyzed_count} feedback entries")
+        return analyzed_count
 
     except Exception as exc:
         logger.error(f"Error analyzing feedback sentiment: {str(exc)}")
@@ -0,0 +1,96 @@
+import logging
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Value, When
+
+logger = logging.getLogger(__name__)
+
+# Cache key holding the last user change applied by sync_users
+SYNC_CURSOR_KEY = "user_sync:updated_since"
+SYNC_PAGE_SIZE = 500
+
+
+def user_name(user):
+    return f"{user['first_name']} {user['last_name']}".strip() or user["username"]
+
+
+def fetch_user_pages(updated_since=None, page_size=SYNC_PAGE_SIZE):
+    """Yield pages of users changed at or after ``updated_since``, oldest first"""
+    session = requests.Session()
+    url = f"{settings.USER_MANAGEMENT_SERVICE_URL}/api/v1/users/users/"
+    params = {"page_size": page_size}
+    if updated_since:
+        params["updated_since"] = updated_since
+
+    while url:
+        response = session.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        page = response.json()
+        yield page["results"]
+        # The next link already carries the query string
+        url, params = page["next"], None
+
+
+def apply_user_changes(queryset, id_field, users, name_field, email_field=None):
+    """Copy changed names and emails onto the rows of ``queryset``.
+
+    ``users`` maps user ID to ``(name, email)``. The cached details are read
+    once to find the users that differ, and their rows are written with a
+    single UPDATE whose values are CASE expressions on the user ID. Returns
+    the number of rows updated.
+    """
+    fields = [name_field] + ([email_field] if email_field else [])
+    stale = {
+        row[0]
+        for row in queryset.filter(**{f"{id_field}__in": list(users)})
+        .values_list(id_field, *fields)
+        .distinct()
+        if row[1:] != users[row[0]][: len(fields)]
+    }
+    if not stale:
+        return 0
+
+    return queryset.filter(**{f"{id_field}__in": stale}).update(
+        **{
+            field: Case(
+                *[
+                    When(**{id_field: user_id}, then=Value(users[user_id][index]))
+                    for user_id in stale
+                ]
+            )
+            for index, field in enumerate(fields)
+        }
+    )
+
+
+def sync_users(targets, page_size=SYNC_PAGE_SIZE):
+    """Apply user changes since the last run to every table in ``targets``.
+
+    ``targets`` are ``(queryset, id_field, name_field, email_field)`` tuples.
+    Each page of users costs one UPDATE per table at most. The cursor only
+    moves once every page has been applied, so a failed run starts over from
+    the same point.
+    """
+    updated_since = cache.get(SYNC_CURSOR_KEY)
+    counts = {"users": 0}
+    last_change = None
+
+    for page in fetch_user_pages(updated_since, page_size):
+        users = {
+            str(user["id"]): (user_name(user), user["email"]) for user in page
+        }
+        for queryset, id_field, name_field, email_field in targets:
+            label = queryset.model.__name__
+            counts[label] = counts.get(label, 0) + apply_user_changes(
+                queryset, id_field, users, name_field, email_field
+            )
+        counts["users"] += len(page)
+        if page:
+            last_change = page[-1]["updated_at"]
+
+    if last_change:
+        cache.set(SYNC_CURSOR_KEY, last_change, None)
+    logger.info(f"Synced user data since {updated_since}: {counts}")
+    return counts
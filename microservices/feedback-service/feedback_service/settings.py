@@ -236,3 +236,11 @@ FEEDBACK_MODERATION_REQUIRED = config(
     "FEEDBACK_MODERATION_REQUIRED", default=True, cast=bool
 )
 FEEDBACK_RATING_SCALE = config("FEEDBACK_RATING_SCALE", default=5, cast=int)
+# Seconds new feedback waits so a burst of submissions is scored in one run
+SENTIMENT_ANALYSIS_DEBOUNCE_SECONDS = config(
+    "SENTIMENT_ANALYSIS_DEBOUNCE_SECONDS", default=10, cast=int
+)
+# Feedback scored per bulk update by analyze_feedback_sentiment
+SENTIMENT_ANALYSIS_CHUNK_SIZE = config(
+    "SENTIMENT_ANALYSIS_CHUNK_SIZE", default=1000, cast=int
+)
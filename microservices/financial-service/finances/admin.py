@@ -1,11 +1,12 @@
 from django.contrib import admin
+from django.db import transaction
 from django.db.models import Sum
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.html import format_html
 
-from .models import (FeeStructure, FinancialReport, Fine, FinePayment, Invoice,
-                     Payment, StudentFee, Transaction)
+from .models import (DailyFinancialRollup, FeeStructure, FinancialReport, Fine,
+                     FinePayment, Invoice, Payment, StudentFee, Transaction)
 
 
 @admin.register(FeeStructure)
@@ -350,9 +351,25 @@ class PaymentAdmin(admin.ModelAdmin):
 
     actions = ["verify_payments", "mark_as_failed", "process_refunds"]
 
+    def _set_status(self, queryset, status, **fields):
+        """Save each pending payment, so the signals book it into the
+        transactions, daily rollups and cached analytics"""
+        updated = 0
+        with transaction.atomic():
+            for payment in queryset.filter(status="PENDING").select_related(
+                "student_fee__fee_structure"
+            ):
+                payment.status = status
+                for field, value in fields.items():
+                    setattr(payment, field, value)
+                payment.save()
+                updated += 1
+        return updated
+
     def verify_payments(self, request, queryset):
-        updated = queryset.filter(status="PENDING").update(
-            status="SUCCESS",
+        updated = self._set_status(
+            queryset,
+            "SUCCESS",
             processed_at=timezone.now(),
             processed_by=request.user.username,
         )
@@ -361,7 +378,7 @@ class PaymentAdmin(admin.ModelAdmin):
     verify_payments.short_description = "Verify selected payments"
 
     def mark_as_failed(self, request, queryset):
-        updated = queryset.filter(status="PENDING").update(status="FAILED")
+        updated = self._set_status(queryset, "FAILED")
         self.message_user(request, f"{updated} payments marked as failed.")
 
     mark_as_failed.short_description = "Mark selected payments as failed"
@@ -722,6 +739,24 @@ class FinancialReportAdmin(admin.ModelAdmin):
     regenerate_reports.short_description = "Regenerate financial reports"
 
 
+@admin.register(DailyFinancialRollup)
+class DailyFinancialRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        "date",
+        "fee_type",
+        "payment_method",
+        "fee_collections",
+        "fee_payment_count",
+        "fine_collections",
+        "fine_payment_count",
+        "outstanding_change",
+        "overdue_change",
+    ]
+    list_filter = ["fee_type", "payment_method", "date"]
+    date_hierarchy = "date"
+    readonly_fields = ["updated_at"]
+
+
 # Customize admin site
 admin.site.site_header = "Financial Service Administration"
 admin.site.site_title = "Financial Service Admin"
@@ -0,0 +1,106 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+from .models import Payment
+
+# Bumped whenever a Payment changes; it is part of every cache key, so all
+# cached date ranges are invalidated at once
+PAYMENT_ANALYTICS_VERSION_KEY = "finances:payment_analytics:version"
+
+
+def invalidate_payment_analytics():
+    try:
+        cache.incr(PAYMENT_ANALYTICS_VERSION_KEY)
+    except ValueError:
+        cache.set(PAYMENT_ANALYTICS_VERSION_KEY, 1, None)
+
+
+def _cache_key(start_date, end_date):
+    version = cache.get_or_set(PAYMENT_ANALYTICS_VERSION_KEY, 1, None)
+    return f"finances:payment_analytics:{version}:{start_date or ''}:{end_date or ''}"
+
+
+def compute_payment_analytics(start_date=None, end_date=None):
+    """Payment totals, breakdowns and daily trends in two grouped queries"""
+    payments = Payment.objects.all()
+    if start_date:
+        payments = payments.filter(payment_date__gte=start_date)
+    if end_date:
+        payments = payments.filter(payment_date__lte=end_date)
+
+    # One row per (status, method, gateway) covers every total and breakdown
+    groups = (
+        payments.values("status", "payment_method", "payment_gateway")
+        .annotate(count=Count("id"), amount=Sum("amount"))
+        .order_by()
+    )
+
+    method_breakdown = {
+        method: {"count": 0, "amount": 0} for method, _ in Payment.PAYMENT_METHODS
+    }
+    gateway_breakdown = {
+        gateway: {"count": 0, "amount": 0} for gateway, _ in Payment.GATEWAY_CHOICES
+    }
+    totals = defaultdict(int)
+    for group in groups:
+        totals["attempts"] += group["count"]
+        if group["status"] != "SUCCESS":
+            continue
+        totals["payments"] += group["count"]
+        totals["amount"] += group["amount"]
+        for breakdown, key in (
+            (method_breakdown, group["payment_method"]),
+            (gateway_breakdown, group["payment_gateway"]),
+        ):
+            entry = breakdown.setdefault(key, {"count": 0, "amount": 0})
+            entry["count"] += group["count"]
+            entry["amount"] += group["amount"]
+    for breakdown in (method_breakdown, gateway_breakdown):
+        for entry in breakdown.values():
+            entry["amount"] = float(entry["amount"])
+
+    days = (
+        payments.filter(status="SUCCESS")
+        .annotate(date=TruncDate("payment_date"))
+        .values("date")
+        .annotate(count=Count("id"), amount=Sum("amount"))
+        .order_by("date")
+    )
+    daily_trends = [
+        {
+            "date": day["date"].isoformat(),
+            "count": day["count"],
+            "amount": float(day["amount"]),
+        }
+        for day in days
+    ]
+
+    total_payments = totals["payments"]
+    total_amount = totals["amount"]
+    return {
+        "total_payments": total_payments,
+        "total_amount": total_amount,
+        "average_payment_amount": (
+            total_amount / total_payments if total_payments else 0
+        ),
+        "payment_method_breakdown": method_breakdown,
+        "gateway_breakdown": gateway_breakdown,
+        "success_rate": (
+            total_payments / totals["attempts"] * 100 if totals["attempts"] else 0
+        ),
+        "daily_trends": daily_trends,
+    }
+
+
+def payment_analytics(start_date=None, end_date=None):
+    """compute_payment_analytics() cached per date range"""
+    key = _cache_key(start_date, end_date)
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute_payment_analytics(start_date, end_date)
+        cache.set(key, analytics, settings.PAYMENT_ANALYTICS_CACHE_TIMEOUT)
+    return analytics
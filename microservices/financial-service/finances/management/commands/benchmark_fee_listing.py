@@ -0,0 +1,141 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from finances.models import (FeeStructure, Fine, FinePayment, Invoice, Payment,
+                             StudentFee)
+from finances.views import FineViewSet, InvoiceViewSet, StudentFeeViewSet
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries and time to serialize fee, fine and invoice lists with "
+        "their payment history. Rows are created inside a transaction that is "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fees", type=int, default=1000)
+        parser.add_argument("--payments-per-fee", type=int, default=8)
+
+    def handle(self, *args, **options):
+        fees = options["fees"]
+        payments_per_fee = options["payments_per_fee"]
+
+        try:
+            with transaction.atomic():
+                self._populate(fees, payments_per_fee)
+                for viewset in (StudentFeeViewSet, FineViewSet, InvoiceViewSet):
+                    for size in (fees // 10, fees):
+                        self._measure(viewset, size)
+                self._measure_per_row(fees)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def _populate(self, fees, payments_per_fee):
+        due_date = timezone.now().date() + timedelta(days=30)
+        structure = FeeStructure.objects.create(
+            name="Benchmark tuition",
+            fee_type="TUITION",
+            academic_year="2024-25",
+            amount=Decimal("1000.00"),
+            created_by="benchmark",
+        )
+        student_fees = StudentFee.objects.bulk_create(
+            StudentFee(
+                fee_structure=structure,
+                student_id=str(i),
+                student_name=f"Student {i}",
+                student_email=f"student{i}@example.com",
+                original_amount=Decimal("1000.00"),
+                final_amount=Decimal("1000.00"),
+                balance_amount=Decimal("1000.00"),
+                due_date=due_date,
+            )
+            for i in range(fees)
+        )
+        fines = Fine.objects.bulk_create(
+            Fine(
+                student_id=str(i),
+                student_name=f"Student {i}",
+                student_email=f"student{i}@example.com",
+                fine_type="LIBRARY",
+                title="Late return",
+                description="Benchmark fine",
+                amount=Decimal("50.00"),
+                balance_amount=Decimal("50.00"),
+                due_date=due_date,
+                issued_by="benchmark",
+                issuer_name="Benchmark",
+            )
+            for i in range(fees)
+        )
+        invoices = Invoice.objects.bulk_create(
+            Invoice(
+                invoice_number=f"BENCH-{i:06d}",
+                student_id=str(i),
+                student_name=f"Student {i}",
+                student_email=f"student{i}@example.com",
+                due_date=due_date,
+                line_items=[{"description": "Tuition", "unit_price": "1000.00"}],
+                created_by="benchmark",
+            )
+            for i in range(fees)
+        )
+        statuses = ["SUCCESS", "SUCCESS", "FAILED", "SUCCESS"]
+        Payment.objects.bulk_create(
+            Payment(
+                student_fee=student_fee,
+                gateway_order_id=str(invoice.id),
+                amount=Decimal("100.00"),
+                payment_method="UPI",
+                status=statuses[n % len(statuses)],
+            )
+            for student_fee, invoice in zip(student_fees, invoices)
+            for n in range(payments_per_fee)
+        )
+        FinePayment.objects.bulk_create(
+            FinePayment(
+                fine=fine,
+                amount=Decimal("5.00"),
+                payment_method="CASH",
+                status=statuses[n % len(statuses)],
+            )
+            for fine in fines
+            for n in range(payments_per_fee)
+        )
+
+    def _measure(self, viewset, size):
+        queryset = viewset.queryset.all()[:size]
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            data = viewset.serializer_class(queryset, many=True).data
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{viewset.__name__:<18} rows={len(data):<6} "
+            f"queries={len(ctx.captured_queries):<4} {elapsed * 1000:8.1f}ms"
+        )
+
+    def _measure_per_row(self, fees):
+        """The previous behaviour: payment history queried per serialized fee"""
+        queryset = StudentFee.objects.select_related("fee_structure")[:fees]
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            StudentFeeViewSet.serializer_class(queryset, many=True).data
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{'unprefetched fees':<18} rows={fees:<6} "
+            f"queries={len(ctx.captured_queries):<4} {elapsed * 1000:8.1f}ms"
+        )
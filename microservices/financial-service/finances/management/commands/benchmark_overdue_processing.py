@@ -0,0 +1,132 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from finances.models import FeeStructure, StudentFee, Transaction
+from finances.tasks import (_late_fee, run_overdue_engine,
+                            send_payment_reminder)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the overdue/late fee engine against the previous per-fee loop. "
+        "Rows are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fees", type=int, default=5000)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fees = options["fees"]
+
+        try:
+            with transaction.atomic():
+                self._populate(fees)
+                self._measure_per_fee()
+                StudentFee.objects.update(is_overdue=False, status="PENDING")
+                self._measure_engine(options["chunk_size"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def _populate(self, fees):
+        structure = FeeStructure.objects.create(
+            name="Benchmark tuition",
+            fee_type="TUITION",
+            academic_year="2024-25",
+            amount=Decimal("1000.00"),
+            late_fee_applicable=True,
+            late_fee_percentage=Decimal("5.00"),
+            created_by="benchmark",
+        )
+        due_date = timezone.now().date() - timedelta(days=3)
+        StudentFee.objects.bulk_create(
+            StudentFee(
+                fee_structure=structure,
+                student_id=str(i),
+                student_name=f"Student {i}",
+                student_email=f"student{i}@example.com",
+                original_amount=Decimal("1000.00"),
+                final_amount=Decimal("1000.00"),
+                balance_amount=Decimal("1000.00"),
+                due_date=due_date,
+            )
+            for i in range(fees)
+        )
+
+    def _report(self, label, processed, queries, messages, elapsed):
+        self.stdout.write(
+            f"{label:<10} fees={processed:<7} queries={queries:<6} "
+            f"broker messages={messages:<6} "
+            f"{elapsed:7.2f}s {processed / elapsed:9.1f} fees/s"
+        )
+
+    def _measure_per_fee(self):
+        """The previous behaviour: save() and a Transaction insert per fee"""
+        today = timezone.now().date()
+        enqueued = []
+        queries = _QueryCounter()
+        started = time.perf_counter()
+        # The overdue signal enqueues a reminder per fee; count them instead
+        with mock.patch.object(
+            send_payment_reminder, "delay", enqueued.append
+        ), connection.execute_wrapper(queries):
+            student_fees = StudentFee.objects.filter(
+                due_date__lt=today, is_overdue=False
+            ).select_related("fee_structure")
+            processed = 0
+            for student_fee in student_fees:
+                student_fee.is_overdue = True
+                student_fee.status = "OVERDUE"
+                student_fee.late_fee_amount = _late_fee(student_fee)
+                student_fee.final_amount += student_fee.late_fee_amount
+                student_fee.save()
+                Transaction.objects.create(
+                    transaction_type="ADJUSTMENT",
+                    amount=student_fee.late_fee_amount,
+                    description="Late fee",
+                    student_id=student_fee.student_id,
+                    student_name=student_fee.student_name,
+                    reference_type="student_fee",
+                    reference_id=str(student_fee.id),
+                    status="COMPLETED",
+                )
+                processed += 1
+        elapsed = time.perf_counter() - started
+        self._report(
+            "per-fee", processed, queries.count, len(enqueued), elapsed
+        )
+
+    def _measure_engine(self, chunk_size):
+        batches = []
+        queries = _QueryCounter()
+        with connection.execute_wrapper(queries):
+            metrics = run_overdue_engine(batches.append, chunk_size=chunk_size)
+        self._report(
+            "engine",
+            metrics["processed"],
+            queries.count,
+            len(batches),
+            metrics["elapsed_seconds"],
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from finances.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily financial rollup from payments, fine payments and "
+        "student fees, e.g. after bulk edits that bypass the model signals."
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily rollup rows."))
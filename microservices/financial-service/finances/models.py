@@ -150,7 +150,8 @@ class StudentFee(models.Model):
     def __str__(self):
         return f"{self.student_name} - {self.fee_structure.name}"
 
-    def save(self, *args, **kwargs):
+    def update_balance(self):
+        """Recompute balance and status from the amounts (bulk writes skip save)"""
         # Calculate balance amount
         self.balance_amount = self.final_amount - self.paid_amount
 
@@ -163,6 +164,8 @@ class StudentFee(models.Model):
             self.status = "OVERDUE"
             self.is_overdue = True
 
+    def save(self, *args, **kwargs):
+        self.update_balance()
         super().save(*args, **kwargs)
 
 
@@ -596,3 +599,41 @@ class FinancialReport(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.start_date} to {self.end_date})"
+
+
+class DailyFinancialRollup(models.Model):
+    """Per-day totals kept up to date from payment and fee balance changes.
+
+    Collection rows are keyed by fee type and payment method (fine payments
+    have a blank fee type); balance rows have a blank payment method and hold
+    the day's change in outstanding and overdue amounts, so the balance on a
+    date is the sum of the changes up to it.
+    """
+
+    date = models.DateField()
+    fee_type = models.CharField(max_length=20, blank=True)
+    payment_method = models.CharField(max_length=20, blank=True)
+
+    # Collections
+    fee_collections = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    fee_payment_count = models.IntegerField(default=0)
+    fine_collections = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    fine_payment_count = models.IntegerField(default=0)
+
+    # Balance changes
+    outstanding_change = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    overdue_change = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "daily_financial_rollups"
+        indexes = [
+            models.Index(fields=["date"]),
+        ]
+        unique_together = ["date", "fee_type", "payment_method"]
+        ordering = ["-date", "fee_type", "payment_method"]
+
+    def __str__(self):
+        category = self.fee_type or "FINES"
+        return f"{self.date} {category} {self.payment_method or 'BALANCE'}"
@@ -0,0 +1,193 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyFinancialRollup, FinePayment, Payment, StudentFee
+
+ROLLUP_FIELDS = [
+    "fee_collections",
+    "fee_payment_count",
+    "fine_collections",
+    "fine_payment_count",
+    "outstanding_change",
+    "overdue_change",
+]
+
+
+def _add(day, fee_type="", payment_method="", **changes):
+    changes = {field: value for field, value in changes.items() if value}
+    if not changes:
+        return
+    row, _ = DailyFinancialRollup.objects.get_or_create(
+        date=day, fee_type=fee_type, payment_method=payment_method
+    )
+    DailyFinancialRollup.objects.filter(pk=row.pk).update(
+        **{field: F(field) + value for field, value in changes.items()}
+    )
+
+
+def record_fee_payment(payment, sign=1):
+    """Add (or with ``sign=-1`` remove) a successful fee payment"""
+    _add(
+        timezone.localdate(payment.payment_date),
+        payment.student_fee.fee_structure.fee_type,
+        payment.payment_method,
+        fee_collections=sign * payment.amount,
+        fee_payment_count=sign,
+    )
+
+
+def record_fine_payment(fine_payment, sign=1):
+    """Add (or with ``sign=-1`` remove) a successful fine payment"""
+    _add(
+        timezone.localdate(fine_payment.payment_date),
+        "",
+        fine_payment.payment_method,
+        fine_collections=sign * fine_payment.amount,
+        fine_payment_count=sign,
+    )
+
+
+def fee_balance(student_fee):
+    """(outstanding, overdue) amounts a student fee contributes to the totals"""
+    if student_fee is None:
+        return Decimal("0.00"), Decimal("0.00")
+    balance = student_fee.balance_amount
+    return max(balance, Decimal("0.00")), balance if student_fee.is_overdue else 0
+
+
+def record_fee_balance_changes(changes):
+    """Book ``(fee_type, old_balance, new_balance)`` changes on today's rows.
+
+    Balances are pairs from fee_balance(); changes are summed per fee type
+    first so a bulk write costs one row update per fee type.
+    """
+    totals = defaultdict(lambda: [Decimal("0.00"), Decimal("0.00")])
+    for fee_type, (old_outstanding, old_overdue), (outstanding, overdue) in changes:
+        totals[fee_type][0] += outstanding - old_outstanding
+        totals[fee_type][1] += overdue - old_overdue
+
+    today = timezone.now().date()
+    for fee_type, (outstanding, overdue) in totals.items():
+        _add(today, fee_type, outstanding_change=outstanding, overdue_change=overdue)
+
+
+def rollup_totals(start_date=None, end_date=None):
+    """Sums of the rollup columns over an inclusive (optionally open) date range"""
+    rows = DailyFinancialRollup.objects.all()
+    if start_date:
+        rows = rows.filter(date__gte=start_date)
+    if end_date:
+        rows = rows.filter(date__lte=end_date)
+    totals = rows.aggregate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+    return {field: value or 0 for field, value in totals.items()}
+
+
+def collections_breakdown(start_date, end_date):
+    """Fee and fine collections per fee type and payment method in a date range"""
+    return list(
+        DailyFinancialRollup.objects.filter(date__range=[start_date, end_date])
+        .exclude(payment_method="")
+        .values("fee_type", "payment_method")
+        .annotate(
+            fee_collections=Sum("fee_collections"),
+            fee_payment_count=Sum("fee_payment_count"),
+            fine_collections=Sum("fine_collections"),
+            fine_payment_count=Sum("fine_payment_count"),
+        )
+        .order_by("fee_type", "payment_method")
+    )
+
+
+def balances_by_fee_type(end_date=None):
+    """Outstanding and overdue amounts per fee type as of ``end_date``"""
+    rows = DailyFinancialRollup.objects.filter(payment_method="")
+    if end_date:
+        rows = rows.filter(date__lte=end_date)
+    return list(
+        rows.values("fee_type")
+        .annotate(
+            outstanding=Sum("outstanding_change"), overdue=Sum("overdue_change")
+        )
+        .order_by("fee_type")
+    )
+
+
+def report_rows(rows):
+    """Rollup query rows with Decimal sums converted for JSON report data"""
+    return [
+        {
+            key: float(value) if isinstance(value, Decimal) else value
+            for key, value in row.items()
+        }
+        for row in rows
+    ]
+
+
+@transaction.atomic
+def rebuild_rollups():
+    """Recompute every rollup row from payments, fine payments and fees.
+
+    Past balance changes cannot be recovered from the fee rows, so the
+    current outstanding and overdue amounts are booked on today's date.
+    Returns the number of rows written.
+    """
+    rows = {}
+
+    def row(day, fee_type, payment_method):
+        key = (day, fee_type, payment_method)
+        if key not in rows:
+            rows[key] = DailyFinancialRollup(
+                date=day, fee_type=fee_type, payment_method=payment_method
+            )
+        return rows[key]
+
+    fee_payments = (
+        Payment.objects.filter(status="SUCCESS")
+        .annotate(day=TruncDate("payment_date"))
+        .values("day", "student_fee__fee_structure__fee_type", "payment_method")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    for group in fee_payments:
+        rollup = row(
+            group["day"],
+            group["student_fee__fee_structure__fee_type"],
+            group["payment_method"],
+        )
+        rollup.fee_collections = group["total"]
+        rollup.fee_payment_count = group["count"]
+
+    fine_payments = (
+        FinePayment.objects.filter(status="SUCCESS")
+        .annotate(day=TruncDate("payment_date"))
+        .values("day", "payment_method")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    for group in fine_payments:
+        rollup = row(group["day"], "", group["payment_method"])
+        rollup.fine_collections = group["total"]
+        rollup.fine_payment_count = group["count"]
+
+    today = timezone.now().date()
+    balances = (
+        StudentFee.objects.values("fee_structure__fee_type")
+        .annotate(
+            outstanding=Sum("balance_amount", filter=Q(balance_amount__gt=0)),
+            overdue=Sum("balance_amount", filter=Q(is_overdue=True)),
+        )
+        .order_by()
+    )
+    for group in balances:
+        rollup = row(today, group["fee_structure__fee_type"], "")
+        rollup.outstanding_change = group["outstanding"] or 0
+        rollup.overdue_change = group["overdue"] or 0
+
+    DailyFinancialRollup.objects.all().delete()
+    DailyFinancialRollup.objects.bulk_create(rows.values())
+    return len(rows)
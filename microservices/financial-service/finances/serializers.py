@@ -1,11 +1,18 @@
+from collections import defaultdict
 from decimal import Decimal
 
+from django.db import models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from rest_framework import serializers
 
 from .models import (FeeStructure, FinancialReport, Fine, FinePayment, Invoice,
                      Payment, StudentFee, Transaction)
 
+# Number of most recent successful payments shown in payment_history
+PAYMENT_HISTORY_SIZE = 5
+
 
 class FeeStructureSerializer(serializers.ModelSerializer):
     """Serializer for FeeStructure model"""
@@ -55,7 +62,12 @@ class StudentFeeSerializer(serializers.ModelSerializer):
         )
 
     def get_payment_history(self, obj):
-        payments = obj.payments.filter(status="SUCCESS").order_by("-payment_date")[:5]
+        # Prefetched by StudentFeeViewSet; only single instances query here
+        payments = getattr(obj, "recent_payments", None)
+        if payments is None:
+            payments = obj.payments.filter(status="SUCCESS").order_by("-payment_date")[
+                :PAYMENT_HISTORY_SIZE
+            ]
         return PaymentSerializer(payments, many=True).data
 
     def validate(self, data):
@@ -114,9 +126,12 @@ class FineSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "issued_date", "paid_date", "balance_amount")
 
     def get_payment_history(self, obj):
-        payments = obj.fine_payments.filter(status="SUCCESS").order_by("-payment_date")[
-            :5
-        ]
+        # Prefetched by FineViewSet; only single instances query here
+        payments = getattr(obj, "recent_payments", None)
+        if payments is None:
+            payments = obj.fine_payments.filter(status="SUCCESS").order_by(
+                "-payment_date"
+            )[:PAYMENT_HISTORY_SIZE]
         return FinePaymentSerializer(payments, many=True).data
 
     def get_is_overdue(self, obj):
@@ -197,6 +212,49 @@ class InvoiceLineItemSerializer(serializers.Serializer):
         return value
 
 
+def attach_invoice_payments(invoices):
+    """Load the recent payments of many invoices with a single query.
+
+    Invoices are linked to payments through ``gateway_order_id`` rather than a
+    foreign key, so a Prefetch cannot be used; a ROW_NUMBER() window keeps
+    only the newest PAYMENT_HISTORY_SIZE payments per invoice.
+    """
+    pending = [
+        invoice for invoice in invoices if not hasattr(invoice, "recent_payments")
+    ]
+    if not pending:
+        return
+
+    payments = (
+        Payment.objects.filter(
+            gateway_order_id__in=[str(invoice.id) for invoice in pending],
+            status="SUCCESS",
+        )
+        .select_related("student_fee__fee_structure")
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("gateway_order_id")],
+                order_by=F("payment_date").desc(),
+            )
+        )
+        .filter(position__lte=PAYMENT_HISTORY_SIZE)
+        .order_by("gateway_order_id", "-payment_date")
+    )
+    by_invoice = defaultdict(list)
+    for payment in payments:
+        by_invoice[payment.gateway_order_id].append(payment)
+    for invoice in pending:
+        invoice.recent_payments = by_invoice[str(invoice.id)]
+
+
+class InvoiceListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        invoices = list(data.all() if isinstance(data, models.Manager) else data)
+        attach_invoice_payments(invoices)
+        return super().to_representation(invoices)
+
+
 class InvoiceSerializer(serializers.ModelSerializer):
     """Serializer for Invoice model"""
 
@@ -205,6 +263,7 @@ class InvoiceSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Invoice
+        list_serializer_class = InvoiceListSerializer
         fields = "__all__"
         read_only_fields = (
             "id",
@@ -217,10 +276,8 @@ class InvoiceSerializer(serializers.ModelSerializer):
 
     def get_payment_history(self, obj):
         # Get related payments for this invoice
-        payments = Payment.objects.filter(
-            gateway_order_id=str(obj.id), status="SUCCESS"
-        ).order_by("-payment_date")[:5]
-        return PaymentSerializer(payments, many=True).data
+        attach_invoice_payments([obj])
+        return PaymentSerializer(obj.recent_payments, many=True).data
 
     def validate_line_items(self, value):
         if not value:
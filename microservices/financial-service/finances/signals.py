@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from . import rollups
+from .analytics import invalidate_payment_analytics
 from .models import Fine, FinePayment, Payment, StudentFee, Transaction
 from .tasks import send_payment_confirmation, send_payment_reminder
 
@@ -34,6 +36,7 @@ def student_fee_status_changed(sender, instance, **kwargs):
     if instance.pk:
         try:
             old_instance = StudentFee.objects.get(pk=instance.pk)
+            instance._previous = old_instance
 
             # Check if status changed to PAID
             if old_instance.status != "PAID" and instance.status == "PAID":
@@ -77,6 +80,7 @@ def payment_status_changed(sender, instance, **kwargs):
     if instance.pk:
         try:
             old_instance = Payment.objects.get(pk=instance.pk)
+            instance._previous = old_instance
 
             # Check if payment status changed to SUCCESS
             if old_instance.status != "SUCCESS" and instance.status == "SUCCESS":
@@ -99,6 +103,59 @@ def payment_status_changed(sender, instance, **kwargs):
             pass
 
 
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance, **kwargs):
+    """Invalidate cached payment analytics"""
+    invalidate_payment_analytics()
+
+
+def _previous(instance, created):
+    """The row as it was before this save, stored by the pre_save handlers"""
+    previous = instance.__dict__.pop("_previous", None)
+    return None if created else previous
+
+
+@receiver(post_save, sender=StudentFee)
+def student_fee_rollup(sender, instance, created, **kwargs):
+    """Book the change in the fee's outstanding/overdue balance"""
+    old_balance = rollups.fee_balance(_previous(instance, created))
+    new_balance = rollups.fee_balance(instance)
+    if old_balance != new_balance:
+        rollups.record_fee_balance_changes(
+            [(instance.fee_structure.fee_type, old_balance, new_balance)]
+        )
+
+
+@receiver(post_delete, sender=StudentFee)
+def student_fee_deleted_rollup(sender, instance, **kwargs):
+    rollups.record_fee_balance_changes(
+        [
+            (
+                instance.fee_structure.fee_type,
+                rollups.fee_balance(instance),
+                rollups.fee_balance(None),
+            )
+        ]
+    )
+
+
+@receiver(post_save, sender=Payment)
+def payment_rollup(sender, instance, created, **kwargs):
+    """Move successful payments in and out of the daily collections"""
+    previous = _previous(instance, created)
+    if previous is not None and previous.status == "SUCCESS":
+        rollups.record_fee_payment(previous, sign=-1)
+    if instance.status == "SUCCESS":
+        rollups.record_fee_payment(instance)
+
+
+@receiver(post_delete, sender=Payment)
+def payment_deleted_rollup(sender, instance, **kwargs):
+    if instance.status == "SUCCESS":
+        rollups.record_fee_payment(instance, sign=-1)
+
+
 @receiver(post_save, sender=Fine)
 def fine_created(sender, instance, created, **kwargs):
     """Handle fine creation"""
@@ -174,3 +231,25 @@ def fine_payment_created(sender, instance, created, **kwargs):
             status="COMPLETED" if instance.status == "SUCCESS" else "PENDING",
             processed_at=timezone.now() if instance.status == "SUCCESS" else None,
         )
+
+
+@receiver(pre_save, sender=FinePayment)
+def fine_payment_status_changed(sender, instance, **kwargs):
+    """Remember the stored fine payment for the rollup"""
+    instance._previous = FinePayment.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=FinePayment)
+def fine_payment_rollup(sender, instance, created, **kwargs):
+    """Move successful fine payments in and out of the daily collections"""
+    previous = _previous(instance, created)
+    if previous is not None and previous.status == "SUCCESS":
+        rollups.record_fine_payment(previous, sign=-1)
+    if instance.status == "SUCCESS":
+        rollups.record_fine_payment(instance)
+
+
+@receiver(post_delete, sender=FinePayment)
+def fine_payment_deleted_rollup(sender, instance, **kwargs):
+    if instance.status == "SUCCESS":
+        rollups.record_fine_payment(instance, sign=-1)
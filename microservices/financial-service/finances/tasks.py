@@ -1,5 +1,6 @@
 import json
 import logging
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
 
@@ -7,11 +8,13 @@ import requests
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import send_mail
-from django.db.models import Q, Sum
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from .models import (FeeStructure, FinancialReport, Fine, FinePayment, Invoice,
-                     Payment, StudentFee, Transaction)
+from . import rollups, users
+from .models import (FeeStructure, FinancialReport, Fine, Invoice, Payment,
+                     StudentFee, Transaction)
 
 logger = logging.getLogger(__name__)
 
@@ -90,23 +93,20 @@ def send_payment_confirmation(self, payment_id):
         raise self.retry(countdown=60, exc=e)
 
 
-@shared_task(bind=True, max_retries=3)
-def send_payment_reminder(self, student_fee_id):
-    """Send payment reminder to student"""
-    try:
-        student_fee = StudentFee.objects.get(id=student_fee_id)
-
-        if student_fee.status in ["PAID", "WAIVED", "CANCELLED"]:
-            return f"No reminder needed for student fee {student_fee_id} - status: {student_fee.status}"
+def _deliver_payment_reminder(http, student_fee, today):
+    """Send one payment reminder through the Notification Service.
 
-        # Calculate days overdue
-        days_overdue = (timezone.now().date() - student_fee.due_date).days
+    ``http`` is the requests module or a requests.Session to reuse a
+    keep-alive connection across several reminders.
+    """
+    # Calculate days overdue
+    days_overdue = (today - student_fee.due_date).days
 
-        subject = f"Payment Reminder - {student_fee.fee_structure.name}"
-        if days_overdue > 0:
-            subject = f"Overdue Payment - {student_fee.fee_structure.name}"
+    subject = f"Payment Reminder - {student_fee.fee_structure.name}"
+    if days_overdue > 0:
+        subject = f"Overdue Payment - {student_fee.fee_structure.name}"
 
-        message = f"""
+    message = f"""
         Dear {student_fee.student_name},
         
         This is a reminder regarding your pending fee payment.
@@ -126,43 +126,57 @@ def send_payment_reminder(self, student_fee_id):
         Finance Department
         """
 
-        # Send via Notification Service
-        notification_data = {
-            "recipient_id": student_fee.student_id,
-            "recipient_email": student_fee.student_email,
-            "notification_type": "PAYMENT_REMINDER",
-            "title": subject,
-            "message": message,
-            "priority": "HIGH" if days_overdue > 0 else "MEDIUM",
-            "send_email": True,
-            "metadata": {
-                "student_fee_id": str(student_fee.id),
-                "amount_due": str(student_fee.balance_amount),
-                "days_overdue": days_overdue,
-            },
-        }
+    # Send via Notification Service
+    notification_data = {
+        "recipient_id": student_fee.student_id,
+        "recipient_email": student_fee.student_email,
+        "notification_type": "PAYMENT_REMINDER",
+        "title": subject,
+        "message": message,
+        "priority": "HIGH" if days_overdue > 0 else "MEDIUM",
+        "send_email": True,
+        "metadata": {
+            "student_fee_id": str(student_fee.id),
+            "amount_due": str(student_fee.balance_amount),
+            "days_overdue": days_overdue,
+        },
+    }
+
+    # Call Notification Service API
+    try:
+        response = http.post(
+            f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/notifications/notifications/",
+            json=notification_data,
+            timeout=30,
+        )
+        if response.status_code == 201:
+            logger.info(f"Payment reminder sent for student fee {student_fee.id}")
+        else:
+            logger.error(f"Failed to send notification: {response.text}")
+    except requests.RequestException as e:
+        logger.error(f"Notification service error: {str(e)}")
+        # Fallback to direct email
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[student_fee.student_email],
+            fail_silently=False,
+        )
 
-        # Call Notification Service API
-        try:
-            response = requests.post(
-                f"{settings.NOTIFICATION_SERVICE_URL}/api/v1/notifications/notifications/",
-                json=notification_data,
-                timeout=30,
-            )
-            if response.status_code == 201:
-                logger.info(f"Payment reminder sent for student fee {student_fee_id}")
-            else:
-                logger.error(f"Failed to send notification: {response.text}")
-        except requests.RequestException as e:
-            logger.error(f"Notification service error: {str(e)}")
-            # Fallback to direct email
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[student_fee.student_email],
-                fail_silently=False,
-            )
+
+@shared_task(bind=True, max_retries=3)
+def send_payment_reminder(self, student_fee_id):
+    """Send payment reminder to student"""
+    try:
+        student_fee = StudentFee.objects.select_related("fee_structure").get(
+            id=student_fee_id
+        )
+
+        if student_fee.status in ["PAID", "WAIVED", "CANCELLED"]:
+            return f"No reminder needed for student fee {student_fee_id} - status: {student_fee.status}"
+
+        _deliver_payment_reminder(requests, student_fee, timezone.now().date())
 
         return f"Payment reminder sent for student fee {student_fee_id}"
 
@@ -174,50 +188,84 @@ def send_payment_reminder(self, student_fee_id):
         raise self.retry(countdown=60, exc=e)
 
 
-@shared_task
-def process_overdue_payments():
-    """Process overdue payments and apply late fees"""
-    try:
-        today = timezone.now().date()
-
-        # Find overdue student fees
-        overdue_fees = StudentFee.objects.filter(
-            due_date__lt=today,
-            status__in=["PENDING", "PARTIALLY_PAID"],
-            is_overdue=False,
-        )
-
-        processed_count = 0
-        for student_fee in overdue_fees:
-            # Mark as overdue
-            student_fee.is_overdue = True
+@shared_task(bind=True, max_retries=3)
+def send_payment_reminders_batch(self, student_fee_ids):
+    """Send payment reminders for many student fees from one task.
+
+    The fees are loaded with one query and the reminders share one keep-alive
+    session; only the reminders that failed are retried.
+    """
+    today = timezone.now().date()
+    student_fees = StudentFee.objects.filter(id__in=student_fee_ids).select_related(
+        "fee_structure"
+    )
+
+    sent = 0
+    failed = []
+    with requests.Session() as session:
+        for student_fee in student_fees:
+            if student_fee.status in ["PAID", "WAIVED", "CANCELLED"]:
+                continue
+            try:
+                _deliver_payment_reminder(session, student_fee, today)
+                sent += 1
+            except Exception as e:
+                logger.error(
+                    f"Error sending payment reminder for {student_fee.id}: {str(e)}"
+                )
+                failed.append(str(student_fee.id))
+
+    if failed:
+        raise self.retry(args=[failed], countdown=60)
+
+    return f"Sent {sent} payment reminders"
+
+
+def _late_fee(student_fee):
+    """Late fee for a fee that just became overdue (0 when none applies)"""
+    fee_structure = student_fee.fee_structure
+    if not fee_structure.late_fee_applicable:
+        return Decimal("0.00")
+    if fee_structure.late_fee_amount > 0:
+        return fee_structure.late_fee_amount
+    if fee_structure.late_fee_percentage > 0:
+        return student_fee.original_amount * fee_structure.late_fee_percentage / 100
+    return Decimal("0.00")
+
+
+def _mark_overdue(student_fees, now):
+    """Apply late fees to a chunk with bulk updates and one bulk_create.
+
+    Mirrors StudentFee.save(): the balance is recomputed and a fee that
+    already has payments stays PARTIALLY_PAID.
+    """
+    transactions = []
+    balance_changes = []
+    for student_fee in student_fees:
+        old_balance = rollups.fee_balance(student_fee)
+        late_fee_amount = _late_fee(student_fee)
+        if late_fee_amount > 0:
+            student_fee.late_fee_amount = late_fee_amount
+            student_fee.final_amount += late_fee_amount
+
+        student_fee.is_overdue = True
+        student_fee.balance_amount = student_fee.final_amount - student_fee.paid_amount
+        if student_fee.paid_amount >= student_fee.final_amount:
+            student_fee.status = "PAID"
+        elif student_fee.paid_amount > 0:
+            student_fee.status = "PARTIALLY_PAID"
+        else:
             student_fee.status = "OVERDUE"
+        balance_changes.append(
+            (
+                student_fee.fee_structure.fee_type,
+                old_balance,
+                rollups.fee_balance(student_fee),
+            )
+        )
 
-            # Apply late fee if applicable
-            if student_fee.fee_structure.late_fee_applicable:
-                late_fee_amount = Decimal("0.00")
-
-                if student_fee.fee_structure.late_fee_amount > 0:
-                    late_fee_amount = student_fee.fee_structure.late_fee_amount
-                elif student_fee.fee_structure.late_fee_percentage > 0:
-                    late_fee_amount = (
-                        student_fee.original_amount
-                        * student_fee.fee_structure.late_fee_percentage
-                        / 100
-                    )
-
-                if late_fee_amount > 0:
-                    student_fee.late_fee_amount = late_fee_amount
-                    student_fee.final_amount += late_fee_amount
-                    student_fee.balance_amount += late_fee_amount
-
-            student_fee.save()
-
-            # Send overdue notification
-            send_payment_reminder.delay(student_fee.id)
-
-            # Create transaction record
-            Transaction.objects.create(
+        transactions.append(
+            Transaction(
                 transaction_type="ADJUSTMENT",
                 amount=student_fee.late_fee_amount,
                 description=f"Late fee applied for {student_fee.fee_structure.name}",
@@ -226,14 +274,83 @@ def process_overdue_payments():
                 reference_type="student_fee",
                 reference_id=str(student_fee.id),
                 status="COMPLETED",
-                processed_at=timezone.now(),
+                processed_at=now,
                 notes="Automatic late fee application",
             )
+        )
+
+    # Only per-row values go through bulk_update's CASE expressions
+    StudentFee.objects.bulk_update(
+        student_fees,
+        ["status", "late_fee_amount", "final_amount", "balance_amount"],
+        batch_size=250,
+    )
+    StudentFee.objects.filter(pk__in=[fee.pk for fee in student_fees]).update(
+        is_overdue=True, updated_at=now
+    )
+    Transaction.objects.bulk_create(transactions)
+    rollups.record_fee_balance_changes(balance_changes)
+    return len(transactions)
+
+
+def run_overdue_engine(notify, chunk_size=None, today=None):
+    """Mark newly overdue fees and apply late fees chunk by chunk.
+
+    Each chunk is locked, updated and committed on its own, then handed to
+    ``notify`` as a list of fee ids (one batched reminder task per chunk).
+    Returns the run's throughput metrics.
+    """
+    chunk_size = chunk_size or settings.OVERDUE_CHUNK_SIZE
+    today = today or timezone.now().date()
+    started = time.perf_counter()
+
+    overdue_fees = (
+        StudentFee.objects.filter(
+            due_date__lt=today,
+            status__in=["PENDING", "PARTIALLY_PAID"],
+            is_overdue=False,
+        )
+        .select_related("fee_structure")
+        .order_by("pk")
+    )
+
+    processed = transactions = chunks = 0
+    last_pk = None
+    while True:
+        chunk_fees = overdue_fees
+        if last_pk is not None:
+            chunk_fees = chunk_fees.filter(pk__gt=last_pk)
+        with transaction.atomic():
+            student_fees = list(
+                chunk_fees.select_for_update(of=("self",))[:chunk_size]
+            )
+            if not student_fees:
+                break
+            transactions += _mark_overdue(student_fees, timezone.now())
+
+        notify([str(student_fee.id) for student_fee in student_fees])
+        last_pk = student_fees[-1].pk
+        processed += len(student_fees)
+        chunks += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        "processed": processed,
+        "transactions": transactions,
+        "chunks": chunks,
+        "reminder_batches": chunks,
+        "elapsed_seconds": round(elapsed, 3),
+        "fees_per_second": round(processed / elapsed, 1) if elapsed else 0,
+    }
 
-            processed_count += 1
 
-        logger.info(f"Processed {processed_count} overdue payments")
-        return f"Processed {processed_count} overdue payments"
+@shared_task
+def process_overdue_payments():
+    """Process overdue payments and apply late fees"""
+    try:
+        metrics = run_overdue_engine(send_payment_reminders_batch.delay)
+        logger.info(f"Processed overdue payments: {metrics}")
+        return metrics
 
     except Exception as e:
         logger.error(f"Error processing overdue payments: {str(e)}")
@@ -362,20 +479,13 @@ def generate_financial_reports():
         start_of_month = today.replace(day=1)
         end_of_month = today
 
-        # Calculate collections for the month
-        monthly_collections = Payment.objects.filter(
-            payment_date__date__range=[start_of_month, end_of_month], status="SUCCESS"
-        ).aggregate(Sum("amount"))["amount__sum"] or Decimal("0.00")
-
-        # Calculate outstanding amounts
-        total_outstanding = StudentFee.objects.filter(balance_amount__gt=0).aggregate(
-            Sum("balance_amount")
-        )["balance_amount__sum"] or Decimal("0.00")
-
-        # Calculate fine collections
-        fine_collections = FinePayment.objects.filter(
-            payment_date__date__range=[start_of_month, end_of_month], status="SUCCESS"
-        ).aggregate(Sum("amount"))["amount__sum"] or Decimal("0.00")
+        # Collections for the month and outstanding amounts from the daily rollup
+        month = rollups.rollup_totals(start_of_month, end_of_month)
+        monthly_collections = Decimal(month["fee_collections"])
+        fine_collections = Decimal(month["fine_collections"])
+        total_outstanding = Decimal(
+            rollups.rollup_totals(end_date=end_of_month)["outstanding_change"]
+        )
 
         # Create monthly report
         report = FinancialReport.objects.create(
@@ -398,6 +508,9 @@ def generate_financial_reports():
                 if (monthly_collections + total_outstanding) > 0
                 else 0,
                 "generated_date": today.isoformat(),
+                "collections_breakdown": rollups.report_rows(
+                    rollups.collections_breakdown(start_of_month, end_of_month)
+                ),
             },
         )
 
@@ -566,40 +679,35 @@ def process_payment_gateway_callback(self, payment_data):
 
 
 @shared_task(bind=True, max_retries=3)
-def sync_user_data(self, user_data):
-    """Sync user data from User Management Service"""
+def sync_user_data(self, user_data=None):
+    """Sync user data from User Management Service.
+
+    Given a ``user_data`` event ({"user_id", "name", "email"}) only that user
+    is applied; otherwise every user changed since the last sync is.
+    """
+    targets = [
+        (StudentFee.objects.all(), "student_id", "student_name", "student_email"),
+        (Fine.objects.all(), "student_id", "student_name", "student_email"),
+        (Transaction.objects.all(), "student_id", "student_name", None),
+        (Invoice.objects.all(), "student_id", "student_name", "student_email"),
+    ]
     try:
-        user_id = user_data.get("user_id")
-        user_name = user_data.get("name")
-        user_email = user_data.get("email")
+        if user_data is None:
+            return users.sync_users(targets)
 
+        user_id = user_data.get("user_id")
         if not user_id:
             logger.error("No user ID in sync data")
             return "No user ID provided"
 
-        # Update student fees
-        updated_fees = StudentFee.objects.filter(student_id=user_id).update(
-            student_name=user_name, student_email=user_email
-        )
-
-        # Update fines
-        updated_fines = Fine.objects.filter(student_id=user_id).update(
-            student_name=user_name, student_email=user_email
-        )
-
-        # Update transactions
-        updated_transactions = Transaction.objects.filter(student_id=user_id).update(
-            student_name=user_name
-        )
-
-        # Update invoices
-        updated_invoices = Invoice.objects.filter(student_id=user_id).update(
-            student_name=user_name, student_email=user_email
-        )
-
-        logger.info(
-            f"Synced user data for {user_id}: {updated_fees} fees, {updated_fines} fines, {updated_transactions} transactions, {updated_invoices} invoices"
-        )
+        changes = {str(user_id): (user_data.get("name"), user_data.get("email"))}
+        counts = {
+            queryset.model.__name__: users.apply_user_changes(
+                queryset, id_field, changes, name_field, email_field
+            )
+            for queryset, id_field, name_field, email_field in targets
+        }
+        logger.info(f"Synced user data for {user_id}: {counts}")
         return f"Synced user data for {user_id}"
 
     except Exception as e:
@@ -613,28 +721,16 @@ def generate_fee_collection_analytics():
     try:
         today = timezone.now().date()
 
-        # Calculate various analytics
+        # Calculate various analytics from the daily rollup
+        totals = rollups.rollup_totals()
         analytics_data = {
             "total_fees_generated": float(
-                StudentFee.objects.aggregate(Sum("final_amount"))["final_amount__sum"]
-                or 0
-            ),
-            "total_collected": float(
-                StudentFee.objects.aggregate(Sum("paid_amount"))["paid_amount__sum"]
-                or 0
-            ),
-            "total_outstanding": float(
-                StudentFee.objects.aggregate(Sum("balance_amount"))[
-                    "balance_amount__sum"
-                ]
-                or 0
-            ),
-            "overdue_amount": float(
-                StudentFee.objects.filter(is_overdue=True).aggregate(
-                    Sum("balance_amount")
-                )["balance_amount__sum"]
-                or 0
+                totals["fee_collections"] + totals["outstanding_change"]
             ),
+            "total_collected": float(totals["fee_collections"]),
+            "total_outstanding": float(totals["outstanding_change"]),
+            "overdue_amount": float(totals["overdue_change"]),
+            "by_fee_type": rollups.report_rows(rollups.balances_by_fee_type()),
             "collection_efficiency": 0,
             "generated_date": today.isoformat(),
         }
@@ -2,7 +2,7 @@ import logging
 from decimal import Decimal
 
 from django.db import transaction
-from django.db.models import Avg, Count, Q, Sum
+from django.db.models import Count, Prefetch, Q, Sum
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
@@ -10,9 +10,12 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .models import (FeeStructure, FinancialReport, Fine, FinePayment, Invoice,
-                     Payment, StudentFee, Transaction)
-from .serializers import (BulkPaymentSerializer, BulkStudentFeeSerializer,
+from . import rollups
+from .analytics import payment_analytics
+from .models import (DailyFinancialRollup, FeeStructure, FinancialReport, Fine,
+                     FinePayment, Invoice, Payment, StudentFee, Transaction)
+from .serializers import (PAYMENT_HISTORY_SIZE, BulkPaymentSerializer,
+                          BulkStudentFeeSerializer,
                           FeeCollectionStatsSerializer, FeeStructureSerializer,
                           FinancialReportSerializer, FineAnalyticsSerializer,
                           FinePaymentSerializer, FineSerializer,
@@ -23,7 +26,9 @@ from .serializers import (BulkPaymentSerializer, BulkStudentFeeSerializer,
                           StudentFinancialSummarySerializer,
                           TransactionSerializer)
 from .tasks import (generate_invoice_task, process_payment_gateway_callback,
-                    send_payment_confirmation, send_payment_reminder)
+                    send_payment_confirmation, send_payment_reminder,
+                    send_payment_reminders_batch)
+from .users import fetch_user_info
 
 logger = logging.getLogger(__name__)
 
@@ -90,7 +95,15 @@ class FeeStructureViewSet(viewsets.ModelViewSet):
 class StudentFeeViewSet(viewsets.ModelViewSet):
     """ViewSet for managing student fees"""
 
-    queryset = StudentFee.objects.select_related("fee_structure").all()
+    queryset = StudentFee.objects.select_related("fee_structure").prefetch_related(
+        Prefetch(
+            "payments",
+            queryset=Payment.objects.filter(status="SUCCESS").order_by("-payment_date")[
+                :PAYMENT_HISTORY_SIZE
+            ],
+            to_attr="recent_payments",
+        )
+    )
     serializer_class = StudentFeeSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [
@@ -109,51 +122,92 @@ class StudentFeeViewSet(viewsets.ModelViewSet):
         serializer = BulkStudentFeeSerializer(data=request.data)
         if serializer.is_valid():
             try:
+                fee_structure_id = serializer.validated_data["fee_structure_id"]
+                student_ids = serializer.validated_data["student_ids"]
+                discount_amount = serializer.validated_data.get("discount_amount", 0)
+                discount_reason = serializer.validated_data.get("discount_reason", "")
+
+                fee_structure = FeeStructure.objects.get(id=fee_structure_id)
+
+                # One query for the students that already have this fee
+                existing = set(
+                    StudentFee.objects.filter(
+                        fee_structure=fee_structure, student_id__in=student_ids
+                    ).values_list("student_id", flat=True)
+                )
+                new_student_ids = [
+                    student_id
+                    for student_id in dict.fromkeys(student_ids)
+                    if student_id not in existing
+                ]
+                users = fetch_user_info(new_student_ids)
+
+                # Calculate final amount
+                final_amount = fee_structure.amount - discount_amount
+
+                created_fees = []
+                for student_id in new_student_ids:
+                    user = users.get(student_id, {})
+                    student_fee = StudentFee(
+                        fee_structure=fee_structure,
+                        student_id=student_id,
+                        student_name=user.get("name", f"Student {student_id}"),
+                        student_email=user.get(
+                            "email", f"student{student_id}@example.com"
+                        ),
+                        original_amount=fee_structure.amount,
+                        discount_amount=discount_amount,
+                        final_amount=final_amount,
+                        due_date=fee_structure.due_date,
+                        discount_reason=discount_reason,
+                    )
+                    student_fee.update_balance()
+                    created_fees.append(student_fee)
+
+                # The user service is called before the transaction opens, so
+                # no connection is held while waiting on it
                 with transaction.atomic():
-                    fee_structure_id = serializer.validated_data["fee_structure_id"]
-                    student_ids = serializer.validated_data["student_ids"]
-                    discount_amount = serializer.validated_data.get(
-                        "discount_amount", 0
+                    # bulk_create skips the post_save signal, so its transaction
+                    # records and reminders are written here in bulk instead
+                    StudentFee.objects.bulk_create(created_fees)
+                    Transaction.objects.bulk_create(
+                        Transaction(
+                            transaction_type="FEE_PAYMENT",
+                            amount=student_fee.final_amount,
+                            description=f"Fee assigned: {fee_structure.name}",
+                            student_id=student_fee.student_id,
+                            student_name=student_fee.student_name,
+                            reference_type="student_fee",
+                            reference_id=str(student_fee.id),
+                            status="PENDING",
+                        )
+                        for student_fee in created_fees
                     )
-                    discount_reason = serializer.validated_data.get(
-                        "discount_reason", ""
+                    rollups.record_fee_balance_changes(
+                        (
+                            fee_structure.fee_type,
+                            rollups.fee_balance(None),
+                            rollups.fee_balance(student_fee),
+                        )
+                        for student_fee in created_fees
                     )
-
-                    fee_structure = FeeStructure.objects.get(id=fee_structure_id)
-                    created_fees = []
-
-                    for student_id in student_ids:
-                        # Check if fee already exists
-                        if StudentFee.objects.filter(
-                            fee_structure=fee_structure, student_id=student_id
-                        ).exists():
-                            continue
-
-                        # Calculate final amount
-                        final_amount = fee_structure.amount - discount_amount
-
-                        student_fee = StudentFee.objects.create(
-                            fee_structure=fee_structure,
-                            student_id=student_id,
-                            student_name=f"Student {student_id}",  # This should come from User Service
-                            student_email=f"student{student_id}@example.com",  # This should come from User Service
-                            original_amount=fee_structure.amount,
-                            discount_amount=discount_amount,
-                            final_amount=final_amount,
-                            balance_amount=final_amount,
-                            due_date=fee_structure.due_date,
-                            discount_reason=discount_reason,
+                    for student_fee in created_fees:
+                        # New fees have no payments to look up when serialized
+                        student_fee.recent_payments = []
+                    fee_ids = [str(student_fee.id) for student_fee in created_fees]
+                    if fee_ids:
+                        transaction.on_commit(
+                            lambda: send_payment_reminders_batch.delay(fee_ids)
                         )
-                        created_fees.append(student_fee)
 
-                    serializer = StudentFeeSerializer(created_fees, many=True)
-                    return Response(
-                        {
-                            "message": f"Created {len(created_fees)} student fees",
-                            "fees": serializer.data,
-                        },
-                        status=status.HTTP_201_CREATED,
-                    )
+                serializer = StudentFeeSerializer(created_fees, many=True)
+                return Response(
+                    {
+                        "message": f"Created {len(created_fees)} student fees",
+                        "fees": serializer.data,
+                    },
+                    status=status.HTTP_201_CREATED,
+                )
 
             except FeeStructure.DoesNotExist:
                 return Response(
@@ -406,67 +460,11 @@ class PaymentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def analytics(self, request):
         """Get payment analytics"""
-        # Date range filtering
-        start_date = request.query_params.get("start_date")
-        end_date = request.query_params.get("end_date")
-
-        queryset = self.queryset.filter(status="SUCCESS")
-        if start_date:
-            queryset = queryset.filter(payment_date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(payment_date__lte=end_date)
-
-        # Calculate analytics
-        total_payments = queryset.count()
-        total_amount = queryset.aggregate(Sum("amount"))["amount__sum"] or 0
-        average_amount = queryset.aggregate(Avg("amount"))["amount__avg"] or 0
-
-        # Payment method breakdown
-        method_breakdown = {}
-        for method, _ in Payment.PAYMENT_METHODS:
-            count = queryset.filter(payment_method=method).count()
-            amount = (
-                queryset.filter(payment_method=method).aggregate(Sum("amount"))[
-                    "amount__sum"
-                ]
-                or 0
-            )
-            method_breakdown[method] = {"count": count, "amount": float(amount)}
-
-        # Gateway breakdown
-        gateway_breakdown = {}
-        for gateway, _ in Payment.GATEWAY_CHOICES:
-            count = queryset.filter(payment_gateway=gateway).count()
-            amount = (
-                queryset.filter(payment_gateway=gateway).aggregate(Sum("amount"))[
-                    "amount__sum"
-                ]
-                or 0
-            )
-            gateway_breakdown[gateway] = {"count": count, "amount": float(amount)}
-
-        # Success rate (including failed payments)
-        all_payments = self.queryset
-        if start_date:
-            all_payments = all_payments.filter(payment_date__gte=start_date)
-        if end_date:
-            all_payments = all_payments.filter(payment_date__lte=end_date)
-
-        total_attempts = all_payments.count()
-        success_rate = (
-            (total_payments / total_attempts * 100) if total_attempts > 0 else 0
+        analytics_data = payment_analytics(
+            request.query_params.get("start_date"),
+            request.query_params.get("end_date"),
         )
 
-        analytics_data = {
-            "total_payments": total_payments,
-            "total_amount": total_amount,
-            "average_payment_amount": average_amount,
-            "payment_method_breakdown": method_breakdown,
-            "gateway_breakdown": gateway_breakdown,
-            "success_rate": success_rate,
-            "daily_trends": [],  # This would be calculated based on requirements
-        }
-
         serializer = PaymentAnalyticsSerializer(analytics_data)
         return Response(serializer.data)
 
@@ -474,7 +472,15 @@ class PaymentViewSet(viewsets.ModelViewSet):
 class FineViewSet(viewsets.ModelViewSet):
     """ViewSet for managing fines"""
 
-    queryset = Fine.objects.all()
+    queryset = Fine.objects.prefetch_related(
+        Prefetch(
+            "fine_payments",
+            queryset=FinePayment.objects.filter(status="SUCCESS").order_by(
+                "-payment_date"
+            )[:PAYMENT_HISTORY_SIZE],
+            to_attr="recent_payments",
+        )
+    )
     serializer_class = FineSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [
@@ -734,30 +740,13 @@ class FinancialReportViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Calculate report data
-        # Fee collections
-        fee_collections = (
-            StudentFee.objects.filter(
-                last_payment_date__range=[start_date, end_date]
-            ).aggregate(Sum("paid_amount"))["paid_amount__sum"]
-            or 0
-        )
-
-        # Outstanding fees
-        outstanding_fees = (
-            StudentFee.objects.filter(balance_amount__gt=0).aggregate(
-                Sum("balance_amount")
-            )["balance_amount__sum"]
-            or 0
-        )
-
-        # Fine collections
-        fine_collections = (
-            Fine.objects.filter(paid_date__range=[start_date, end_date]).aggregate(
-                Sum("paid_amount")
-            )["paid_amount__sum"]
-            or 0
-        )
+        # Calculate report data from the daily rollup
+        period = rollups.rollup_totals(start_date, end_date)
+        fee_collections = period["fee_collections"]
+        fine_collections = period["fine_collections"]
+        outstanding_fees = rollups.rollup_totals(end_date=end_date)[
+            "outstanding_change"
+        ]
 
         # Create report
         report = FinancialReport.objects.create(
@@ -774,6 +763,9 @@ class FinancialReportViewSet(viewsets.ModelViewSet):
                 "fine_collections": float(fine_collections),
                 "outstanding_fees": float(outstanding_fees),
                 "period": f"{start_date} to {end_date}",
+                "collections_breakdown": rollups.report_rows(
+                    rollups.collections_breakdown(start_date, end_date)
+                ),
             },
         )
 
@@ -783,39 +775,19 @@ class FinancialReportViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def dashboard_stats(self, request):
         """Get dashboard statistics"""
-        # Today's collections
+        # Collections and balances from the daily rollup in one query
         today = timezone.now().date()
-        today_collections = (
-            Payment.objects.filter(
-                payment_date__date=today, status="SUCCESS"
-            ).aggregate(Sum("amount"))["amount__sum"]
-            or 0
-        )
-
-        # This month's collections
         this_month = today.replace(day=1)
-        month_collections = (
-            Payment.objects.filter(
-                payment_date__date__gte=this_month, status="SUCCESS"
-            ).aggregate(Sum("amount"))["amount__sum"]
-            or 0
-        )
-
-        # Total outstanding
-        total_outstanding = (
-            StudentFee.objects.filter(balance_amount__gt=0).aggregate(
-                Sum("balance_amount")
-            )["balance_amount__sum"]
-            or 0
-        )
-
-        # Overdue fees
-        overdue_amount = (
-            StudentFee.objects.filter(is_overdue=True).aggregate(Sum("balance_amount"))[
-                "balance_amount__sum"
-            ]
-            or 0
+        totals = DailyFinancialRollup.objects.aggregate(
+            today_collections=Sum("fee_collections", filter=Q(date=today)),
+            month_collections=Sum("fee_collections", filter=Q(date__gte=this_month)),
+            total_outstanding=Sum("outstanding_change"),
+            overdue_amount=Sum("overdue_change"),
         )
+        today_collections = totals["today_collections"] or 0
+        month_collections = totals["month_collections"] or 0
+        total_outstanding = totals["total_outstanding"] or 0
+        overdue_amount = totals["overdue_amount"] or 0
 
         stats = {
             "today_collections": float(today_collections),
@@ -212,6 +212,12 @@ LATE_FEE_PERCENTAGE = config("LATE_FEE_PERCENTAGE", default=5, cast=int)
 PAYMENT_TIMEOUT_DAYS = config("PAYMENT_TIMEOUT_DAYS", default=30, cast=int)
 AUTO_GENERATE_INVOICES = config("AUTO_GENERATE_INVOICES", default=True, cast=bool)
 ENABLE_INSTALLMENTS = config("ENABLE_INSTALLMENTS", default=True, cast=bool)
+# Student fees updated per transaction by the overdue/late fee engine
+OVERDUE_CHUNK_SIZE = config("OVERDUE_CHUNK_SIZE", default=1000, cast=int)
+# Seconds a payment analytics result is cached (saving a Payment invalidates it)
+PAYMENT_ANALYTICS_CACHE_TIMEOUT = config(
+    "PAYMENT_ANALYTICS_CACHE_TIMEOUT", default=300, cast=int
+)
 
 # Logging
 LOGGING = {
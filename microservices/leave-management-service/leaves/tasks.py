@@ -285,31 +285,13 @@ def sync_user_data():
     """Sync user data from User Management Service"""
     try:
         from .models import LeaveRequest
+        from .users import sync_users
 
-        # Get unique user IDs from leave requests
-        user_ids = LeaveRequest.objects.values_list("user_id", flat=True).distinct()
-
-        # Fetch user data from User Management Service
-        response = requests.post(
-            f"{settings.USER_MANAGEMENT_SERVICE_URL}/api/v1/users/bulk_info/",
-            json={"user_ids": list(user_ids)},
-            timeout=30,
+        # Update leave requests with latest user data
+        return sync_users(
+            [(LeaveRequest.objects.all(), "user_id", "user_name", "user_email")]
         )
 
-        if response.status_code == 200:
-            users_data = response.json()
-
-            # Update leave requests with latest user data
-            for user_data in users_data:
-                LeaveRequest.objects.filter(user_id=user_data["id"]).update(
-                    user_name=f"{user_data['first_name']} {user_data['last_name']}",
-                    user_email=user_data["email"],
-                )
-
-            logger.info(f"Synced data for {len(users_data)} users")
-        else:
-            logger.error(f"Failed to sync user data: {response.text}")
-
     except Exception as exc:
         logger.error(f"Error syncing user data: {str(exc)}")
         raise
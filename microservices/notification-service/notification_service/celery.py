@@ -4,6 +4,7 @@ Celery configuration for notification_service project.
 import os
 
 from celery import Celery
+from celery.signals import celeryd_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "notification_service.settings")
@@ -19,6 +20,10 @@ app.autodiscover_tasks()
 
 # Periodic tasks
 app.conf.beat_schedule = {
+    "dispatch-due-notifications": {
+        "task": "notifications.tasks.dispatch_due_notifications",
+        "schedule": 10.0,  # Scheduled, retried and bulk-created notifications
+    },
     "cleanup-old-notifications": {
         "task": "notifications.tasks.cleanup_old_notifications",
         "schedule": 86400.0,  # Run daily
@@ -28,6 +33,28 @@ app.conf.beat_schedule = {
 app.conf.timezone = "UTC"
 
 
+@celeryd_init.connect
+def set_queue_concurrency(sender, conf, options, **kwargs):
+    """Size workers started on notification queues from settings.
+
+    ``celery -A notification_service worker -Q notifications.urgent`` runs
+    NOTIFICATION_QUEUE_CONCURRENCY["notifications.urgent"] processes; an
+    explicit --concurrency wins.
+    """
+    from django.conf import settings
+
+    queues = options.get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    if options.get("concurrency") or not queues:
+        return
+    concurrency = sum(
+        settings.NOTIFICATION_QUEUE_CONCURRENCY.get(queue, 0) for queue in queues
+    )
+    if concurrency:
+        conf.worker_concurrency = concurrency
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")
@@ -147,6 +147,14 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Cache shared by the web and worker processes
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": config("REDIS_URL", default="redis://redis:6379/2"),
+    }
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = config("CELERY_BROKER_URL", default="redis://redis:6379/2")
 CELERY_RESULT_BACKEND = config("CELERY_RESULT_BACKEND", default="redis://redis:6379/2")
@@ -154,6 +162,18 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_DEFAULT_QUEUE = "notifications.normal"
+CELERY_TASK_ROUTES = {
+    "notifications.tasks.dispatch_due_notifications": {
+        "queue": "notifications.scheduler"
+    },
+    "notifications.tasks.dispatch_pending_emails": {"queue": "notifications.email"},
+    "notifications.tasks.send_bulk_notifications": {"queue": "notifications.low"},
+    "notifications.tasks.cleanup_old_notifications": {"queue": "notifications.low"},
+}
+# Reserve one message per worker process, so queued work is not held
+# behind a process that is busy with a slow send
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 
 # Email Configuration
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -165,6 +185,70 @@ EMAIL_HOST_PASSWORD = config("SENDGRID_API_KEY", default="")
 DEFAULT_FROM_EMAIL = config(
     "DEFAULT_FROM_EMAIL", default="noreply@studentmanagement.com"
 )
+# Recipients accepted by one bulk create, and created per batch
+NOTIFICATION_BULK_MAX_RECIPIENTS = config(
+    "NOTIFICATION_BULK_MAX_RECIPIENTS", default=50000, cast=int
+)
+NOTIFICATION_BULK_BATCH_SIZE = config(
+    "NOTIFICATION_BULK_BATCH_SIZE", default=1000, cast=int
+)
+# Per-process cache of recipient contact details from preferences
+NOTIFICATION_PREFERENCE_CACHE_SIZE = config(
+    "NOTIFICATION_PREFERENCE_CACHE_SIZE", default=10000, cast=int
+)
+NOTIFICATION_PREFERENCE_CACHE_TTL = config(
+    "NOTIFICATION_PREFERENCE_CACHE_TTL", default=60, cast=int
+)
+# Due notifications claimed per query by the scheduler
+NOTIFICATION_SCHEDULER_CHUNK_SIZE = config(
+    "NOTIFICATION_SCHEDULER_CHUNK_SIZE", default=500, cast=int
+)
+# Seconds a claimed notification may wait for its send task, on top of its
+# channel's queue backlog at the rate limit, before it is queued again; and
+# seconds a started send may run before it is marked failed
+NOTIFICATION_PROCESSING_TIMEOUT = config(
+    "NOTIFICATION_PROCESSING_TIMEOUT", default=900, cast=int
+)
+# Celery queue per notification priority; send tasks are queued by enqueue_notification
+NOTIFICATION_PRIORITY_QUEUES = {
+    "urgent": "notifications.urgent",
+    "high": "notifications.high",
+    "normal": "notifications.normal",
+    "low": "notifications.low",
+}
+# Worker processes for a worker started with -Q on these queues and no
+# --concurrency; a worker on several queues gets their sum
+NOTIFICATION_QUEUE_CONCURRENCY = {
+    "notifications.urgent": config(
+        "NOTIFICATION_URGENT_CONCURRENCY", default=2, cast=int
+    ),
+    "notifications.high": config("NOTIFICATION_HIGH_CONCURRENCY", default=2, cast=int),
+    "notifications.normal": config(
+        "NOTIFICATION_NORMAL_CONCURRENCY", default=4, cast=int
+    ),
+    "notifications.low": config("NOTIFICATION_LOW_CONCURRENCY", default=2, cast=int),
+    "notifications.email": config(
+        "NOTIFICATION_EMAIL_CONCURRENCY", default=1, cast=int
+    ),
+    "notifications.scheduler": 1,
+}
+# Sends per worker per channel, as Celery rate limits ("10/s", "600/m"); empty
+# for no limit. Batched email dispatch is paced to the email limit.
+NOTIFICATION_CHANNEL_RATE_LIMITS = {
+    "email": config("EMAIL_RATE_LIMIT", default="50/s") or None,
+    "sms": config("SMS_RATE_LIMIT", default="10/s") or None,
+    "in_app": config("IN_APP_RATE_LIMIT", default="") or None,
+}
+# Email notifications claimed and sent per SMTP connection
+EMAIL_DISPATCH_BATCH_SIZE = config("EMAIL_DISPATCH_BATCH_SIZE", default=200, cast=int)
+# Seconds a new email waits so a burst is sent in one dispatch
+EMAIL_DISPATCH_DELAY_SECONDS = config(
+    "EMAIL_DISPATCH_DELAY_SECONDS", default=2, cast=int
+)
+# Seconds the dispatch lock outlives its last refresh if a dispatcher dies
+EMAIL_DISPATCH_LOCK_SECONDS = config(
+    "EMAIL_DISPATCH_LOCK_SECONDS", default=120, cast=int
+)
 
 # Twilio Configuration
 TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID", default="")
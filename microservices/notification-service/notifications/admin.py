@@ -110,7 +110,7 @@ class NotificationAdmin(admin.ModelAdmin):
 
     def retry_failed_notifications(self, request, queryset):
         """Retry failed notifications."""
-        from .tasks import send_notification
+        from .tasks import queue_notification
 
         retried = 0
         for notification in queryset.filter(status="failed"):
@@ -118,7 +118,7 @@ class NotificationAdmin(admin.ModelAdmin):
                 notification.status = "pending"
                 notification.error_message = ""
                 notification.save(update_fields=["status", "error_message"])
-                send_notification.delay(str(notification.id))
+                queue_notification(notification)
                 retried += 1
 
         self.message_user(request, f"{retried} notifications queued for retry.")
@@ -0,0 +1,108 @@
+"""
+Benchmark bulk notification creation for large recipient lists.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from notifications.models import (Notification, NotificationChannel,
+                                  NotificationPreference)
+from notifications.preferences import preference_cache
+from notifications.serializers import BulkCreateNotificationSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _QueryCounter:
+    """Counts queries without keeping them, unlike the capped debug log"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries and time to create email broadcasts of growing size, "
+        "with a preference lookup per recipient against batched lookups. Rows "
+        "are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", default="5000,20000")
+
+    def handle(self, *args, **options):
+        for recipients in [int(count) for count in options["recipients"].split(",")]:
+            recipient_ids = [str(i) for i in range(recipients)]
+            try:
+                with transaction.atomic():
+                    self._populate(recipients)
+                    self._measure(
+                        "per recipient", self._create_per_recipient, recipient_ids
+                    )
+                    preference_cache.clear()
+                    for label in ("batched", "batched, cached"):
+                        self._measure(label, self._create_batched, recipient_ids)
+                    raise _Rollback
+            except _Rollback:
+                pass
+            preference_cache.clear()
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def _populate(self, recipients):
+        # Every other recipient has preferences
+        NotificationPreference.objects.bulk_create(
+            (
+                NotificationPreference(
+                    user_id=str(i), email_address=f"user{i}@example.com"
+                )
+                for i in range(0, recipients, 2)
+            ),
+            batch_size=1000,
+        )
+
+    def _measure(self, label, create, recipient_ids):
+        counter = _QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            created = create(recipient_ids)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label:<16} recipients={created:<6} queries={counter.count:<6} "
+            f"{elapsed:6.2f}s {created / elapsed:8.0f} recipients/s"
+        )
+
+    def _create_per_recipient(self, recipient_ids):
+        """The previous behaviour: a preference query per recipient"""
+        notifications = []
+        for recipient_id in recipient_ids:
+            notification = Notification(
+                recipient_id=recipient_id,
+                channel=NotificationChannel.EMAIL,
+                message="Benchmark broadcast",
+            )
+            try:
+                pref = NotificationPreference.objects.get(user_id=recipient_id)
+                notification.email = pref.email_address
+            except NotificationPreference.DoesNotExist:
+                pass
+            notifications.append(notification)
+        return len(Notification.objects.bulk_create(notifications))
+
+    def _create_batched(self, recipient_ids):
+        serializer = BulkCreateNotificationSerializer(
+            data={
+                "recipient_ids": recipient_ids,
+                "channel": NotificationChannel.EMAIL,
+                "message": "Benchmark broadcast",
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        return len(serializer.save())
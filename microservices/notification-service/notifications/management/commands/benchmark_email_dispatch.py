@@ -0,0 +1,179 @@
+"""
+Benchmark email delivery against a local SMTP stand-in.
+"""
+import socketserver
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from notifications.models import (Notification, NotificationChannel,
+                                  NotificationLog, NotificationStatus)
+from notifications.tasks import dispatch_pending_emails, send_email
+
+
+class _Rollback(Exception):
+    pass
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server that accepts every message and counts sessions."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.latency = latency
+        self.connections = 0
+        self.messages = 0
+        self.lock = threading.Lock()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def reply(self, line):
+        # Every reply stands for a network round trip to a real provider
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        self.reply("220 localhost SMTP stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.wfile.write(b"250-localhost\r\n")
+                self.reply("250 8BITMIME")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with self.server.lock:
+                    self.server.messages += 1
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                # HELO, MAIL, RCPT, RSET, NOOP
+                self.reply("250 OK")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure email notifications sent per second, one connection per message "
+        "against batched dispatch, using a local SMTP stand-in. Rows are created "
+        "inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--emails", type=int, default=2000)
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Seconds the stand-in waits before each reply",
+        )
+
+    def handle(self, *args, **options):
+        server = SMTPStandIn(options["latency"])
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        smtp_settings = override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=server.server_address[1],
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+            # Measure SMTP throughput rather than the configured pacing
+            NOTIFICATION_CHANNEL_RATE_LIMITS={
+                **settings.NOTIFICATION_CHANNEL_RATE_LIMITS,
+                "email": None,
+            },
+        )
+
+        try:
+            with smtp_settings:
+                for label, send in (
+                    ("per message", self._send_per_message),
+                    (
+                        "batched",
+                        lambda: dispatch_pending_emails(options["batch_size"])[
+                            "delivered"
+                        ],
+                    ),
+                ):
+                    server.connections = server.messages = 0
+                    try:
+                        with transaction.atomic():
+                            self._populate(options["emails"])
+                            started = time.perf_counter()
+                            sent = send()
+                            elapsed = time.perf_counter() - started
+                            self.stdout.write(
+                                f"{label:<12} sent={sent:<6} "
+                                f"received={server.messages:<6} "
+                                f"connections={server.connections:<6} "
+                                f"{elapsed:7.2f}s {sent / elapsed:8.1f} msgs/s"
+                            )
+                            raise _Rollback
+                    except _Rollback:
+                        pass
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def _populate(self, emails):
+        # bulk_create skips the signal that would queue a dispatch
+        Notification.objects.bulk_create(
+            (
+                Notification(
+                    recipient_id=str(i),
+                    email=f"student{i}@example.com",
+                    channel=NotificationChannel.EMAIL,
+                    subject="Benchmark",
+                    message="Benchmark message",
+                    html_message="<p>Benchmark message</p>",
+                )
+                for i in range(emails)
+            ),
+            batch_size=1000,
+        )
+
+    def _send_per_message(self):
+        """The previous delivery: one task, connection, save and log per email"""
+        sent = 0
+        with mock.patch("notifications.tasks.send_notification.apply_async"):
+            for notification in Notification.objects.filter(
+                channel=NotificationChannel.EMAIL, status=NotificationStatus.PENDING
+            ):
+                notification.status = NotificationStatus.PROCESSING
+                notification.save(update_fields=["status", "updated_at"])
+                success, error = send_email(notification)
+                notification.status = (
+                    NotificationStatus.DELIVERED
+                    if success
+                    else NotificationStatus.FAILED
+                )
+                NotificationLog.objects.create(
+                    notification=notification,
+                    status=notification.status,
+                    message="Notification delivered successfully",
+                )
+                notification.save()
+                sent += success
+        return sent
@@ -0,0 +1,82 @@
+"""
+Benchmark the notification scheduler at different schedule depths.
+"""
+import time
+import tracemalloc
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from notifications.models import Notification, NotificationChannel
+from notifications.tasks import dispatch_due_notifications
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure a scheduler tick with growing numbers of notifications "
+        "scheduled for later. Rows are created inside a transaction that is "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--depths", default="10000,50000,100000")
+        parser.add_argument("--due", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        for depth in [int(depth) for depth in options["depths"].split(",")]:
+            try:
+                with transaction.atomic():
+                    self._populate(depth, options["due"])
+                    self._measure(depth)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished, data rolled back."))
+
+    def _populate(self, depth, due):
+        now = timezone.now()
+        # bulk_create skips the signal that would queue the due ones
+        Notification.objects.bulk_create(
+            (
+                Notification(
+                    recipient_id=str(i),
+                    channel=NotificationChannel.IN_APP,
+                    message="Benchmark message",
+                    scheduled_at=now
+                    + timezone.timedelta(seconds=-60 if i < due else i % 86400 + 60),
+                )
+                for i in range(depth + due)
+            ),
+            batch_size=1000,
+        )
+
+    def _measure(self, depth):
+        queued = []
+        with mock.patch(
+            "notifications.tasks.enqueue_notification",
+            lambda *args: queued.append(args),
+        ), mock.patch("notifications.tasks.dispatch_pending_emails"):
+            tracemalloc.start()
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as ctx:
+                result = dispatch_due_notifications()
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        # Previously each scheduled notification was an ETA message that
+        # every worker prefetched and held until it was due
+        self.stdout.write(
+            f"scheduled={depth:<7} ETA messages before={depth:<7} now=0  "
+            f"tick: queued={len(queued):<5} chunks={result['chunks']:<3} "
+            f"queries={len(ctx.captured_queries):<4} {elapsed * 1000:7.1f}ms "
+            f"peak={peak / 1024:7.1f}KiB"
+        )
@@ -0,0 +1,139 @@
+"""
+Load test notification queue routing while a bulk campaign is being sent.
+"""
+import logging
+import statistics
+import threading
+import time
+from contextlib import ExitStack
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.models import NotificationPriority
+from notifications.tasks import notification_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure urgent notification latency while a bulk campaign is being "
+        "sent, with every notification on one queue against the priority "
+        "queues. Embedded workers run on an in-memory broker, one per worker "
+        "process; sends are simulated with a fixed delay and no rows are "
+        "written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bulk", type=int, default=2000)
+        parser.add_argument("--urgent", type=int, default=100)
+        parser.add_argument("--urgent-interval-ms", type=float, default=20)
+        parser.add_argument("--send-ms", type=float, default=20)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.app = Celery("notification_load_test", broker="memory://")
+        self.app.conf.update(
+            task_default_queue=settings.CELERY_TASK_DEFAULT_QUEUE,
+            worker_prefetch_multiplier=settings.CELERY_WORKER_PREFETCH_MULTIPLIER,
+            worker_hijack_root_logger=False,
+            broker_connection_retry_on_startup=True,
+            task_ignore_result=True,
+            broker_transport_options={"polling_interval": 0.001},
+        )
+        self.latencies = {}
+        self.lock = threading.Lock()
+        self.done = threading.Semaphore(0)
+        send_seconds = options["send_ms"] / 1000
+
+        @self.app.task(name="load_test.send")
+        def simulated_send(priority, enqueued_at):
+            time.sleep(send_seconds)
+            with self.lock:
+                self.latencies[priority].append(time.perf_counter() - enqueued_at)
+            self.done.release()
+
+        self.send = simulated_send
+
+        concurrency = settings.NOTIFICATION_QUEUE_CONCURRENCY
+        urgent_queues = [
+            notification_queue(NotificationPriority.URGENT),
+            notification_queue(NotificationPriority.HIGH),
+        ]
+        bulk_queues = [
+            notification_queue(NotificationPriority.NORMAL),
+            notification_queue(NotificationPriority.LOW),
+        ]
+        workers = [
+            (queues, sum(concurrency[queue] for queue in queues))
+            for queues in (urgent_queues, bulk_queues)
+        ]
+        total = sum(processes for _, processes in workers)
+
+        # Worker startup warnings would interleave with the results
+        logging.disable(logging.WARNING)
+        try:
+            # The previous layout: one queue and one worker of the same size
+            self._run(
+                "one queue",
+                [([settings.CELERY_TASK_DEFAULT_QUEUE], total)],
+                lambda priority: settings.CELERY_TASK_DEFAULT_QUEUE,
+            )
+            self._run("priority queues", workers, notification_queue)
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
+
+    def _run(self, label, workers, queue_for):
+        bulk = self.options["bulk"]
+        urgent = self.options["urgent"]
+        interval = self.options["urgent_interval_ms"] / 1000
+        self.latencies = {
+            NotificationPriority.NORMAL: [],
+            NotificationPriority.URGENT: [],
+        }
+
+        with ExitStack() as stack:
+            # The in-memory transport stalls under the threads pool, so each
+            # worker process is a solo worker of its own
+            for queues, processes in workers:
+                for _ in range(processes):
+                    stack.enter_context(
+                        start_worker(
+                            self.app,
+                            pool="solo",
+                            queues=queues,
+                            perform_ping_check=False,
+                            loglevel="WARNING",
+                        )
+                    )
+
+            started = time.perf_counter()
+            # The campaign is queued at once, as the scheduler does
+            for _ in range(bulk):
+                self._enqueue(NotificationPriority.NORMAL, queue_for)
+            for _ in range(urgent):
+                time.sleep(interval)
+                self._enqueue(NotificationPriority.URGENT, queue_for)
+            for _ in range(bulk + urgent):
+                self.done.acquire()
+            elapsed = time.perf_counter() - started
+
+        urgent_ms = sorted(
+            latency * 1000 for latency in self.latencies[NotificationPriority.URGENT]
+        )
+        p99 = urgent_ms[min(len(urgent_ms) - 1, int(len(urgent_ms) * 0.99))]
+        workers_label = " + ".join(str(processes) for _, processes in workers)
+        self.stdout.write(
+            f"{label:<16} workers={workers_label:<6} bulk={bulk} urgent={urgent} "
+            f"urgent latency p50={statistics.median(urgent_ms):8.1f}ms "
+            f"p99={p99:8.1f}ms max={urgent_ms[-1]:8.1f}ms  "
+            f"campaign sent in {elapsed:5.2f}s"
+        )
+
+    def _enqueue(self, priority, queue_for):
+        self.send.apply_async(
+            (priority, time.perf_counter()), queue=queue_for(priority)
+        )
@@ -82,6 +82,7 @@ class Notification(models.Model):
     context = models.JSONField(default=dict, blank=True)
 
     scheduled_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)  # Send attempt began
     sent_at = models.DateTimeField(null=True, blank=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
     read_at = models.DateTimeField(null=True, blank=True)
@@ -100,6 +101,8 @@ class Notification(models.Model):
             models.Index(fields=["recipient_id", "status"]),
             models.Index(fields=["channel", "status"]),
             models.Index(fields=["scheduled_at"]),
+            models.Index(fields=["status", "scheduled_at"]),
+            models.Index(fields=["status", "priority", "scheduled_at"]),
             models.Index(fields=["priority", "status"]),
         ]
 
@@ -0,0 +1,73 @@
+"""
+Per-process cache of recipient contact details from notification preferences.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import NotificationPreference
+
+
+class PreferenceCache:
+    """Bounded LRU of ``user_id -> (email_address, phone_number)``.
+
+    Users without preferences are cached as None. Entries are dropped when
+    their preferences are saved or deleted in this process, and expire after
+    ``ttl`` seconds so changes made by other processes are seen too.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, user_ids):
+        """Contact details for ``user_ids``, loading misses in one query"""
+        now = time.monotonic()
+        found = {}
+        missing = []
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(user_id)
+                    found[user_id] = entry[1]
+                else:
+                    missing.append(user_id)
+
+        if missing:
+            loaded = dict.fromkeys(missing)
+            for user_id, email_address, phone_number in (
+                NotificationPreference.objects.filter(user_id__in=missing).values_list(
+                    "user_id", "email_address", "phone_number"
+                )
+            ):
+                loaded[user_id] = (email_address, phone_number)
+            found.update(loaded)
+
+            expires = now + self.ttl
+            with self._lock:
+                for user_id, contact in loaded.items():
+                    self._entries[user_id] = (expires, contact)
+                    self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return found
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+preference_cache = PreferenceCache(
+    settings.NOTIFICATION_PREFERENCE_CACHE_SIZE,
+    settings.NOTIFICATION_PREFERENCE_CACHE_TTL,
+)
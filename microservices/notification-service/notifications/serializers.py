@@ -1,12 +1,15 @@
 """
 Serializers for the notifications app.
 """
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
 from .models import (Notification, NotificationChannel, NotificationLog,
                      NotificationPreference, NotificationPriority,
                      NotificationStatus, NotificationTemplate)
+from .preferences import preference_cache
 
 
 class NotificationTemplateSerializer(serializers.ModelSerializer):
@@ -178,7 +181,9 @@ class BulkCreateNotificationSerializer(serializers.Serializer):
     """Serializer for creating multiple notifications."""
 
     recipient_ids = serializers.ListField(
-        child=serializers.CharField(max_length=100), min_length=1, max_length=1000
+        child=serializers.CharField(max_length=100),
+        min_length=1,
+        max_length=settings.NOTIFICATION_BULK_MAX_RECIPIENTS,
     )
     channel = serializers.ChoiceField(choices=NotificationChannel.choices)
     priority = serializers.ChoiceField(
@@ -212,29 +217,40 @@ class BulkCreateNotificationSerializer(serializers.Serializer):
             except NotificationTemplate.DoesNotExist:
                 raise serializers.ValidationError("Invalid or inactive template ID.")
 
+        # Recipients are processed in batches, with one preference lookup
+        # (for those not already cached) and one insert per batch
+        batch_size = settings.NOTIFICATION_BULK_BATCH_SIZE
+        channel = validated_data["channel"]
         notifications = []
-        for recipient_id in recipient_ids:
-            notification_data = validated_data.copy()
-            notification_data["recipient_id"] = recipient_id
-            notification_data["template"] = template
-
-            # Set email/phone based on channel and recipient preferences
-            if notification_data["channel"] == NotificationChannel.EMAIL:
-                try:
-                    pref = NotificationPreference.objects.get(user_id=recipient_id)
-                    notification_data["email"] = pref.email_address
-                except NotificationPreference.DoesNotExist:
-                    pass
-            elif notification_data["channel"] == NotificationChannel.SMS:
-                try:
-                    pref = NotificationPreference.objects.get(user_id=recipient_id)
-                    notification_data["phone_number"] = pref.phone_number
-                except NotificationPreference.DoesNotExist:
-                    pass
-
-            notifications.append(Notification(**notification_data))
-
-        return Notification.objects.bulk_create(notifications)
+        with transaction.atomic():
+            for start in range(0, len(recipient_ids), batch_size):
+                batch = recipient_ids[start : start + batch_size]
+
+                # Set email/phone based on channel and recipient preferences
+                contacts = {}
+                if channel in (NotificationChannel.EMAIL, NotificationChannel.SMS):
+                    contacts = preference_cache.get_many(batch)
+
+                batch_notifications = []
+                for recipient_id in batch:
+                    notification_data = validated_data.copy()
+                    notification_data["recipient_id"] = recipient_id
+                    notification_data["template"] = template
+
+                    contact = contacts.get(recipient_id)
+                    if contact is not None:
+                        if channel == NotificationChannel.EMAIL:
+                            notification_data["email"] = contact[0]
+                        else:
+                            notification_data["phone_number"] = contact[1]
+
+                    batch_notifications.append(Notification(**notification_data))
+
+                notifications.extend(
+                    Notification.objects.bulk_create(batch_notifications)
+                )
+
+        return notifications
 
 
 class NotificationPreferenceSerializer(serializers.ModelSerializer):
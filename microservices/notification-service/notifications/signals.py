@@ -3,12 +3,14 @@ Signals for the notifications app.
 """
 import logging
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import Notification, NotificationStatus
-from .tasks import send_notification
+from .models import (Notification, NotificationChannel, NotificationPreference,
+                     NotificationStatus)
+from .preferences import preference_cache
+from .tasks import queue_notification, schedule_email_dispatch
 
 logger = logging.getLogger(__name__)
 
@@ -19,15 +21,22 @@ def handle_notification_creation(sender, instance, created, **kwargs):
     Handle notification creation by scheduling it for sending.
     """
     if created and instance.status == NotificationStatus.PENDING:
-        # If scheduled for future, schedule the task for that time
+        # If scheduled for future, the scheduler sends it when it is due
         if instance.scheduled_at and instance.scheduled_at > timezone.now():
-            send_notification.apply_async(
-                args=[str(instance.id)], eta=instance.scheduled_at
-            )
             logger.info(
                 f"Scheduled notification {instance.id} for {instance.scheduled_at}"
             )
+        elif instance.channel == NotificationChannel.EMAIL:
+            # Sent with other pending emails over one SMTP connection
+            schedule_email_dispatch()
         else:
             # Send immediately
-            send_notification.delay(str(instance.id))
+            queue_notification(instance)
             logger.info(f"Queued notification {instance.id} for immediate sending")
+
+
+@receiver(post_save, sender=NotificationPreference)
+@receiver(post_delete, sender=NotificationPreference)
+def invalidate_cached_preferences(sender, instance, **kwargs):
+    """Drop this process's cached contact details for the user."""
+    preference_cache.invalidate(instance.user_id)
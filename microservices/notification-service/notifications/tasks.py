@@ -2,14 +2,20 @@
 Celery tasks for the notifications app.
 """
 import logging
+import time
 
 from celery import shared_task
+from celery.utils.time import rate
 from django.conf import settings
-from django.core.mail import send_mail as django_send_mail
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Count
 from django.utils import timezone
 from twilio.rest import Client as TwilioClient
 
-from .models import Notification, NotificationLog, NotificationStatus
+from .models import (Notification, NotificationChannel, NotificationLog,
+                     NotificationPriority, NotificationStatus)
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +36,17 @@ except Exception as e:
     logger.warning(f"Failed to initialize Twilio client: {str(e)}")
     TWILIO_CLIENT = None
 
+# Most urgent first when claiming due notifications
+CLAIM_ORDER = [
+    NotificationPriority.URGENT,
+    NotificationPriority.HIGH,
+    NotificationPriority.NORMAL,
+    NotificationPriority.LOW,
+]
+
+# Held while an email dispatch is queued or draining
+EMAIL_DISPATCH_KEY = "notifications:email-dispatch"
+
 
 def create_notification_log(notification, status, message, response=None):
     """Helper to create a notification log entry."""
@@ -41,30 +58,48 @@ def create_notification_log(notification, status, message, response=None):
     )
 
 
-@shared_task(bind=True, max_retries=3)
-def send_notification(self, notification_id):
-    """Send a single notification asynchronously."""
+def deliver_notification(notification_id):
+    """Send a single notification.
+
+    Only the task that marks the notification started sends it, so a
+    duplicate message for the same notification does nothing. Failures with
+    retries left go back to pending with a later scheduled_at, for
+    dispatch_due_notifications to pick up, rather than waiting in the broker
+    as countdown messages.
+    """
     try:
         notification = Notification.objects.get(id=notification_id)
 
-        if notification.status in [
-            NotificationStatus.SENT,
-            NotificationStatus.DELIVERED,
-        ]:
-            logger.info(f"Notification {notification_id} already sent/delivered")
+        if (
+            notification.status
+            not in [NotificationStatus.PENDING, NotificationStatus.PROCESSING]
+            or notification.started_at
+        ):
+            logger.info(f"Notification {notification_id} already sent or started")
             return
 
-        if notification.scheduled_at > timezone.now():
-            logger.info(
-                f"Notification {notification_id} scheduled for future, rescheduling..."
-            )
-            send_notification.apply_async(
-                args=[notification_id], eta=notification.scheduled_at
+        now = timezone.now()
+        unstarted = Notification.objects.filter(
+            pk=notification.pk,
+            status__in=[NotificationStatus.PENDING, NotificationStatus.PROCESSING],
+            started_at__isnull=True,
+        )
+
+        if notification.scheduled_at > now:
+            # dispatch_due_notifications sends it once it is due
+            logger.info(f"Notification {notification_id} scheduled for future")
+            unstarted.filter(status=NotificationStatus.PROCESSING).update(
+                status=NotificationStatus.PENDING, updated_at=now
             )
             return
 
-        notification.status = "processing"
-        notification.save(update_fields=["status", "updated_at"])
+        if not unstarted.update(
+            status=NotificationStatus.PROCESSING, started_at=now, updated_at=now
+        ):
+            logger.info(f"Notification {notification_id} already sent or started")
+            return
+        notification.status = NotificationStatus.PROCESSING
+        notification.started_at = now
 
         try:
             if notification.channel == "email":
@@ -73,41 +108,39 @@ def send_notification(self, notification_id):
                 success, error = send_sms(notification)
             else:
                 success, error = send_in_app(notification)
+        except Exception as e:
+            error = f"Error sending notification: {str(e)}"
+            logger.exception(error)
+            success = False
 
-            if success:
-                notification.status = NotificationStatus.DELIVERED
-                notification.sent_at = timezone.now()
-                notification.delivered_at = timezone.now()
-                create_notification_log(
-                    notification,
-                    NotificationStatus.DELIVERED,
-                    "Notification delivered successfully",
-                )
-            else:
-                notification.status = NotificationStatus.FAILED
-                notification.error_message = error
-                create_notification_log(
-                    notification,
-                    NotificationStatus.FAILED,
-                    f"Failed to send notification: {error}",
-                )
-
-                if notification.retry_count < notification.max_retries:
-                    notification.retry_count += 1
-                    notification.status = NotificationStatus.PENDING
-                    send_notification.apply_async(
-                        args=[notification_id], countdown=60 * notification.retry_count
-                    )
+        if success:
+            notification.status = NotificationStatus.DELIVERED
+            notification.sent_at = timezone.now()
+            notification.delivered_at = timezone.now()
+            create_notification_log(
+                notification,
+                NotificationStatus.DELIVERED,
+                "Notification delivered successfully",
+            )
+        else:
+            notification.status = NotificationStatus.FAILED
+            notification.error_message = error
+            create_notification_log(
+                notification,
+                NotificationStatus.FAILED,
+                f"Failed to send notification: {error}",
+            )
 
-            notification.save()
+            if notification.retry_count < notification.max_retries:
+                notification.retry_count += 1
+                notification.status = NotificationStatus.PENDING
+                notification.started_at = None
+                # Picked up again by dispatch_due_notifications
+                notification.scheduled_at = timezone.now() + timezone.timedelta(
+                    seconds=60 * notification.retry_count
+                )
 
-        except Exception as e:
-            error_msg = f"Error sending notification: {str(e)}"
-            logger.exception(error_msg)
-            notification.status = NotificationStatus.FAILED
-            notification.error_message = error_msg
-            notification.save()
-            raise self.retry(exc=e, countdown=60 * (notification.retry_count or 1))
+        notification.save()
 
     except Notification.DoesNotExist:
         logger.error(f"Notification {notification_id} not found")
@@ -115,26 +148,405 @@ def send_notification(self, notification_id):
         logger.exception(f"Unexpected error: {str(e)}")
 
 
+@shared_task
+def send_notification(notification_id):
+    """Send a single notification asynchronously."""
+    deliver_notification(notification_id)
+
+
+# Celery rate limits apply per task, so each channel has its own send task
+
+
+@shared_task(rate_limit=settings.NOTIFICATION_CHANNEL_RATE_LIMITS["email"])
+def send_email_notification(notification_id):
+    """Send a single email notification."""
+    deliver_notification(notification_id)
+
+
+@shared_task(rate_limit=settings.NOTIFICATION_CHANNEL_RATE_LIMITS["sms"])
+def send_sms_notification(notification_id):
+    """Send a single SMS notification."""
+    deliver_notification(notification_id)
+
+
+@shared_task(rate_limit=settings.NOTIFICATION_CHANNEL_RATE_LIMITS["in_app"])
+def send_in_app_notification(notification_id):
+    """Send a single in-app or push notification."""
+    deliver_notification(notification_id)
+
+
+CHANNEL_TASKS = {
+    NotificationChannel.EMAIL: send_email_notification,
+    NotificationChannel.SMS: send_sms_notification,
+    NotificationChannel.IN_APP: send_in_app_notification,
+    NotificationChannel.PUSH: send_in_app_notification,
+}
+
+
+def notification_queue(priority):
+    """The Celery queue for notifications of ``priority``."""
+    return settings.NOTIFICATION_PRIORITY_QUEUES.get(
+        priority, settings.CELERY_TASK_DEFAULT_QUEUE
+    )
+
+
+def enqueue_notification(notification_id, channel, priority):
+    """Queue the send task for ``channel`` on the queue for ``priority``.
+
+    Urgent and high priority notifications get their own queues and workers,
+    so they are not held behind a large campaign on the normal or low queue.
+    """
+    CHANNEL_TASKS.get(channel, send_notification).apply_async(
+        (str(notification_id),), queue=notification_queue(priority)
+    )
+
+
+def queue_notification(notification):
+    """Hand a pending notification to its send task.
+
+    The notification is marked processing first, so the scheduler cannot
+    queue it a second time; nothing is queued if it already has.
+    """
+    claimed = Notification.objects.filter(
+        pk=notification.pk, status=NotificationStatus.PENDING
+    ).update(
+        status=NotificationStatus.PROCESSING,
+        started_at=None,
+        updated_at=timezone.now(),
+    )
+    if claimed:
+        enqueue_notification(
+            notification.pk, notification.channel, notification.priority
+        )
+    return bool(claimed)
+
+
+def claim_by_priority(queryset, limit):
+    """Up to ``limit`` rows of ``queryset``, most urgent first.
+
+    Each priority is read on its own in scheduled_at order, which the
+    (status, priority, scheduled_at) index serves without sorting the
+    backlog.
+    """
+    rows = []
+    for priority in CLAIM_ORDER:
+        if len(rows) >= limit:
+            break
+        rows.extend(
+            queryset.filter(priority=priority).order_by("scheduled_at")[
+                : limit - len(rows)
+            ]
+        )
+    return rows
+
+
+def claim_due_notifications(cutoff, chunk_size):
+    """Mark up to ``chunk_size`` non-email notifications due by ``cutoff``
+    as processing, most urgent first.
+
+    Returns ``(id, channel, priority)`` tuples. Emails are left to
+    dispatch_pending_emails.
+    """
+    with transaction.atomic():
+        claimed = claim_by_priority(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationStatus.PENDING, scheduled_at__lte=cutoff)
+            .exclude(channel=NotificationChannel.EMAIL)
+            .values_list("id", "channel", "priority"),
+            chunk_size,
+        )
+        Notification.objects.filter(pk__in=[row[0] for row in claimed]).update(
+            status=NotificationStatus.PROCESSING,
+            started_at=None,
+            updated_at=timezone.now(),
+        )
+    return claimed
+
+
+def reclaim_stale_notifications(cutoff):
+    """Recover claimed notifications whose send never happened or finished.
+
+    A claimed notification whose send task has not started may have lost its
+    broker message, and goes back to pending. Claims wait behind the rest of
+    their channel's queue at its rate limit, so that backlog is added to
+    NOTIFICATION_PROCESSING_TIMEOUT before one counts as lost. A send that
+    started but never finished may already have gone out, so it is marked
+    failed for a manual retry instead of being sent again.
+
+    Returns the numbers reclaimed and marked failed.
+    """
+    timeout = settings.NOTIFICATION_PROCESSING_TIMEOUT
+    processing = Notification.objects.filter(status=NotificationStatus.PROCESSING)
+    unstarted = processing.filter(started_at__isnull=True)
+
+    reclaimed = 0
+    backlog = unstarted.order_by().values_list("channel").annotate(Count("id"))
+    for channel, waiting in backlog:
+        per_second = rate(CHANNEL_TASKS.get(channel, send_notification).rate_limit)
+        wait = timeout + (waiting / per_second if per_second else 0)
+        reclaimed += unstarted.filter(
+            channel=channel,
+            updated_at__lt=cutoff - timezone.timedelta(seconds=wait),
+        ).update(status=NotificationStatus.PENDING, updated_at=cutoff)
+
+    abandoned = processing.filter(
+        started_at__lt=cutoff - timezone.timedelta(seconds=timeout)
+    ).update(
+        status=NotificationStatus.FAILED,
+        error_message="Send did not finish; it may have been delivered",
+        updated_at=cutoff,
+    )
+    return reclaimed, abandoned
+
+
+@shared_task
+def dispatch_due_notifications(chunk_size=None):
+    """Queue notifications whose scheduled time has come.
+
+    Runs every scheduler tick instead of holding a broker ETA message per
+    scheduled notification: each tick reads the bucket of notifications that
+    fell due since the last one from the (status, scheduled_at) index, one
+    chunk at a time, so memory does not grow with how many are scheduled.
+    """
+    chunk_size = chunk_size or settings.NOTIFICATION_SCHEDULER_CHUNK_SIZE
+    cutoff = timezone.now()
+
+    reclaimed, abandoned = reclaim_stale_notifications(cutoff)
+
+    queued = chunks = 0
+    while True:
+        claimed = claim_due_notifications(cutoff, chunk_size)
+        for notification_id, channel, priority in claimed:
+            enqueue_notification(notification_id, channel, priority)
+        queued += len(claimed)
+        chunks += 1
+        if len(claimed) < chunk_size:
+            break
+
+    # Due emails go out in batches over one SMTP connection, unless a
+    # dispatch is already queued or draining
+    emails_due = Notification.objects.filter(
+        channel=NotificationChannel.EMAIL,
+        status=NotificationStatus.PENDING,
+        scheduled_at__lte=cutoff,
+    ).exists()
+    if emails_due:
+        schedule_email_dispatch()
+
+    if queued or reclaimed or abandoned or emails_due:
+        logger.info(
+            f"Scheduler queued {queued} notifications in {chunks} chunks, "
+            f"reclaimed {reclaimed}, abandoned {abandoned}, "
+            f"emails due: {emails_due}"
+        )
+    return {
+        "queued": queued,
+        "chunks": chunks,
+        "reclaimed": reclaimed,
+        "abandoned": abandoned,
+        "emails_due": emails_due,
+    }
+
+
+def email_message(notification, connection=None):
+    """Build the email for a notification, with its HTML part if it has one."""
+    message = EmailMultiAlternatives(
+        subject=notification.subject or "",
+        body=notification.message or "",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[notification.email],
+        connection=connection,
+    )
+    if notification.html_message:
+        message.attach_alternative(notification.html_message, "text/html")
+    return message
+
+
 def send_email(notification):
     """Send an email notification."""
     try:
-        subject = notification.subject or ""
-        message = notification.message or ""
-        html_message = notification.html_message or ""
-
-        django_send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[notification.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        email_message(notification).send()
         return True, None
     except Exception as e:
         return False, str(e)
 
 
+def schedule_email_dispatch():
+    """Queue dispatch_pending_emails once for a burst of new email notifications.
+
+    The key is held until the dispatch has drained the queue, so no second
+    dispatcher is queued while one is waiting or sending.
+    """
+    delay = settings.EMAIL_DISPATCH_DELAY_SECONDS
+    # The key expires on its own in case the scheduled task is lost
+    if cache.add(
+        EMAIL_DISPATCH_KEY, True, delay + settings.EMAIL_DISPATCH_LOCK_SECONDS
+    ):
+        dispatch_pending_emails.apply_async(countdown=delay)
+
+
+def claim_pending_emails(batch_size):
+    """Mark up to ``batch_size`` due email notifications as processing.
+
+    The most urgent are claimed first, so they are not held behind a
+    campaign already being sent. Rows locked by another dispatcher are
+    skipped rather than waited on, so concurrent workers claim disjoint
+    batches.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        notifications = claim_by_priority(
+            Notification.objects.select_for_update(skip_locked=True).filter(
+                channel=NotificationChannel.EMAIL,
+                status=NotificationStatus.PENDING,
+                scheduled_at__lte=now,
+            ),
+            batch_size,
+        )
+        # Sent straight away by the caller, so they count as started
+        Notification.objects.filter(
+            pk__in=[notification.pk for notification in notifications]
+        ).update(status=NotificationStatus.PROCESSING, started_at=now, updated_at=now)
+    return notifications
+
+
+def deliver_emails(notifications):
+    """Send claimed email notifications over one SMTP connection.
+
+    Statuses are written with one UPDATE for the delivered notifications and
+    one bulk update for the failed ones, and the logs with one bulk insert.
+    Failures with retries left go back to pending, due again after the same
+    back-off send_notification uses.
+    """
+    errors = {}
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for notification in notifications:
+                try:
+                    connection.send_messages([email_message(notification, connection)])
+                except Exception as e:
+                    errors[notification.pk] = str(e)
+    except Exception as e:
+        # Could not connect, or the connection dropped part way through
+        logger.error(f"SMTP connection error: {str(e)}")
+        for notification in notifications:
+            errors.setdefault(notification.pk, str(e))
+
+    now = timezone.now()
+    delivered = [n for n in notifications if n.pk not in errors]
+    failed = [n for n in notifications if n.pk in errors]
+    logs = []
+
+    for notification in delivered:
+        logs.append(
+            NotificationLog(
+                notification=notification,
+                status=NotificationStatus.DELIVERED,
+                message="Notification delivered successfully",
+            )
+        )
+
+    for notification in failed:
+        error = errors[notification.pk]
+        notification.error_message = error
+        notification.updated_at = now
+        if notification.retry_count < notification.max_retries:
+            notification.retry_count += 1
+            notification.status = NotificationStatus.PENDING
+            notification.started_at = None
+            notification.scheduled_at = now + timezone.timedelta(
+                seconds=60 * notification.retry_count
+            )
+        else:
+            notification.status = NotificationStatus.FAILED
+        logs.append(
+            NotificationLog(
+                notification=notification,
+                status=NotificationStatus.FAILED,
+                message=f"Failed to send notification: {error}",
+            )
+        )
+
+    with transaction.atomic():
+        Notification.objects.filter(
+            pk__in=[notification.pk for notification in delivered]
+        ).update(
+            status=NotificationStatus.DELIVERED,
+            sent_at=now,
+            delivered_at=now,
+            updated_at=now,
+        )
+        Notification.objects.bulk_update(
+            failed,
+            [
+                "status",
+                "error_message",
+                "retry_count",
+                "scheduled_at",
+                "started_at",
+                "updated_at",
+            ],
+        )
+        NotificationLog.objects.bulk_create(logs)
+
+    return len(delivered), len(failed)
+
+
+@shared_task
+def dispatch_pending_emails(batch_size=None, max_batches=None):
+    """Send due email notifications in batches until none are left.
+
+    Batches are paced to stay within the email channel's rate limit. The
+    dispatch key is refreshed for each batch and released once the queue is
+    drained; emails queued after that are picked up by the scheduler's tick.
+    """
+    batch_size = batch_size or settings.EMAIL_DISPATCH_BATCH_SIZE
+    per_second = rate(settings.NOTIFICATION_CHANNEL_RATE_LIMITS["email"])
+    started = time.perf_counter()
+    delivered = failed = batches = 0
+
+    try:
+        while max_batches is None or batches < max_batches:
+            cache.set(
+                EMAIL_DISPATCH_KEY, True, settings.EMAIL_DISPATCH_LOCK_SECONDS
+            )
+            batch_started = time.perf_counter()
+            notifications = claim_pending_emails(batch_size)
+            if not notifications:
+                break
+            sent, not_sent = deliver_emails(notifications)
+            delivered += sent
+            failed += not_sent
+            batches += 1
+            if len(notifications) < batch_size:
+                break
+            if per_second:
+                time.sleep(
+                    max(
+                        0,
+                        batch_started
+                        + len(notifications) / per_second
+                        - time.perf_counter(),
+                    )
+                )
+    finally:
+        cache.delete(EMAIL_DISPATCH_KEY)
+
+    elapsed = time.perf_counter() - started
+    if batches:
+        logger.info(
+            f"Dispatched {delivered + failed} emails in {batches} batches: "
+            f"{delivered} delivered, {failed} failed"
+        )
+    return {
+        "delivered": delivered,
+        "failed": failed,
+        "batches": batches,
+        "elapsed_seconds": round(elapsed, 3),
+        "messages_per_second": round(delivered / elapsed, 1) if elapsed else 0,
+    }
+
+
 def send_sms(notification):
     """Send an SMS via Twilio."""
     if not TWILIO_CLIENT:
@@ -135,9 +135,9 @@ class NotificationViewSet(viewsets.ModelViewSet):
         notification.save(update_fields=["status", "error_message"])
 
         # Import and trigger the task
-        from .tasks import send_notification
+        from .tasks import queue_notification
 
-        send_notification.delay(str(notification.id))
+        queue_notification(notification)
 
         return Response({"message": "Notification queued for retry"})
 
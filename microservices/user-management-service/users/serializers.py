@@ -222,6 +222,29 @@ class PasswordChangeSerializer(serializers.Serializer):
         return value
 
 
+class UserInfoSerializer(serializers.ModelSerializer):
+    """Contact details returned by the bulk user lookup"""
+
+    class Meta:
+        model = CustomUser
+        fields = [
+            "id",
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "user_type",
+            "is_active",
+        ]
+
+
+class UserListSerializer(UserInfoSerializer):
+    """Contact details and last change time for the user list"""
+
+    class Meta(UserInfoSerializer.Meta):
+        fields = UserInfoSerializer.Meta.fields + ["updated_at"]
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     """Unified serializer for user profile based on user type"""
 
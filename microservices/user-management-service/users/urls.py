@@ -29,7 +29,9 @@ urlpatterns = [
     # Admin HOD endpoints
     path("admins/", views.AdminHODListView.as_view(), name="admin-list"),
     # Inter-service communication endpoints
+    path("users/", views.UserListView.as_view(), name="user-list"),
     path("user/<int:user_id>/", views.get_user_by_id, name="get-user-by-id"),
+    path("bulk_info/", views.bulk_user_info, name="bulk-user-info"),
     path("validate-token/", views.validate_token, name="validate-token"),
     # Health check
     path("health/", simple_auth.simple_health, name="simple-health"),
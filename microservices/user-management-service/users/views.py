@@ -1,8 +1,11 @@
 from django.contrib.auth import login, logout
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -11,7 +14,8 @@ from .models import AdminHOD, CustomUser, Staff, Student
 from .serializers import (AdminHODSerializer, CustomUserSerializer,
                           PasswordChangeSerializer, StaffCreateSerializer,
                           StaffSerializer, StudentCreateSerializer,
-                          StudentSerializer, UserLoginSerializer,
+                          StudentSerializer, UserInfoSerializer,
+                          UserListSerializer, UserLoginSerializer,
                           UserProfileSerializer)
 from .tasks import send_welcome_email
 
@@ -262,6 +266,53 @@ class AdminHODListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
+class UserSyncPagination(CursorPagination):
+    """Oldest change first; a user edited mid-listing reappears on a later page"""
+
+    ordering = ("updated_at", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class UserListView(generics.ListAPIView):
+    """List users, optionally only those changed since a point in time"""
+
+    serializer_class = UserListSerializer
+    pagination_class = UserSyncPagination
+    permission_classes = [permissions.AllowAny]  # Allow access for development
+
+    def get_queryset(self):
+        queryset = CustomUser.objects.all()
+        updated_since = self.request.query_params.get("updated_since")
+        if updated_since:
+            try:
+                since = parse_datetime(updated_since)
+            except ValueError:
+                since = None
+            if since is None:
+                raise ValidationError(
+                    {"updated_since": "Expected an ISO 8601 date and time."}
+                )
+            queryset = queryset.filter(updated_at__gte=since)
+        return queryset
+
+    @extend_schema(
+        summary="List users",
+        description="Get users ordered by last change, for inter-service sync",
+        parameters=[
+            OpenApiParameter(
+                name="updated_since",
+                description="Only users changed at or after this ISO 8601 time",
+                required=False,
+                type=str,
+            )
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
 # UserSessionListView removed - session tracking disabled
 
 
@@ -284,6 +335,28 @@ def get_user_by_id(request, user_id):
         return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
 
+@api_view(["POST"])
+@permission_classes([permissions.AllowAny])  # Allow access for development
+@extend_schema(
+    summary="Get users by IDs",
+    description="Retrieve contact details for a list of user IDs in one request "
+    "(for inter-service communication)",
+)
+def bulk_user_info(request):
+    """Get users by ID in bulk - for inter-service communication"""
+    user_ids = request.data.get("user_ids")
+    if not isinstance(user_ids, list):
+        return Response(
+            {"error": "user_ids must be a list"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Services store user IDs as strings; ignore any that are not numeric
+    ids = {int(user_id) for user_id in map(str, user_ids) if user_id.isdigit()}
+    users = CustomUser.objects.filter(id__in=ids).order_by("id")
+    serializer = UserInfoSerializer(users, many=True)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 @extend_schema(
@@ -3,13 +3,15 @@ import json
 from django.contrib import messages
 from django.core import serializers
 from django.core.files.storage import FileSystemStorage
+from django.db.models import Count, Q, Sum
 from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 
 from student_management_app.models import (Attendance, AttendanceReport,
-                                           Courses, CustomUser, FeedBackStaffs,
+                                           AttendanceSummary, Courses,
+                                           CustomUser, FeedBackStaffs,
                                            FeedBackStudent, LeaveReportStaff,
                                            LeaveReportStudent,
                                            SessionYearModel, Staffs, Students,
@@ -25,41 +27,48 @@ def admin_home(request):
     staff_count = Staffs.objects.all().count()
 
     # Total Subjects and students in Each Course
-    course_all = Courses.objects.all()
+    course_all = Courses.objects.annotate(
+        subject_total=Count("subjects", distinct=True),
+        student_total=Count("students", distinct=True),
+    ).order_by("id")
     course_name_list = []
     subject_count_list = []
     student_count_list_in_course = []
 
     for course in course_all:
-        subjects = Subjects.objects.filter(course_id=course.id).count()
-        students = Students.objects.filter(course_id=course.id).count()
         course_name_list.append(course.course_name)
-        subject_count_list.append(subjects)
-        student_count_list_in_course.append(students)
+        subject_count_list.append(course.subject_total)
+        student_count_list_in_course.append(course.student_total)
 
-    subject_all = Subjects.objects.all()
+    subject_all = Subjects.objects.annotate(
+        student_total=Count("course_id__students")
+    ).order_by("id")
     subject_list = []
     student_count_list_in_subject = []
     for subject in subject_all:
-        course = Courses.objects.get(id=subject.course_id.id)
-        student_count = Students.objects.filter(course_id=course.id).count()
         subject_list.append(subject.subject_name)
-        student_count_list_in_subject.append(student_count)
+        student_count_list_in_subject.append(subject.student_total)
 
     # For Saffs
     staff_attendance_present_list = []
     staff_attendance_leave_list = []
     staff_name_list = []
 
-    staffs = Staffs.objects.all()
+    staffs = (
+        Staffs.objects.select_related("admin")
+        .annotate(
+            attendance_total=Count("admin__subjects__attendance", distinct=True),
+            leave_total=Count(
+                "leavereportstaff",
+                filter=Q(leavereportstaff__leave_status=1),
+                distinct=True,
+            ),
+        )
+        .order_by("id")
+    )
     for staff in staffs:
-        subject_ids = Subjects.objects.filter(staff_id=staff.admin.id)
-        attendance = Attendance.objects.filter(subject_id__in=subject_ids).count()
-        leaves = LeaveReportStaff.objects.filter(
-            staff_id=staff.id, leave_status=1
-        ).count()
-        staff_attendance_present_list.append(attendance)
-        staff_attendance_leave_list.append(leaves)
+        staff_attendance_present_list.append(staff.attendance_total)
+        staff_attendance_leave_list.append(staff.leave_total)
         staff_name_list.append(staff.admin.first_name)
 
     # For Students
@@ -67,19 +76,25 @@ def admin_home(request):
     student_attendance_leave_list = []
     student_name_list = []
 
-    students = Students.objects.all()
+    attendance_totals = {
+        row["student_id"]: row
+        for row in AttendanceSummary.objects.values("student_id")
+        .annotate(present=Sum("present_count"), absent=Sum("absent_count"))
+        .order_by()
+    }
+    students = (
+        Students.objects.select_related("admin")
+        .annotate(
+            leave_total=Count(
+                "leavereportstudent", filter=Q(leavereportstudent__leave_status=1)
+            )
+        )
+        .order_by("id")
+    )
     for student in students:
-        attendance = AttendanceReport.objects.filter(
-            student_id=student.id, status=True
-        ).count()
-        absent = AttendanceReport.objects.filter(
-            student_id=student.id, status=False
-        ).count()
-        leaves = LeaveReportStudent.objects.filter(
-            student_id=student.id, leave_status=1
-        ).count()
-        student_attendance_present_list.append(attendance)
-        student_attendance_leave_list.append(leaves + absent)
+        totals = attendance_totals.get(student.id, {"present": 0, "absent": 0})
+        student_attendance_present_list.append(totals["present"])
+        student_attendance_leave_list.append(student.leave_total + totals["absent"])
         student_name_list.append(student.admin.first_name)
 
     context = {
@@ -8,17 +8,21 @@ from django.core import serializers
 from django.core.files.storage import \
     FileSystemStorage  # To upload Profile Picture
 from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Count, Sum
 from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
 from student_management_app.models import (Assignment, AssignmentSubmission,
                                            Attendance, AttendanceReport,
-                                           Courses, CustomUser, FeedBackStaffs,
-                                           Fine, LeaveReportStaff,
-                                           SessionYearModel, Staffs,
-                                           StudentResult, Students, Subjects)
+                                           AttendanceSummary, Courses,
+                                           CustomUser, FeedBackStaffs, Fine,
+                                           LeaveReportStaff, SessionYearModel,
+                                           Staffs, StudentResult, Students,
+                                           Subjects)
 
 from .forms import AddFineForm
 
@@ -79,25 +83,19 @@ def staff_home(request):
 
     # Fetching All Students under Staff
 
-    subjects = Subjects.objects.filter(staff_id=request.user.id)
-    course_id_list = []
-    for subject in subjects:
-        course = Courses.objects.get(id=subject.course_id.id)
-        course_id_list.append(course.id)
-
-    final_course = []
-    # Removing Duplicate Course Id
-    for course_id in course_id_list:
-        if course_id not in final_course:
-            final_course.append(course_id)
+    subjects = Subjects.objects.filter(staff_id=request.user.id).annotate(
+        attendance_total=Count("attendance")
+    )
+    final_course = list(
+        subjects.values_list("course_id", flat=True).distinct().order_by()
+    )
 
     students_count = Students.objects.filter(course_id__in=final_course).count()
-    subject_count = subjects.count()
+    subject_count = len(subjects)
 
     # Fetch All Attendance Count
-    attendance_count = Attendance.objects.filter(subject_id__in=subjects).count()
+    attendance_count = sum(subject.attendance_total for subject in subjects)
     # Fetch All Approve Leave
-    staff = Staffs.objects.get(admin=request.user.id)
     leave_count = LeaveReportStaff.objects.filter(
         staff_id=staff.id, leave_status=1
     ).count()
@@ -106,24 +104,29 @@ def staff_home(request):
     subject_list = []
     attendance_list = []
     for subject in subjects:
-        attendance_count1 = Attendance.objects.filter(subject_id=subject.id).count()
         subject_list.append(subject.subject_name)
-        attendance_list.append(attendance_count1)
-
-    students_attendance = Students.objects.filter(course_id__in=final_course)
+        attendance_list.append(subject.attendance_total)
+
+    students_attendance = Students.objects.filter(
+        course_id__in=final_course
+    ).select_related("admin")
+    attendance_totals = {
+        row["student_id"]: row
+        for row in AttendanceSummary.objects.filter(
+            student_id__course_id__in=final_course
+        )
+        .values("student_id")
+        .annotate(present=Sum("present_count"), absent=Sum("absent_count"))
+        .order_by()
+    }
     student_list = []
     student_list_attendance_present = []
     student_list_attendance_absent = []
     for student in students_attendance:
-        attendance_present_count = AttendanceReport.objects.filter(
-            status=True, student_id=student.id
-        ).count()
-        attendance_absent_count = AttendanceReport.objects.filter(
-            status=False, student_id=student.id
-        ).count()
+        totals = attendance_totals.get(student.id, {"present": 0, "absent": 0})
         student_list.append(student.admin.first_name + " " + student.admin.last_name)
-        student_list_attendance_present.append(attendance_present_count)
-        student_list_attendance_absent.append(attendance_absent_count)
+        student_list_attendance_present.append(totals["present"])
+        student_list_attendance_absent.append(totals["absent"])
 
     context = {
         "students_count": students_count,
@@ -270,6 +273,8 @@ def cleanup_attendance_duplicates(request):
                 # Delete the duplicate attendance (will cascade delete its reports)
                 dup.delete()
                 duplicates_removed += 1
+            # Merged reports change the totals, so refresh their rollup rows
+            AttendanceSummary.rebuild(subject_id=key[0], session_year_id=key[1])
         messages.success(
             request,
             f"Cleanup complete. Removed {duplicates_removed} duplicate attendance rows; merged {reports_merged} reports.",
@@ -279,6 +284,74 @@ def cleanup_attendance_duplicates(request):
     return redirect("staff_take_attendance")
 
 
+def _add_attendance_delta(deltas, student_id, old_status, new_status):
+    # Accumulate the (present, absent) change of one AttendanceReport moving
+    # from old_status (None when newly created) to new_status
+    if old_status == new_status:
+        return
+    present, absent = deltas.get(student_id, (0, 0))
+    if old_status is not None:
+        present, absent = (present - 1, absent) if old_status else (present, absent - 1)
+    present, absent = (present + 1, absent) if new_status else (present, absent + 1)
+    deltas[student_id] = (present, absent)
+
+
+def _write_attendance_reports(attendance, statuses, create_missing=True):
+    """Upsert AttendanceReport rows for one Attendance in a fixed number of queries.
+
+    ``statuses`` maps student admin ids to their attendance status. Unknown
+    students are skipped; students without a report are skipped too unless
+    ``create_missing`` is set. Returns the number of students written.
+    """
+    student_ids = dict(
+        Students.objects.filter(admin_id__in=statuses).values_list("admin_id", "id")
+    )
+    with transaction.atomic():
+        existing = {}
+        for report in AttendanceReport.objects.select_for_update().filter(
+            attendance_id=attendance, student_id__in=student_ids.values()
+        ).order_by("id"):
+            existing.setdefault(report.student_id_id, report)
+
+        now = timezone.now()
+        new_reports = []
+        changed_reports = []
+        # (present, absent) changes per student for the AttendanceSummary rollup
+        deltas = {}
+        written = 0
+        for admin_id, status in statuses.items():
+            student_id = student_ids.get(admin_id)
+            if student_id is None:
+                continue
+            report = existing.get(student_id)
+            if report is None:
+                if not create_missing:
+                    continue
+                new_reports.append(
+                    AttendanceReport(
+                        student_id_id=student_id,
+                        attendance_id=attendance,
+                        status=status,
+                    )
+                )
+                _add_attendance_delta(deltas, student_id, None, status)
+            elif report.status != status:
+                _add_attendance_delta(deltas, student_id, report.status, status)
+                report.status = status
+                report.updated_at = now
+                changed_reports.append(report)
+            written += 1
+
+        AttendanceReport.objects.bulk_create(new_reports, batch_size=500)
+        AttendanceReport.objects.bulk_update(
+            changed_reports, ["status", "updated_at"], batch_size=500
+        )
+        AttendanceSummary.apply_deltas(
+            attendance.subject_id_id, attendance.session_year_id_id, deltas
+        )
+    return written
+
+
 @csrf_exempt
 def save_attendance_data(request):
     # Get Values from Staf Take Attendance form via AJAX (JavaScript)
@@ -319,27 +392,15 @@ def save_attendance_data(request):
             session_year_id=session_year_model,
         )
 
-        saved = 0
+        statuses = {}
         for stud in json_student:
             try:
-                sid = int(stud.get("id"))
-                status_val = stud.get("status", 0)
-                status_bool = bool(int(status_val))
-                student = Students.objects.get(admin_id=sid)
-                # Upsert student's attendance for this date
-                ar, _ = AttendanceReport.objects.get_or_create(
-                    student_id=student, attendance_id=attendance,
-                    defaults={"status": status_bool}
-                )
-                if ar.status != status_bool:
-                    ar.status = status_bool
-                    ar.save()
-                saved += 1
-            except Students.DoesNotExist:
-                # Skip invalid student IDs
-                continue
+                statuses[int(stud.get("id"))] = bool(int(stud.get("status", 0)))
             except Exception:
+                # Skip malformed entries
                 continue
+        # Upsert every student's attendance for this date in one batch
+        saved = _write_attendance_reports(attendance, statuses)
         if saved:
             return JsonResponse({"status": "OK"})
         else:
@@ -423,16 +484,11 @@ def update_attendance_data(request):
     json_student = json.loads(student_ids)
 
     try:
-        for stud in json_student:
-            # Attendance of Individual Student saved on AttendanceReport Model
-            student = Students.objects.get(admin=stud["id"])
-
-            attendance_report = AttendanceReport.objects.get(
-                student_id=student, attendance_id=attendance
-            )
-            attendance_report.status = stud["status"]
-
-            attendance_report.save()
+        # Attendance of Individual Students saved on AttendanceReport Model
+        statuses = {int(stud["id"]): bool(int(stud["status"])) for stud in json_student}
+        saved = _write_attendance_reports(attendance, statuses, create_missing=False)
+        if saved != len(statuses):
+            return HttpResponse("Error")
         return HttpResponse("OK")
     except:
         return HttpResponse("Error")
@@ -8,6 +8,7 @@ from django.contrib.auth.decorators import login_required
 from django.core import serializers
 from django.core.files.storage import FileSystemStorage
 from django.core.mail import send_mail
+from django.db.models import Sum
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import redirect, render
 from django.utils import timezone
@@ -18,40 +19,38 @@ from django.views.decorators.csrf import csrf_exempt
 
 from student_management_app.models import (Assignment, AssignmentSubmission,
                                            Attendance, AttendanceReport,
-                                           Courses, CustomUser,
-                                           FeedBackStudent, Fine,
+                                           AttendanceSummary, Courses,
+                                           CustomUser, FeedBackStudent, Fine,
                                            LeaveReportStudent, StudentResult,
                                            Students, Subjects)
 
 
 def student_home(request):
     student_obj = Students.objects.get(admin=request.user.id)
-    total_attendance = AttendanceReport.objects.filter(student_id=student_obj).count()
-    attendance_present = AttendanceReport.objects.filter(
-        student_id=student_obj, status=True
-    ).count()
-    attendance_absent = AttendanceReport.objects.filter(
-        student_id=student_obj, status=False
-    ).count()
-
-    course_obj = Courses.objects.get(id=student_obj.course_id.id)
-    total_subjects = Subjects.objects.filter(course_id=course_obj).count()
+    subject_data = Subjects.objects.filter(course_id=student_obj.course_id)
+    total_subjects = subject_data.count()
+
+    # Per-subject totals come from the AttendanceSummary rollup rather than
+    # counting every AttendanceReport row of the student
+    attendance_totals = {
+        row["subject_id"]: row
+        for row in AttendanceSummary.objects.filter(student_id=student_obj)
+        .values("subject_id")
+        .annotate(present=Sum("present_count"), absent=Sum("absent_count"))
+        .order_by()
+    }
+    attendance_present = sum(row["present"] for row in attendance_totals.values())
+    attendance_absent = sum(row["absent"] for row in attendance_totals.values())
+    total_attendance = attendance_present + attendance_absent
 
     subject_name = []
     data_present = []
     data_absent = []
-    subject_data = Subjects.objects.filter(course_id=student_obj.course_id)
     for subject in subject_data:
-        attendance = Attendance.objects.filter(subject_id=subject.id)
-        attendance_present_count = AttendanceReport.objects.filter(
-            attendance_id__in=attendance, status=True, student_id=student_obj.id
-        ).count()
-        attendance_absent_count = AttendanceReport.objects.filter(
-            attendance_id__in=attendance, status=False, student_id=student_obj.id
-        ).count()
+        totals = attendance_totals.get(subject.id, {"present": 0, "absent": 0})
         subject_name.append(subject.subject_name)
-        data_present.append(attendance_present_count)
-        data_absent.append(attendance_absent_count)
+        data_present.append(totals["present"])
+        data_absent.append(totals["absent"])
 
     context = {
         "total_attendance": total_attendance,
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from student_management_app.models import AttendanceSummary
+
+
+class Command(BaseCommand):
+    help = "Rebuild the AttendanceSummary rollup from AttendanceReport rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subject", type=int, help="Only rebuild this subject id")
+        parser.add_argument(
+            "--session-year", type=int, help="Only rebuild this session year id"
+        )
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options["subject"]:
+            filters["subject_id"] = options["subject"]
+        if options["session_year"]:
+            filters["session_year_id"] = options["session_year"]
+
+        rows = AttendanceSummary.rebuild(**filters)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} attendance summary rows.")
+        )
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.23 on 2026-10-18 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_attendance_summary(apps, schema_editor):
+    AttendanceReport = apps.get_model('student_management_app', 'AttendanceReport')
+    AttendanceSummary = apps.get_model('student_management_app', 'AttendanceSummary')
+    rows = (
+        AttendanceReport.objects.values(
+            'student_id', 'attendance_id__subject_id', 'attendance_id__session_year_id'
+        )
+        .annotate(
+            present=models.Count('id', filter=models.Q(status=True)),
+            absent=models.Count('id', filter=models.Q(status=False)),
+        )
+        .order_by()
+    )
+    AttendanceSummary.objects.bulk_create(
+        [
+            AttendanceSummary(
+                student_id_id=row['student_id'],
+                subject_id_id=row['attendance_id__subject_id'],
+                session_year_id_id=row['attendance_id__session_year_id'],
+                present_count=row['present'],
+                absent_count=row['absent'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student_management_app', '0010_alter_students_profile_pic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('session_year_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='student_management_app.sessionyearmodel')),
+                ('student_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='student_management_app.students')),
+                ('subject_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='student_management_app.subjects')),
+            ],
+            options={
+                'unique_together': {('student_id', 'subject_id', 'session_year_id')},
+            },
+        ),
+        migrations.RunPython(populate_attendance_summary, migrations.RunPython.noop),
+    ]
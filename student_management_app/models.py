@@ -1,7 +1,9 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 
 class SessionYearModel(models.Model):
@@ -95,6 +97,100 @@ class AttendanceReport(models.Model):
     objects = models.Manager()
 
 
+class AttendanceSummary(models.Model):
+    # Present/Absent rollup per Student, Subject and Session Year, kept in
+    # step with AttendanceReport so dashboards don't rescan attendance history
+    id = models.AutoField(primary_key=True)
+    student_id = models.ForeignKey(Students, on_delete=models.CASCADE)
+    subject_id = models.ForeignKey(Subjects, on_delete=models.CASCADE)
+    session_year_id = models.ForeignKey(SessionYearModel, on_delete=models.CASCADE)
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    objects = models.Manager()
+
+    class Meta:
+        unique_together = ("student_id", "subject_id", "session_year_id")
+
+    @classmethod
+    def apply_deltas(cls, subject_id, session_year_id, deltas):
+        """Add (present, absent) deltas keyed by student id to the rollup."""
+        deltas = {
+            student_id: delta for student_id, delta in deltas.items() if any(delta)
+        }
+        if not deltas:
+            return
+        with transaction.atomic():
+            # Missing rows are inserted before locking, so two requests
+            # marking a student for the first time both add to one row
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        student_id_id=student_id,
+                        subject_id_id=subject_id,
+                        session_year_id_id=session_year_id,
+                    )
+                    for student_id in deltas
+                ],
+                ignore_conflicts=True,
+            )
+            summaries = cls.objects.select_for_update().filter(
+                subject_id=subject_id,
+                session_year_id=session_year_id,
+                student_id__in=deltas,
+            )
+            now = timezone.now()
+            changed = []
+            for summary in summaries:
+                present, absent = deltas[summary.student_id_id]
+                summary.present_count = max(summary.present_count + present, 0)
+                summary.absent_count = max(summary.absent_count + absent, 0)
+                summary.updated_at = now
+                changed.append(summary)
+            cls.objects.bulk_update(
+                changed, ["present_count", "absent_count", "updated_at"]
+            )
+
+    @classmethod
+    def rebuild(cls, **filters):
+        """Recompute the rollup from AttendanceReport.
+
+        ``filters`` are AttendanceSummary field lookups (e.g. ``subject_id=3``)
+        limiting which rows are rebuilt; with none the whole table is rebuilt.
+        """
+        report_filters = {
+            f"attendance_id__{key}" if not key.startswith("student_id") else key: value
+            for key, value in filters.items()
+        }
+        rows = (
+            AttendanceReport.objects.filter(**report_filters)
+            .values(
+                "student_id",
+                "attendance_id__subject_id",
+                "attendance_id__session_year_id",
+            )
+            .annotate(
+                present=Count("id", filter=Q(status=True)),
+                absent=Count("id", filter=Q(status=False)),
+            )
+            .order_by()
+        )
+        summaries = [
+            cls(
+                student_id_id=row["student_id"],
+                subject_id_id=row["attendance_id__subject_id"],
+                session_year_id_id=row["attendance_id__session_year_id"],
+                present_count=row["present"],
+                absent_count=row["absent"],
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            cls.objects.filter(**filters).delete()
+            cls.objects.bulk_create(summaries, batch_size=1000)
+        return len(summaries)
+
+
 class LeaveReportStudent(models.Model):
     id = models.AutoField(primary_key=True)
     student_id = models.ForeignKey(Students, on_delete=models.CASCADE)
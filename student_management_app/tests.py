@@ -1,3 +1,257 @@
+import datetime
+import io
+import json
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from student_management_app.models import (Attendance, AttendanceReport,
+                                           AttendanceSummary, Courses,
+                                           CustomUser,
+                                           LeaveReportStaff,
+                                           LeaveReportStudent,
+                                           SessionYearModel, Students,
+                                           Subjects)
+
+
+class AdminHomeQueryCountTests(TestCase):
+    def setUp(self):
+        self.hod = CustomUser.objects.create_user(
+            username="hod", email="hod@example.com", password="pass", user_type=1
+        )
+        self.session_year = SessionYearModel.objects.create(
+            session_start_year=datetime.date(2024, 1, 1),
+            session_end_year=datetime.date(2024, 12, 31),
+        )
+        self.client.force_login(self.hod)
+
+    def _populate(self, prefix, size):
+        course = Courses.objects.create(course_name=f"{prefix} course")
+        for i in range(size):
+            staff_user = CustomUser.objects.create_user(
+                username=f"{prefix}staff{i}",
+                email=f"{prefix}staff{i}@example.com",
+                password="pass",
+                user_type=2,
+            )
+            LeaveReportStaff.objects.create(
+                staff_id=staff_user.staffs,
+                leave_date="2024-01-01",
+                leave_message="leave",
+                leave_status=1,
+            )
+            subject = Subjects.objects.create(
+                subject_name=f"{prefix} subject {i}",
+                course_id=course,
+                staff_id=staff_user,
+            )
+            attendance = Attendance.objects.create(
+                subject_id=subject,
+                attendance_date=datetime.date(2024, 1, 1),
+                session_year_id=self.session_year,
+            )
+            student_user = CustomUser.objects.create_user(
+                username=f"{prefix}student{i}",
+                email=f"{prefix}student{i}@example.com",
+                password="pass",
+                user_type=3,
+            )
+            student = Students.objects.create(
+                admin=student_user,
+                gender="Male",
+                address="",
+                course_id=course,
+                session_year_id=self.session_year,
+            )
+            AttendanceReport.objects.create(
+                student_id=student, attendance_id=attendance, status=i % 2 == 0
+            )
+            LeaveReportStudent.objects.create(
+                student_id=student,
+                leave_date="2024-01-01",
+                leave_message="leave",
+                leave_status=1,
+            )
+        AttendanceSummary.rebuild()
+
+    def _dashboard_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("admin_home"))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_is_independent_of_row_count(self):
+        self._populate("small", 2)
+        # Warm up the session so only the dashboard itself is measured.
+        self._dashboard_queries()
+        _, small_queries = self._dashboard_queries()
+
+        self._populate("large", 20)
+        response, large_queries = self._dashboard_queries()
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertLessEqual(large_queries, 15)
+        self.assertEqual(response.context["all_student_count"], 22)
+
+    def test_statistics_match_per_row_counts(self):
+        self._populate("demo", 3)
+        response, _ = self._dashboard_queries()
+        context = response.context
+
+        self.assertEqual(context["course_name_list"], ["demo course"])
+        self.assertEqual(context["subject_count_list"], [3])
+        self.assertEqual(context["student_count_list_in_course"], [3])
+        self.assertEqual(context["student_count_list_in_subject"], [3, 3, 3])
+        self.assertEqual(context["staff_attendance_present_list"], [1, 1, 1])
+        self.assertEqual(context["staff_attendance_leave_list"], [1, 1, 1])
+        self.assertEqual(context["student_attendance_present_list"], [1, 0, 1])
+        self.assertEqual(context["student_attendance_leave_list"], [1, 2, 1])
+
+
+class AttendanceSummaryTests(TestCase):
+    def setUp(self):
+        self.session_year = SessionYearModel.objects.create(
+            session_start_year=datetime.date(2024, 1, 1),
+            session_end_year=datetime.date(2024, 12, 31),
+        )
+        self.course = Courses.objects.create(course_name="Physics")
+        self.staff_user = CustomUser.objects.create_user(
+            username="staff", email="staff@example.com", password="pass", user_type=2
+        )
+        self.subject = Subjects.objects.create(
+            subject_name="Mechanics", course_id=self.course, staff_id=self.staff_user
+        )
+        self.students = []
+        self._add_students(3)
+        self.client.force_login(self.staff_user)
+
+    def _add_students(self, count):
+        for _ in range(count):
+            i = len(self.students)
+            user = CustomUser.objects.create_user(
+                username=f"student{i}",
+                email=f"student{i}@example.com",
+                password="pass",
+                user_type=3,
+            )
+            self.students.append(
+                Students.objects.create(
+                    admin=user,
+                    gender="Female",
+                    address="",
+                    course_id=self.course,
+                    session_year_id=self.session_year,
+                )
+            )
+
+    def _save_attendance(self, date, statuses):
+        payload = [
+            {"id": student.admin_id, "status": status}
+            for student, status in zip(self.students, statuses)
+        ]
+        return self.client.post(
+            reverse("save_attendance_data"),
+            {
+                "student_ids": json.dumps(payload),
+                "subject_id": self.subject.id,
+                "attendance_date": date,
+                "session_year_id": self.session_year.id,
+            },
+        )
+
+    def _summary(self):
+        return {
+            summary.student_id_id: (summary.present_count, summary.absent_count)
+            for summary in AttendanceSummary.objects.all()
+        }
+
+    def test_save_attendance_updates_summary_incrementally(self):
+        self._save_attendance("2024-02-01", [1, 0, 1])
+        self._save_attendance("2024-02-02", [1, 1, 0])
+        # Re-saving a date only moves the students whose status changed
+        self._save_attendance("2024-02-02", [0, 1, 0])
+
+        first, second, third = (student.id for student in self.students)
+        self.assertEqual(
+            self._summary(), {first: (1, 1), second: (1, 1), third: (1, 1)}
+        )
+
+    def test_save_attendance_query_count_is_independent_of_class_size(self):
+        self._save_attendance("2024-02-01", [1, 1, 1])
+        with CaptureQueriesContext(connection) as small:
+            self._save_attendance("2024-02-02", [1, 0, 1])
+
+        self._add_students(17)
+        self._save_attendance("2024-02-03", [1] * 20)
+        with CaptureQueriesContext(connection) as large:
+            response = self._save_attendance("2024-02-04", [1, 0] * 10)
+
+        self.assertEqual(response.json(), {"status": "OK"})
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(
+            AttendanceReport.objects.filter(
+                attendance_id__attendance_date=datetime.date(2024, 2, 4)
+            ).count(),
+            20,
+        )
+
+    def test_update_attendance_updates_summary(self):
+        self._save_attendance("2024-02-01", [1, 1, 1])
+        attendance = Attendance.objects.get()
+        payload = [
+            {"id": self.students[0].admin_id, "status": 0},
+            {"id": self.students[1].admin_id, "status": 1},
+        ]
+        response = self.client.post(
+            reverse("update_attendance_data"),
+            {"student_ids": json.dumps(payload), "attendance_date": attendance.id},
+        )
+
+        self.assertEqual(response.content, b"OK")
+        first, second, third = (student.id for student in self.students)
+        self.assertEqual(
+            self._summary(), {first: (0, 1), second: (1, 0), third: (1, 0)}
+        )
+
+    def test_apply_deltas_adds_to_row_created_by_another_request(self):
+        # A concurrent first marking has already inserted the row
+        first = self.students[0]
+        AttendanceSummary.objects.create(
+            student_id=first,
+            subject_id=self.subject,
+            session_year_id=self.session_year,
+            present_count=1,
+        )
+        AttendanceSummary.apply_deltas(
+            self.subject.id, self.session_year.id, {first.id: (1, 0)}
+        )
+
+        self.assertEqual(self._summary(), {first.id: (2, 0)})
+
+    def test_rebuild_command_matches_incremental_summary(self):
+        self._save_attendance("2024-02-01", [1, 0, 1])
+        self._save_attendance("2024-02-02", [0, 0, 1])
+        incremental = self._summary()
+
+        AttendanceSummary.objects.update(present_count=0, absent_count=0)
+        call_command("rebuild_attendance_summary", stdout=io.StringIO())
+
+        self.assertEqual(self._summary(), incremental)
+
+    def test_dashboards_read_summary(self):
+        self._save_attendance("2024-02-01", [1, 0, 1])
+        self._save_attendance("2024-02-02", [1, 0, 0])
+
+        response = self.client.get(reverse("staff_home"))
+        self.assertEqual(response.context["attendance_list"], [2])
+        self.assertEqual(response.context["attendance_present_list"], [2, 0, 1])
+        self.assertEqual(response.context["attendance_absent_list"], [0, 2, 1])
 
-# Create your tests here.
+        self.client.force_login(self.students[2].admin)
+        response = self.client.get(reverse("student_home"))
+        self.assertEqual(response.context["total_attendance"], 2)
+        self.assertEqual(response.context["data_present"], [1])
+        self.assertEqual(response.context["data_absent"], [1])